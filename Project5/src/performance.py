@@ -1,224 +1,361 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-SM2 Performance Comparison
-SM2性能比较测试
+SM2 Benchmark Suite
+SM2性能基准测试套件
 
-该脚本用于比较SM2基础实现和优化实现的性能差异。
+对SM2基础实现与优化实现的各项操作分别计时：
+    - 使用perf_counter_ns逐次计时，正式计时前先预热
+    - 按目标时长校准迭代次数，输入为预先生成的随机消息与多组密钥（不重复使用同一输入）
+    - 报告每项操作的中位数、p95、p99与每秒操作数
+    - 覆盖密钥生成、签名、验证、批量验证以及多种明文长度的加密/解密
+    - 以counting后端统计固定输入下每项操作的域运算/点运算/查表次数（见sm2_counting），
+      该计数不受机器噪声影响
+    - 结果保存为JSON，compare模式对比两次运行的中位数与运算次数并标出性能回退
+
+用法:
+    python src/performance.py run --output results/bench.json
+    python src/performance.py compare results/base.json results/bench.json --threshold 0.1
 """
 
+import argparse
+import json
+import os
+import platform
+import secrets
+import statistics
+import sys
 import time
-from sm2_basic import SM2
-from sm2_optimized import OptimizedSM2
-
-
-def benchmark_sm2_implementation(implementation, name, iterations=1000, use_parallel=None):
-    """测试特定SM2实现的性能"""
-    print(f"=== {name}性能基准测试 ({iterations} 次迭代) ===")
-    
-    # 创建实例
-    if use_parallel is not None:
-        sm2 = implementation(use_parallel=use_parallel)
-    else:
-        sm2 = implementation()
-    
-    # 生成密钥对
-    print("生成密钥对...")
-    start_time = time.time()
-    private_key, public_key = sm2.generate_keypair()
-    keygen_time = time.time() - start_time
-    print(f"密钥生成时间: {keygen_time:.4f} 秒")
-    
-    # 准备测试消息
-    message = b"Performance test message for SM2 implementation comparison"
-    
-    # 测试签名性能
-    print(f"\n测试签名性能...")
-    start_time = time.time()
-    for _ in range(iterations):
-        signature = sm2.sign(message, private_key, public_key)
-    sign_time = time.time() - start_time
-    avg_sign_time = sign_time / iterations
-    print(f"平均签名时间: {avg_sign_time:.6f} 秒")
-    
-    # 测试验证性能
-    print(f"测试验证性能...")
-    start_time = time.time()
-    for _ in range(iterations):
-        is_valid = sm2.verify(message, signature, public_key)
-    verify_time = time.time() - start_time
-    avg_verify_time = verify_time / iterations
-    print(f"平均验证时间: {avg_verify_time:.6f} 秒")
-    
-    # 测试加密性能
-    print(f"\n测试加密性能...")
-    start_time = time.time()
-    for _ in range(iterations):
-        ciphertext = sm2.encrypt(message, public_key)
-    encrypt_time = time.time() - start_time
-    avg_encrypt_time = encrypt_time / iterations
-    print(f"平均加密时间: {avg_encrypt_time:.6f} 秒")
-    
-    # 测试解密性能
-    print(f"测试解密性能...")
-    start_time = time.time()
-    for _ in range(iterations):
-        decrypted = sm2.decrypt(ciphertext, private_key)
-    decrypt_time = time.time() - start_time
-    avg_decrypt_time = decrypt_time / iterations
-    print(f"平均解密时间: {avg_decrypt_time:.6f} 秒")
-    
-    # 性能总结
-    total_time = keygen_time + sign_time + verify_time + encrypt_time + decrypt_time
-    print(f"\n=== 性能总结 ===")
-    print(f"密钥生成: {keygen_time:.4f}秒")
-    print(f"签名: {avg_sign_time:.6f}秒/次")
-    print(f"验证: {avg_verify_time:.6f}秒/次")
-    print(f"加密: {avg_encrypt_time:.6f}秒/次")
-    print(f"解密: {avg_decrypt_time:.6f}秒/次")
-    print(f"总操作次数: {iterations * 4}")
-    print(f"总时间: {total_time:.4f}秒")
-    
+from typing import Callable, Dict, List, Optional, Sequence
+try:
+    from .sm2_basic import SM2
+    from .sm2_counting import count_operations
+    from .sm2_optimized import OptimizedSM2
+except ImportError:  # 以脚本方式运行（src目录在sys.path中）
+    from sm2_basic import SM2
+    from sm2_counting import count_operations
+    from sm2_optimized import OptimizedSM2
+
+
+# 被测实现
+IMPLEMENTATIONS = {
+    'basic': SM2,
+    'optimized': lambda: OptimizedSM2(use_parallel=False),
+    'optimized_parallel': lambda: OptimizedSM2(use_parallel=True),
+}
+
+# 加密/解密测试的明文长度（字节）
+PAYLOAD_SIZES = (16, 256, 4096)
+
+# 批量验证每批的签名数
+BATCH_SIZE = 32
+
+# 每项操作的目标计时时长（秒）与迭代次数范围
+TARGET_TIME = 1.0
+MIN_ITERATIONS = 10
+MAX_ITERATIONS = 1000
+
+# 正式计时前的预热次数
+WARMUP_ITERATIONS = 3
+
+# 签名/验证/加解密使用的密钥对数量
+KEY_POOL_SIZE = 8
+
+# compare模式下中位数变慢超过该比例视为回退
+REGRESSION_THRESHOLD = 0.10
+
+# 运算计数使用的固定私钥与随机数k（使计数结果可复现）
+COUNT_PRIVATE_KEY = 0x3945208F7B2144B13F36E38AC6D39F95889393692860B51A42FB81EF4DF7C5B8
+COUNT_NONCE = 0x59276E27D506861A16680F3AD9C02DCCEF3CC1FA3CDBE4CE6D54B80DEAC1BC21
+
+
+def _percentile(sorted_values: Sequence[int], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(samples_ns: Sequence[int]) -> dict:
+    """单次耗时样本（纳秒）的统计量"""
+    ordered = sorted(samples_ns)
+    median = statistics.median(ordered)
     return {
-        'name': name,
-        'keygen_time': keygen_time,
-        'avg_sign_time': avg_sign_time,
-        'avg_verify_time': avg_verify_time,
-        'avg_encrypt_time': avg_encrypt_time,
-        'avg_decrypt_time': avg_decrypt_time,
-        'total_time': total_time
+        'iterations': len(ordered),
+        'median_ns': median,
+        'p95_ns': _percentile(ordered, 0.95),
+        'p99_ns': _percentile(ordered, 0.99),
+        'mean_ns': statistics.fmean(ordered),
+        'stdev_ns': statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        'ops_per_sec': 1e9 / median if median else 0.0,
+    }
+
+
+def calibrate(operation: Callable, make_args: Callable[[], tuple], target_time: float = TARGET_TIME,
+              min_iterations: int = MIN_ITERATIONS, max_iterations: int = MAX_ITERATIONS) -> int:
+    """预热并估计单次耗时，返回使总耗时接近target_time的迭代次数（不超过max_iterations）"""
+    elapsed = []
+    for _ in range(WARMUP_ITERATIONS):
+        args = make_args()
+        start = time.perf_counter_ns()
+        operation(*args)
+        elapsed.append(time.perf_counter_ns() - start)
+    estimate = max(min(elapsed), 1)
+    return min(max_iterations, max(min_iterations, int(target_time * 1e9 / estimate)))
+
+
+def measure(operation: Callable, make_args: Callable[[], tuple], target_time: float = TARGET_TIME,
+            min_iterations: int = MIN_ITERATIONS, max_iterations: int = MAX_ITERATIONS) -> dict:
+    """
+    逐次计时operation(*make_args())。参数在计时前全部生成，每次迭代使用不同的输入。
+    """
+    iterations = calibrate(operation, make_args, target_time, min_iterations, max_iterations)
+    inputs = [make_args() for _ in range(iterations)]
+    samples = []
+    for args in inputs:
+        start = time.perf_counter_ns()
+        operation(*args)
+        samples.append(time.perf_counter_ns() - start)
+    return summarize(samples)
+
+
+def _random_message() -> bytes:
+    return secrets.token_bytes(16 + secrets.randbelow(112))
+
+
+def benchmark_implementation(sm2, target_time: float = TARGET_TIME,
+                             payload_sizes: Sequence[int] = PAYLOAD_SIZES,
+                             max_iterations: int = MAX_ITERATIONS,
+                             min_iterations: int = MIN_ITERATIONS) -> Dict[str, dict]:
+    """对一个SM2实例的各项操作计时，返回 {操作名: 统计量}"""
+    keys = [sm2.generate_keypair() for _ in range(KEY_POOL_SIZE)]
+
+    def pick():
+        return keys[secrets.randbelow(len(keys))]
+
+    def signed():
+        private_key, public_key = pick()
+        message = _random_message()
+        return message, sm2.sign(message, private_key, public_key), public_key
+
+    def run(operation, make_args):
+        return measure(operation, make_args, target_time, min_iterations, max_iterations)
+
+    results = {
+        'keygen': run(sm2.generate_keypair, tuple),
+        'sign': run(sm2.sign, lambda: (_random_message(),) + pick()),
+        'verify': run(sm2.verify, signed),
+    }
+    if hasattr(sm2, 'verify_batch'):
+        stats = run(sm2.verify_batch, lambda: ([signed() for _ in range(BATCH_SIZE)],))
+        stats['batch_size'] = BATCH_SIZE
+        results['verify_batch'] = stats
+
+    for size in payload_sizes:
+        def plaintext():
+            return secrets.token_bytes(size), pick()[1]
+
+        def ciphertext():
+            private_key, public_key = pick()
+            return sm2.encrypt(secrets.token_bytes(size), public_key), private_key
+
+        results[f'encrypt_{size}'] = run(sm2.encrypt, plaintext)
+        results[f'decrypt_{size}'] = run(sm2.decrypt, ciphertext)
+    return results
+
+
+def operation_counts(payload_sizes: Sequence[int] = PAYLOAD_SIZES) -> Dict[str, dict]:
+    """
+    固定输入下优化实现每项操作的运算次数。使用counting后端与scalar_mult='window'，
+    秘密标量的点乘与标量取值无关；验证的sG、tP为变长NAF，由固定输入保证可复现。
+    """
+    sm2 = OptimizedSM2(use_parallel=False, scalar_mult='window', backend='counting')
+    sm2._generate_secure_random = lambda: COUNT_NONCE
+    private_key = COUNT_PRIVATE_KEY
+    public_key = sm2.base_table.multiply(private_key)
+    message = b"operation count reference message"
+    signature = sm2.sign(message, private_key, public_key)
+
+    operations = {
+        'keygen': lambda: sm2.base_table.multiply(private_key),
+        'sign': lambda: sm2.sign(message, private_key, public_key),
+        'verify': lambda: sm2.verify(message, signature, public_key),
+        'verify_batch': lambda: sm2.verify_batch([(message, signature, public_key)] * BATCH_SIZE),
+    }
+    for size in payload_sizes:
+        plaintext = bytes(range(256)) * (size // 256) + bytes(range(size % 256))
+        ciphertext = sm2.encrypt(plaintext, public_key)
+        operations[f'encrypt_{size}'] = lambda plaintext=plaintext: sm2.encrypt(plaintext, public_key)
+        operations[f'decrypt_{size}'] = lambda ciphertext=ciphertext: sm2.decrypt(ciphertext, private_key)
+
+    counts = {}
+    for name, operation in operations.items():
+        with count_operations() as counted:
+            operation()
+        counts[name] = dict(sorted(counted.items()))
+    return counts
+
+
+def run_suite(implementations: Sequence[str] = ('basic', 'optimized'),
+              target_time: float = TARGET_TIME, payload_sizes: Sequence[int] = PAYLOAD_SIZES,
+              max_iterations: int = MAX_ITERATIONS, min_iterations: int = MIN_ITERATIONS,
+              counts: bool = True) -> dict:
+    """运行基准测试套件，返回可直接保存为JSON的结果；counts为True时附带运算次数"""
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'target_time': target_time,
+        },
+        'results': {},
     }
+    for name in implementations:
+        if name not in IMPLEMENTATIONS:
+            raise ValueError(f"Unknown implementation: {name}")
+        sm2 = IMPLEMENTATIONS[name]()
+        report['results'][name] = benchmark_implementation(sm2, target_time, payload_sizes,
+                                                           max_iterations, min_iterations)
+    if counts:
+        report['operation_counts'] = operation_counts(payload_sizes)
+    return report
+
+
+def save_results(report: dict, path: str):
+    """保存结果到JSON文件"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def load_results(path: str) -> dict:
+    """读取JSON结果文件"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = REGRESSION_THRESHOLD) -> List[dict]:
+    """
+    按中位数对比两次运行中共有的实现与操作。ratio为 当前/基线，
+    大于 1 + threshold 为regression，小于 1 - threshold 为improvement。
+    """
+    rows = []
+    for name, operations in current['results'].items():
+        base_operations = baseline['results'].get(name, {})
+        for operation, stats in operations.items():
+            if operation not in base_operations:
+                continue
+            ratio = stats['median_ns'] / base_operations[operation]['median_ns']
+            if ratio > 1 + threshold:
+                status = 'regression'
+            elif ratio < 1 - threshold:
+                status = 'improvement'
+            else:
+                status = 'unchanged'
+            rows.append({
+                'implementation': name,
+                'operation': operation,
+                'baseline_median_ns': base_operations[operation]['median_ns'],
+                'current_median_ns': stats['median_ns'],
+                'ratio': ratio,
+                'status': status,
+            })
+    return rows
+
+
+def compare_counts(baseline: dict, current: dict) -> List[dict]:
+    """对比两次运行的运算次数（确定性指标），列出有变化的计数项；次数增加为regression"""
+    rows = []
+    base_counts = baseline.get('operation_counts', {})
+    for operation, counted in current.get('operation_counts', {}).items():
+        if operation not in base_counts:
+            continue
+        for counter in sorted(set(counted) | set(base_counts[operation])):
+            before, after = base_counts[operation].get(counter, 0), counted.get(counter, 0)
+            if before != after:
+                rows.append({
+                    'operation': operation,
+                    'counter': counter,
+                    'baseline': before,
+                    'current': after,
+                    'status': 'regression' if after > before else 'improvement',
+                })
+    return rows
+
+
+def print_report(report: dict):
+    """按实现打印各操作的统计量，并给出相对基础实现的加速比"""
+    results = report['results']
+    for name, operations in results.items():
+        print(f"\n=== {name} ===")
+        print(f"{'操作':<16} {'次数':>6} {'中位数(ms)':>12} {'p95(ms)':>10} {'p99(ms)':>10} {'ops/s':>10}")
+        for operation, stats in operations.items():
+            print(f"{operation:<16} {stats['iterations']:>6} {stats['median_ns'] / 1e6:>12.3f} "
+                  f"{stats['p95_ns'] / 1e6:>10.3f} {stats['p99_ns'] / 1e6:>10.3f} {stats['ops_per_sec']:>10.1f}")
+
+    if 'basic' in results:
+        for name, operations in results.items():
+            if name == 'basic':
+                continue
+            print(f"\n=== {name} 相对 basic 的加速比（中位数） ===")
+            for operation, stats in operations.items():
+                base = results['basic'].get(operation)
+                if base:
+                    print(f"{operation:<16} {base['median_ns'] / stats['median_ns']:.2f}x")
+
+    if report.get('operation_counts'):
+        print("\n=== 运算次数（优化实现，固定输入） ===")
+        for operation, counted in report['operation_counts'].items():
+            print(f"{operation:<16} " + ", ".join(f"{key}={value}" for key, value in counted.items()))
+
+
+def print_comparison(rows: List[dict]):
+    """打印compare_results的结果"""
+    labels = {'regression': '回退', 'improvement': '提升', 'unchanged': '持平'}
+    print(f"{'实现':<20} {'操作':<16} {'基线(ms)':>10} {'当前(ms)':>10} {'比值':>7}  状态")
+    for row in rows:
+        print(f"{row['implementation']:<20} {row['operation']:<16} {row['baseline_median_ns'] / 1e6:>10.3f} "
+              f"{row['current_median_ns'] / 1e6:>10.3f} {row['ratio']:>7.2f}  {labels[row['status']]}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """命令行入口：run 运行基准测试（默认），compare 对比两次结果，存在回退时返回1"""
+    parser = argparse.ArgumentParser(description="SM2性能基准测试套件")
+    sub = parser.add_subparsers(dest='command')
+
+    run = sub.add_parser('run', help="运行基准测试")
+    run.add_argument('--impl', nargs='+', choices=sorted(IMPLEMENTATIONS), default=['basic', 'optimized'])
+    run.add_argument('--target-time', type=float, default=TARGET_TIME, help="每项操作的目标计时秒数")
+    run.add_argument('--max-iterations', type=int, default=MAX_ITERATIONS)
+    run.add_argument('--payload-sizes', type=int, nargs='+', default=list(PAYLOAD_SIZES))
+    run.add_argument('--output', help="结果JSON文件路径")
+
+    compare = sub.add_parser('compare', help="对比两次运行结果")
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
 
+    args = parser.parse_args(argv)
+    if args.command == 'compare':
+        baseline, current = load_results(args.baseline), load_results(args.current)
+        rows = compare_results(baseline, current, args.threshold)
+        count_rows = compare_counts(baseline, current)
+        print_comparison(rows)
+        if count_rows:
+            print("\n运算次数变化:")
+            for row in count_rows:
+                print(f"{row['operation']:<16} {row['counter']:<14} {row['baseline']} -> {row['current']}")
+        return 1 if any(row['status'] == 'regression' for row in rows + count_rows) else 0
 
-def compare_performance(iterations=1000, test_parallel_options=False):
-    """比较SM2基础实现和优化实现的性能"""
-    print("=" * 80)
-    print("SM2实现性能比较测试")
-    print("=" * 80)
-    
-    # 测试基础实现
-    basic_results = benchmark_sm2_implementation(SM2, "SM2基础实现", iterations)
-    
-    print("\n" + "=" * 80)
-    
-    if test_parallel_options:
-        # 测试不同并行选项
-        print("测试优化实现(禁用并行)...")
-        optimized_no_parallel = benchmark_sm2_implementation(
-            lambda use_parallel: OptimizedSM2(use_parallel=use_parallel), 
-            "SM2优化实现(禁用并行)", 
-            iterations, 
-            use_parallel=False
-        )
-        
-        print("\n" + "=" * 80)
-        
-        print("测试优化实现(启用并行)...")
-        optimized_with_parallel = benchmark_sm2_implementation(
-            lambda use_parallel: OptimizedSM2(use_parallel=use_parallel), 
-            "SM2优化实现(启用并行)", 
-            iterations, 
-            use_parallel=True
-        )
-        
-        # 比较结果
-        print("\n" + "=" * 80)
-        print("SM2性能比较结果")
-        print("=" * 80)
-        
-        print(f"{'指标':<15} {'基础实现':<15} {'优化(禁用并行)':<15} {'优化(启用并行)':<15} {'禁用并行提升':<15} {'启用并行提升':<15}")
-        print("-" * 100)
-        
-        # 计算并打印各项指标
-        # 密钥生成
-        keygen_speedup_no_parallel = basic_results['keygen_time'] / optimized_no_parallel['keygen_time']
-        keygen_speedup_with_parallel = basic_results['keygen_time'] / optimized_with_parallel['keygen_time']
-        print(f"{'密钥生成时间':<15} {basic_results['keygen_time']:.4f}s    {optimized_no_parallel['keygen_time']:.4f}s    {optimized_with_parallel['keygen_time']:.4f}s    {keygen_speedup_no_parallel:.2f}x          {keygen_speedup_with_parallel:.2f}x")
-        
-        # 签名
-        sign_speedup_no_parallel = basic_results['avg_sign_time'] / optimized_no_parallel['avg_sign_time']
-        sign_speedup_with_parallel = basic_results['avg_sign_time'] / optimized_with_parallel['avg_sign_time']
-        print(f"{'平均签名时间':<15} {basic_results['avg_sign_time']:.6f}s  {optimized_no_parallel['avg_sign_time']:.6f}s  {optimized_with_parallel['avg_sign_time']:.6f}s  {sign_speedup_no_parallel:.2f}x          {sign_speedup_with_parallel:.2f}x")
-        
-        # 验证
-        verify_speedup_no_parallel = basic_results['avg_verify_time'] / optimized_no_parallel['avg_verify_time']
-        verify_speedup_with_parallel = basic_results['avg_verify_time'] / optimized_with_parallel['avg_verify_time']
-        print(f"{'平均验证时间':<15} {basic_results['avg_verify_time']:.6f}s  {optimized_no_parallel['avg_verify_time']:.6f}s  {optimized_with_parallel['avg_verify_time']:.6f}s  {verify_speedup_no_parallel:.2f}x          {verify_speedup_with_parallel:.2f}x")
-        
-        # 加密
-        encrypt_speedup_no_parallel = basic_results['avg_encrypt_time'] / optimized_no_parallel['avg_encrypt_time']
-        encrypt_speedup_with_parallel = basic_results['avg_encrypt_time'] / optimized_with_parallel['avg_encrypt_time']
-        print(f"{'平均加密时间':<15} {basic_results['avg_encrypt_time']:.6f}s  {optimized_no_parallel['avg_encrypt_time']:.6f}s  {optimized_with_parallel['avg_encrypt_time']:.6f}s  {encrypt_speedup_no_parallel:.2f}x          {encrypt_speedup_with_parallel:.2f}x")
-        
-        # 解密
-        decrypt_speedup_no_parallel = basic_results['avg_decrypt_time'] / optimized_no_parallel['avg_decrypt_time']
-        decrypt_speedup_with_parallel = basic_results['avg_decrypt_time'] / optimized_with_parallel['avg_decrypt_time']
-        print(f"{'平均解密时间':<15} {basic_results['avg_decrypt_time']:.6f}s  {optimized_no_parallel['avg_decrypt_time']:.6f}s  {optimized_with_parallel['avg_decrypt_time']:.6f}s  {decrypt_speedup_no_parallel:.2f}x          {decrypt_speedup_with_parallel:.2f}x")
-        
-        # 总时间
-        total_speedup_no_parallel = basic_results['total_time'] / optimized_no_parallel['total_time']
-        total_speedup_with_parallel = basic_results['total_time'] / optimized_with_parallel['total_time']
-        print(f"{'总时间':<15} {basic_results['total_time']:.4f}s    {optimized_no_parallel['total_time']:.4f}s    {optimized_with_parallel['total_time']:.4f}s    {total_speedup_no_parallel:.2f}x          {total_speedup_with_parallel:.2f}x")
-        
-        return  # 添加return语句，避免执行后续代码
-    else:
-        # 测试优化实现(默认配置)
-        optimized_results = benchmark_sm2_implementation(
-            lambda use_parallel: OptimizedSM2(use_parallel=use_parallel), 
-            "SM2优化实现", 
-            iterations, 
-            use_parallel=True
-        )
-        
-        # 比较结果(保持原有代码)...
-    
-    # 比较结果
-    print("\n" + "=" * 80)
-    print("SM2性能比较结果")
-    print("=" * 80)
-    
-    print(f"{'指标':<15} {'基础实现':<15} {'优化(禁用并行)':<15} {'优化(启用并行)':<15} {'禁用并行提升':<15} {'启用并行提升':<15}")
-    print("-" * 100)
-    
-    # 密钥生成
-    keygen_speedup_no_parallel = basic_results['keygen_time'] / optimized_no_parallel['keygen_time']
-    keygen_speedup_with_parallel = basic_results['keygen_time'] / optimized_with_parallel['keygen_time']
-    print(f"{'密钥生成时间':<15} {basic_results['keygen_time']:.4f}s    {optimized_no_parallel['keygen_time']:.4f}s    {optimized_with_parallel['keygen_time']:.4f}s    {keygen_speedup_no_parallel:.2f}x          {keygen_speedup_with_parallel:.2f}x")
-    
-    # 签名
-    sign_speedup_no_parallel = basic_results['avg_sign_time'] / optimized_no_parallel['avg_sign_time']
-    sign_speedup_with_parallel = basic_results['avg_sign_time'] / optimized_with_parallel['avg_sign_time']
-    print(f"{'平均签名时间':<15} {basic_results['avg_sign_time']:.6f}s  {optimized_no_parallel['avg_sign_time']:.6f}s  {optimized_with_parallel['avg_sign_time']:.6f}s  {sign_speedup_no_parallel:.2f}x          {sign_speedup_with_parallel:.2f}x")
-    
-    # 验证
-    verify_speedup_no_parallel = basic_results['avg_verify_time'] / optimized_no_parallel['avg_verify_time']
-    verify_speedup_with_parallel = basic_results['avg_verify_time'] / optimized_with_parallel['avg_verify_time']
-    print(f"{'平均验证时间':<15} {basic_results['avg_verify_time']:.6f}s  {optimized_no_parallel['avg_verify_time']:.6f}s  {optimized_with_parallel['avg_verify_time']:.6f}s  {verify_speedup_no_parallel:.2f}x          {verify_speedup_with_parallel:.2f}x")
-    
-    # 加密
-    encrypt_speedup_no_parallel = basic_results['avg_encrypt_time'] / optimized_no_parallel['avg_encrypt_time']
-    encrypt_speedup_with_parallel = basic_results['avg_encrypt_time'] / optimized_with_parallel['avg_encrypt_time']
-    print(f"{'平均加密时间':<15} {basic_results['avg_encrypt_time']:.6f}s  {optimized_no_parallel['avg_encrypt_time']:.6f}s  {optimized_with_parallel['avg_encrypt_time']:.6f}s  {encrypt_speedup_no_parallel:.2f}x          {encrypt_speedup_with_parallel:.2f}x")
-    
-    # 解密
-    decrypt_speedup_no_parallel = basic_results['avg_decrypt_time'] / optimized_no_parallel['avg_decrypt_time']
-    decrypt_speedup_with_parallel = basic_results['avg_decrypt_time'] / optimized_with_parallel['avg_decrypt_time']
-    print(f"{'平均解密时间':<15} {basic_results['avg_decrypt_time']:.6f}s  {optimized_no_parallel['avg_decrypt_time']:.6f}s  {optimized_with_parallel['avg_decrypt_time']:.6f}s  {decrypt_speedup_no_parallel:.2f}x          {decrypt_speedup_with_parallel:.2f}x")
-    
-    # 总时间
-    total_speedup_no_parallel = basic_results['total_time'] / optimized_no_parallel['total_time']
-    total_speedup_with_parallel = basic_results['total_time'] / optimized_with_parallel['total_time']
-    print(f"{'总时间':<15} {basic_results['total_time']:.4f}s    {optimized_no_parallel['total_time']:.4f}s    {optimized_with_parallel['total_time']:.4f}s    {total_speedup_no_parallel:.2f}x          {total_speedup_with_parallel:.2f}x")
-    
-    return  # 添加return语句，避免执行后续代码
-
-
-def main():
-    """主函数"""
-    # 增加迭代次数以获得更稳定的结果
-    # 可选: 测试不同并行选项
-    compare_performance(iterations=1000, test_parallel_options=True)
+    if args.command is None:
+        args = run.parse_args([])
+    report = run_suite(args.impl, args.target_time, args.payload_sizes, args.max_iterations)
+    print_report(report)
+    if args.output:
+        save_results(report, args.output)
+        print(f"\n结果已保存: {args.output}")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -5,6 +5,7 @@ Satoshi Nakamoto Signature Forgery
 中本聪数字签名伪造
 
 本模块实现签名伪造技术进行演示，展示中本聪数字签名的伪造可能性。
+python-ecdsa导入耗时较长，只在实际签名/验证的方法中按需导入。
 """
 
 import hashlib
@@ -13,11 +14,6 @@ import os
 import random
 import time
 from typing import Tuple, List, Dict, Optional, Union
-import gmpy2
-from gmpy2 import mpz
-import ecdsa
-from ecdsa import SigningKey, VerifyingKey, SECP256k1
-from ecdsa.util import sigencode_der, sigdecode_der
 # import bitcoin
 # from bitcoin import *
 
@@ -90,6 +86,9 @@ class SatoshiForgery:
         """使用弱随机数攻击伪造签名"""
         print("Attempting forgery with weak nonce attack...")
         
+        from ecdsa import SigningKey, SECP256k1
+        from ecdsa.util import sigdecode_der
+
         # 模拟使用弱随机数生成器
         weak_nonce = 0x1234567890abcdef  # 固定的弱随机数
         
@@ -110,6 +109,8 @@ class SatoshiForgery:
     def _forge_with_malleability(self, message: bytes) -> Optional[Tuple[int, int]]:
         """使用签名可延展性伪造签名"""
         print("Attempting forgery with signature malleability...")
+        from ecdsa import SigningKey, SECP256k1
+        from ecdsa.util import sigdecode_der
         
         # 创建基础签名
         signing_key = SigningKey.from_secret_exponent(0xabcdef1234567890, curve=SECP256k1)
@@ -126,6 +127,7 @@ class SatoshiForgery:
     def _forge_with_deterministic_signing(self, message: bytes) -> bytes:
         """使用确定性签名生成伪造签名"""
         print("Attempting forgery with deterministic signing...")
+        from ecdsa import SigningKey, SECP256k1
         
         # 使用消息哈希作为种子生成确定性签名
         message_hash = hashlib.sha256(message).digest()
@@ -145,6 +147,7 @@ class SatoshiForgery:
                                 public_key: str) -> bool:
         """验证中本聪签名"""
         print(f"=== Verifying Satoshi Signature ===")
+        from ecdsa import VerifyingKey, SECP256k1
         
         try:
             # 解析公钥
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Asyncio SM2 Service API
+基于asyncio的SM2微批处理服务接口
+
+asign / averify / aencrypt / adecrypt 把请求放入按操作划分的队列，队列达到批大小或等待超过
+截止时间时整批提交到进程池执行：验证在批量较大时使用OptimizedSM2.verify_batch，
+解密按私钥分组使用decrypt_batch。并发上限提供背压，支持单请求超时与取消。
+跨进程只传递整数坐标与字节串，工作进程各自持有一个OptimizedSM2实例（预计算表常驻）。
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .sm2_optimized import HOT_KEY_THRESHOLD, OptimizedSM2, OptimizedSM2Point
+
+
+# 批内验证请求数达到该值时使用批量验证
+BATCH_VERIFY_THRESHOLD = 4
+
+# 工作进程内的SM2实例
+_worker_sm2: Optional[OptimizedSM2] = None
+
+
+def _init_worker():
+    """工作进程初始化：构建SM2实例与G的固定基表"""
+    global _worker_sm2
+    _worker_sm2 = OptimizedSM2(use_parallel=False)
+    _worker_sm2.base_table
+
+
+def _get_worker_sm2() -> OptimizedSM2:
+    if _worker_sm2 is None:
+        _init_worker()
+    return _worker_sm2
+
+
+def _point(sm2: OptimizedSM2, xy: Tuple[int, int]) -> OptimizedSM2Point:
+    return OptimizedSM2Point(xy[0], xy[1], sm2.curve)
+
+
+def _capture(func: Callable, *args) -> Tuple[bool, Any]:
+    """执行单个请求，异常作为结果返回而不影响同批其他请求"""
+    try:
+        return True, func(*args)
+    except Exception as e:
+        return False, e
+
+
+def _sign_batch(requests: List[Tuple[bytes, int, Tuple[int, int]]]) -> List[Tuple[bool, Any]]:
+    """工作进程：批量签名"""
+    sm2 = _get_worker_sm2()
+    return [_capture(lambda m, d, P: tuple(map(int, sm2.sign(m, d, _point(sm2, P)))), *request)
+            for request in requests]
+
+
+def _verify_batch(requests: List[Tuple[bytes, Tuple[int, int], Tuple[int, int]]]) -> List[Tuple[bool, Any]]:
+    """工作进程：批量验证，请求数较多时使用verify_batch"""
+    sm2 = _get_worker_sm2()
+    items = [(message, signature, _point(sm2, P)) for message, signature, P in requests]
+    if len(items) >= BATCH_VERIFY_THRESHOLD:
+        return [(True, valid) for valid in sm2.verify_batch(items)]
+    return [_capture(sm2.verify, *item) for item in items]
+
+
+def _encrypt_batch(requests: List[Tuple[bytes, Tuple[int, int]]]) -> List[Tuple[bool, Any]]:
+    """工作进程：批量加密，批内重复的接收方或已缓存固定基表的接收方使用SM2Recipient"""
+    sm2 = _get_worker_sm2()
+    counts: Dict[Tuple[int, int], int] = {}
+    for _, P in requests:
+        counts[P] = counts.get(P, 0) + 1
+
+    def encrypt(message, P):
+        public_key = _point(sm2, P)
+        if counts[P] >= HOT_KEY_THRESHOLD or P in sm2._recipient_tables:
+            public_key = sm2.recipient(public_key)
+        elif not sm2._is_valid_public_key(public_key):
+            raise ValueError("Invalid public key")
+        C1, C2, C3 = sm2.encrypt(message, public_key)
+        return (int(C1.x), int(C1.y)), C2, C3
+
+    return [_capture(encrypt, *request) for request in requests]
+
+
+def _decrypt_batch(requests: List[Tuple[Tuple[Tuple[int, int], bytes, bytes], int]]) -> List[Tuple[bool, Any]]:
+    """工作进程：按私钥分组批量解密"""
+    sm2 = _get_worker_sm2()
+    groups: Dict[int, List[int]] = {}
+    for i, (_, private_key) in enumerate(requests):
+        groups.setdefault(private_key, []).append(i)
+
+    results: List[Tuple[bool, Any]] = [None] * len(requests)
+    for private_key, indices in groups.items():
+        ciphertexts = []
+        for i in indices:
+            C1, C2, C3 = requests[i][0]
+            ciphertexts.append((_point(sm2, C1), C2, C3))
+        try:
+            decrypted = sm2.decrypt_batch(ciphertexts, private_key)
+        except ValueError as e:
+            for i in indices:
+                results[i] = (False, e)
+            continue
+        for i, result in zip(indices, decrypted):
+            if result['error'] is None:
+                results[i] = (True, result['message'])
+            else:
+                results[i] = (False, ValueError(result['error']))
+    return results
+
+
+_BATCH_FUNCTIONS = {
+    'sign': _sign_batch,
+    'verify': _verify_batch,
+    'encrypt': _encrypt_batch,
+    'decrypt': _decrypt_batch,
+}
+
+
+class AsyncSM2:
+    """SM2异步微批处理接口"""
+
+    def __init__(self, max_batch_size: int = 64, max_delay: float = 0.002,
+                 max_pending: int = 10000, timeout: Optional[float] = None,
+                 processes: Optional[int] = None, executor: Optional[Executor] = None):
+        """
+        Args:
+            max_batch_size: 队列达到该长度立即提交
+            max_delay: 队列中最早请求的最长等待时间（秒），到期即提交
+            max_pending: 未完成请求上限，达到后新请求等待（背压）
+            timeout: 默认单请求超时（秒），None表示不限
+            processes: 进程池大小，默认CPU核数
+            executor: 自定义执行器（提供时不创建进程池）
+        """
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._processes = processes or os.cpu_count() or 1
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._queues: Dict[str, List[Tuple[Any, asyncio.Future]]] = {op: [] for op in _BATCH_FUNCTIONS}
+        self._timers: Dict[str, Optional[asyncio.TimerHandle]] = {op: None for op in _BATCH_FUNCTIONS}
+        self._inflight: set = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.stats = {'requests': 0, 'batches': 0, 'timeouts': 0, 'cancelled': 0}
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """创建进程池并预热工作进程"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._processes, initializer=_init_worker)
+            self._owns_executor = True
+
+    async def close(self):
+        """提交剩余请求，等待执行中的批完成后关闭进程池"""
+        for op in list(self._queues):
+            self._flush(op)
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    # ------------------------------------------------------------------
+    # 公共接口
+    # ------------------------------------------------------------------
+
+    async def asign(self, message: bytes, private_key: int, public_key: OptimizedSM2Point,
+                    timeout: Optional[float] = None) -> Tuple[int, int]:
+        """异步签名"""
+        return await self._submit('sign', (message, int(private_key), (int(public_key.x), int(public_key.y))),
+                                  timeout)
+
+    async def averify(self, message: bytes, signature: Tuple[int, int], public_key: OptimizedSM2Point,
+                      timeout: Optional[float] = None) -> bool:
+        """异步验证"""
+        r, s = signature
+        return await self._submit('verify', (message, (int(r), int(s)), (int(public_key.x), int(public_key.y))),
+                                  timeout)
+
+    async def aencrypt(self, message: bytes, public_key: OptimizedSM2Point,
+                       timeout: Optional[float] = None) -> Tuple[OptimizedSM2Point, bytes, bytes]:
+        """异步加密"""
+        C1, C2, C3 = await self._submit('encrypt', (message, (int(public_key.x), int(public_key.y))), timeout)
+        return OptimizedSM2Point(C1[0], C1[1], public_key.curve), C2, C3
+
+    async def adecrypt(self, ciphertext: Tuple[OptimizedSM2Point, bytes, bytes], private_key: int,
+                       timeout: Optional[float] = None) -> bytes:
+        """异步解密"""
+        C1, C2, C3 = ciphertext
+        return await self._submit('decrypt', (((int(C1.x), int(C1.y)), C2, C3), int(private_key)), timeout)
+
+    # ------------------------------------------------------------------
+    # 队列与批处理
+    # ------------------------------------------------------------------
+
+    async def _submit(self, op: str, request: Any, timeout: Optional[float]):
+        if self._slots is None:
+            await self.start()
+        await self._slots.acquire()
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        future.add_done_callback(lambda _: self._slots.release())
+        self.stats['requests'] += 1
+
+        queue = self._queues[op]
+        queue.append((request, future))
+        if len(queue) >= self.max_batch_size:
+            self._flush(op)
+        elif self._timers[op] is None:
+            self._timers[op] = loop.call_later(self.max_delay, self._flush, op)
+
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            # shield使超时/取消只作用于调用方，未执行的请求在提交批时被跳过
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            future.cancel()
+            raise
+        except asyncio.CancelledError:
+            self.stats['cancelled'] += 1
+            future.cancel()
+            raise
+
+    def _flush(self, op: str):
+        """提交op队列中的全部未取消请求"""
+        timer = self._timers[op]
+        if timer is not None:
+            timer.cancel()
+            self._timers[op] = None
+
+        batch = [(request, future) for request, future in self._queues[op] if not future.done()]
+        self._queues[op] = []
+        if not batch:
+            return
+
+        self.stats['batches'] += 1
+        task = asyncio.ensure_future(self._run_batch(op, batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, op: str, batch: List[Tuple[Any, asyncio.Future]]):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self._executor, _BATCH_FUNCTIONS[op],
+                                                 [request for request, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), (ok, value) in zip(batch, results):
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+
+async def _thread_per_call_verify(sm2: OptimizedSM2, items, concurrency: int) -> float:
+    """对照组：每个请求在线程中调用OptimizedSM2.verify"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(item):
+        async with semaphore:
+            return await asyncio.to_thread(sm2.verify, *item)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(item) for item in items))
+    return time.perf_counter() - start
+
+
+async def compare_throughput(requests: int = 2000, keys: int = 8, concurrency: int = 1000,
+                             processes: Optional[int] = None) -> Dict[str, float]:
+    """比较线程逐个调用与微批处理的验证吞吐量（请求/秒）"""
+    sm2 = OptimizedSM2(use_parallel=False)
+    keypairs = [sm2.generate_keypair() for _ in range(keys)]
+    items = []
+    for i in range(requests):
+        private_key, public_key = keypairs[i % keys]
+        message = os.urandom(32)
+        items.append((message, sm2.sign(message, private_key, public_key), public_key))
+
+    thread_time = await _thread_per_call_verify(sm2, items, concurrency)
+
+    async with AsyncSM2(processes=processes, max_pending=concurrency) as service:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(service.averify(*item) for item in items))
+        batch_time = time.perf_counter() - start
+
+    return {
+        'requests': requests,
+        'thread_per_call_qps': requests / thread_time,
+        'micro_batch_qps': requests / batch_time,
+        'speedup': thread_time / batch_time,
+        'all_valid': all(results),
+    }
+
+
+def main():
+    """演示：异步接口与吞吐量对比"""
+    print("=== SM2异步微批处理接口演示 ===")
+    report = asyncio.run(compare_throughput(requests=1000))
+    print(f"请求数: {report['requests']}")
+    print(f"线程逐个调用: {report['thread_per_call_qps']:.1f} 次/秒")
+    print(f"微批处理: {report['micro_batch_qps']:.1f} 次/秒")
+    print(f"加速比: {report['speedup']:.2f}x")
+    print(f"全部验证通过: {report['all_valid']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Big Integer Backends
+SM2大整数运算后端
+
+sm2_optimized的域运算与点运算基于一个小型后端接口：element（数值类型）、mul、sqr、
+reduce、inv、powmod。提供gmpy2 mpz、CPython int与gmpy2 xmpz（原位寄存器）三种实现，
+各后端输出完全一致。另有counting后端（CountingBackend）统计域乘法/平方/求逆次数，
+仅供运算计数使用（见sm2_counting），不参与自动调优。
+
+后端选择顺序：显式参数 > 环境变量SM2_BACKEND（后端名或auto）> gmpy2（可用时）> int。
+auto在首次运行时做微基准测试并把结果缓存到磁盘，之后直接读取缓存。
+"""
+
+import importlib.util
+import json
+import os
+import platform
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+# gmpy2模块：首次创建gmpy2/xmpz后端时才导入（导入本身需要数十毫秒）
+gmpy2 = None
+
+
+def _has_gmpy2() -> bool:
+    return gmpy2 is not None or importlib.util.find_spec('gmpy2') is not None
+
+
+def _import_gmpy2():
+    global gmpy2
+    if gmpy2 is None:
+        import gmpy2 as module
+        gmpy2 = module
+    return gmpy2
+
+
+# 后端名称
+BACKEND_NAMES = ('gmpy2', 'int', 'xmpz')
+
+# 选择后端的环境变量与自动调优缓存文件路径的环境变量
+BACKEND_ENV = 'SM2_BACKEND'
+CACHE_ENV = 'SM2_BACKEND_CACHE'
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'sm2', 'backend.json')
+
+# 微基准测试的轮数（每轮约为一次Jacobian点加的运算量）
+AUTOTUNE_ROUNDS = 2000
+
+# SM2素数p，用于微基准测试
+_SM2_P = int("FFFFFFFEFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF00000000FFFFFFFFFFFFFFFF", 16)
+
+
+class IntBackend:
+    """CPython int后端"""
+
+    name = 'int'
+    element = staticmethod(int)
+
+    @staticmethod
+    def mul(a, b, p):
+        return a * b % p
+
+    @staticmethod
+    def sqr(a, p):
+        return a * a % p
+
+    @staticmethod
+    def reduce(a, p):
+        return a % p
+
+    @staticmethod
+    def inv(a, p):
+        if a % p == 0:
+            raise ZeroDivisionError("element is not invertible")
+        return pow(a, -1, p)
+
+    @staticmethod
+    def powmod(a, e, p):
+        return pow(a, e, p)
+
+
+class Gmpy2Backend(IntBackend):
+    """gmpy2 mpz后端"""
+
+    name = 'gmpy2'
+
+    def __init__(self):
+        if not _has_gmpy2():
+            raise ValueError("gmpy2 backend requires the gmpy2 package")
+        self.element = _import_gmpy2().mpz
+
+    @staticmethod
+    def inv(a, p):
+        return gmpy2.invert(a, p)
+
+    @staticmethod
+    def powmod(a, e, p):
+        return gmpy2.powmod(a, e, p)
+
+
+class XmpzBackend(Gmpy2Backend):
+    """
+    gmpy2 xmpz后端：mul/sqr/reduce在可变xmpz寄存器上原位计算，结果以mpz返回。
+    xmpz的一元负号等运算会原地修改操作数，因此存储的域元素仍为不可变的mpz。
+    """
+
+    name = 'xmpz'
+
+    @staticmethod
+    def mul(a, b, p):
+        r = gmpy2.xmpz(a)
+        r *= b
+        r %= p
+        return gmpy2.mpz(r)
+
+    @staticmethod
+    def sqr(a, p):
+        r = gmpy2.xmpz(a)
+        r *= r
+        r %= p
+        return gmpy2.mpz(r)
+
+    @staticmethod
+    def reduce(a, p):
+        r = gmpy2.xmpz(a)
+        r %= p
+        return gmpy2.mpz(r)
+
+
+# counting后端累计的运算次数（field_mul、field_sqr、field_inv、field_pow）
+OPERATION_COUNTS = Counter()
+
+
+class CountedInt(int):
+    """
+    统计乘法次数的int：两个操作数都是CountedInt（域元素）时计为field_mul，同一对象自乘计为
+    field_sqr；与公式中的字面常数（2*x、3*x等）相乘不计。计数只取决于公式的结构，与数值无关。
+    其余算术与位运算的结果仍为CountedInt，使内联运算符写成的公式可以被完整计数。
+    """
+
+    __slots__ = ()
+
+    def __mul__(self, other):
+        result = int.__mul__(self, other)
+        if result is NotImplemented:
+            return result
+        if isinstance(other, CountedInt):
+            OPERATION_COUNTS['field_sqr' if other is self else 'field_mul'] += 1
+        return CountedInt(result)
+
+    __rmul__ = __mul__
+
+    def __pow__(self, exponent, modulus=None):
+        OPERATION_COUNTS['field_pow'] += 1
+        return CountedInt(pow(int(self), int(exponent), None if modulus is None else int(modulus)))
+
+    def __repr__(self):
+        return f"CountedInt({int(self)})"
+
+
+def _counted(name):
+    method = getattr(int, name)
+    if name in ('__neg__', '__pos__', '__abs__', '__invert__'):
+        return lambda self: CountedInt(method(self))
+
+    def wrapped(self, other):
+        result = method(self, other)
+        return result if result is NotImplemented else CountedInt(result)
+    return wrapped
+
+
+for _name in ('__add__', '__radd__', '__sub__', '__rsub__', '__mod__', '__rmod__',
+              '__floordiv__', '__rfloordiv__', '__and__', '__rand__', '__or__', '__ror__',
+              '__xor__', '__rxor__', '__lshift__', '__rshift__',
+              '__neg__', '__pos__', '__abs__', '__invert__'):
+    setattr(CountedInt, _name, _counted(_name))
+
+
+class CountingBackend(IntBackend):
+    """运算计数后端：域元素为CountedInt，求逆与模幂通过接口计数"""
+
+    name = 'counting'
+    element = CountedInt
+
+    @staticmethod
+    def inv(a, p):
+        OPERATION_COUNTS['field_inv'] += 1
+        return CountedInt(IntBackend.inv(int(a), int(p)))
+
+    @staticmethod
+    def powmod(a, e, p):
+        OPERATION_COUNTS['field_pow'] += 1
+        return CountedInt(pow(int(a), int(e), int(p)))
+
+
+_BACKEND_CLASSES = {'gmpy2': Gmpy2Backend, 'int': IntBackend, 'xmpz': XmpzBackend, 'counting': CountingBackend}
+_instances: Dict[str, IntBackend] = {}
+
+
+def available_backends() -> list:
+    """当前环境可用的后端名称"""
+    return [name for name in BACKEND_NAMES if name == 'int' or _has_gmpy2()]
+
+
+def _instance(name: str) -> IntBackend:
+    if name not in _BACKEND_CLASSES:
+        raise ValueError(f"Unknown backend: {name}")
+    if name not in _instances:
+        _instances[name] = _BACKEND_CLASSES[name]()
+    return _instances[name]
+
+
+def benchmark_backend(backend: IntBackend, rounds: int = AUTOTUNE_ROUNDS) -> float:
+    """
+    后端微基准测试（秒）：按点运算中的比例混合内联乘法取模、接口调用与求逆，
+    内联运算符由后端的数值类型分派，反映Jacobian核心循环的实际开销。
+    """
+    E = backend.element
+    p = E(_SM2_P)
+    x, y, z = E(_SM2_P // 3), E(_SM2_P // 5), E(_SM2_P // 7)
+    start = time.perf_counter()
+    for i in range(rounds):
+        zz = z * z % p
+        u = x * zz % p
+        s = y * z * zz % p
+        h = (u - x) % p
+        x = (s * s - h * h * h - 2 * u) % p
+        y = backend.mul(s, h, p)
+        z = backend.sqr(backend.reduce(z * h + 1, p), p)
+        if i % 64 == 0:
+            backend.inv(z, p)
+    return time.perf_counter() - start
+
+
+def _cache_key() -> str:
+    gmpy2_version = _import_gmpy2().version() if _has_gmpy2() else 'none'
+    return f"{platform.python_implementation()}-{platform.python_version()}-gmpy2-{gmpy2_version}"
+
+
+def autotune(cache_path: Optional[str] = None, force: bool = False) -> str:
+    """
+    微基准测试选出最快后端并缓存到cache_path；缓存与当前解释器/gmpy2版本匹配时直接使用。
+    """
+    path = cache_path or os.environ.get(CACHE_ENV) or DEFAULT_CACHE_PATH
+    if not force:
+        try:
+            with open(path) as f:
+                cached = json.load(f)
+            if cached.get('key') == _cache_key() and cached.get('backend') in available_backends():
+                return cached['backend']
+        except (OSError, ValueError):
+            pass
+
+    timings = {}
+    for name in available_backends():
+        backend = _instance(name)
+        benchmark_backend(backend, AUTOTUNE_ROUNDS // 10)
+        timings[name] = min(benchmark_backend(backend) for _ in range(5))
+    best = min(timings, key=timings.get)
+
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'key': _cache_key(), 'backend': best, 'timings': timings}, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        # 缓存不可写时只影响下次启动
+        pass
+    return best
+
+
+def get_backend(name: Optional[str] = None) -> IntBackend:
+    """按名称取得后端；name为None时按环境变量与可用性选择，'auto'表示自动调优"""
+    if name is None:
+        name = os.environ.get(BACKEND_ENV) or ('gmpy2' if _has_gmpy2() else 'int')
+    if name == 'auto':
+        name = autotune()
+    return _instance(name)
+
+
+def main():
+    """演示：各后端微基准测试与自动调优结果"""
+    print("=== SM2大整数后端 ===")
+    for name in available_backends():
+        elapsed = min(benchmark_backend(_instance(name)) for _ in range(3))
+        print(f"{name:<6}: {elapsed / AUTOTUNE_ROUNDS * 1e6:.2f} 微秒/轮")
+    print(f"自动调优选择: {autotune(force=True)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,11 +12,16 @@ import hmac
 import os
 import random
 import time
+from collections import OrderedDict
 from typing import Tuple, Optional, Union
 import gmpy2
 from gmpy2 import mpz
 
 
+# 已验证公钥缓存的最大条目数
+VALIDATION_CACHE_SIZE = 1024
+
+
 class SM2Curve:
     """SM2椭圆曲线参数类"""
     
@@ -36,8 +41,29 @@ class SM2Curve:
         self.h = 1  # 余因子
 
 
+def _affine_add(P: Optional[Tuple[mpz, mpz]], Q: Optional[Tuple[mpz, mpz]],
+                a: mpz, p: mpz) -> Optional[Tuple[mpz, mpz]]:
+    """仿射坐标元组上的点加法，None表示无穷远点（供标量乘法循环使用，不创建点对象）"""
+    if P is None:
+        return Q
+    if Q is None:
+        return P
+    x1, y1 = P
+    x2, y2 = Q
+    if x1 == x2:
+        if y1 != y2 or y1 == 0:
+            return None
+        lam = (3 * x1 * x1 + a) * gmpy2.invert(2 * y1, p) % p
+    else:
+        lam = (y2 - y1) * gmpy2.invert(x2 - x1, p) % p
+    x3 = (lam * lam - x1 - x2) % p
+    return x3, (lam * (x1 - x3) - y1) % p
+
+
 class SM2Point:
     """椭圆曲线点类"""
+
+    __slots__ = ('x', 'y', 'curve', 'infinity')
     
     def __init__(self, x: int, y: int, curve: SM2Curve):
         self.x = mpz(x)
@@ -91,16 +117,23 @@ class SM2Point:
         if k == 0:
             return SM2Point.infinity_point(self.curve)
         
-        result = SM2Point.infinity_point(self.curve)
-        addend = self
+        if self.infinity:
+            return self
+        
+        # 循环内只处理坐标元组，结果在返回时才转换为点对象
+        a, p = self.curve.a, self.curve.p
+        result = None
+        addend = (self.x, self.y)
         
         while k:
             if k & 1:
-                result = result + addend
-            addend = addend + addend
+                result = _affine_add(result, addend, a, p)
+            addend = _affine_add(addend, addend, a, p)
             k >>= 1
         
-        return result
+        if result is None:
+            return SM2Point.infinity_point(self.curve)
+        return SM2Point(result[0], result[1], self.curve)
     
     def __rmul__(self, k):
         return self * k
@@ -112,6 +145,8 @@ class SM2:
     def __init__(self):
         self.curve = SM2Curve()
         self.G = SM2Point(self.curve.Gx, self.curve.Gy, self.curve)
+        # 已验证公钥缓存 (LRU)
+        self._validated_keys = OrderedDict()
     
     def generate_keypair(self) -> Tuple[int, SM2Point]:
         """生成SM2密钥对"""
@@ -119,28 +154,49 @@ class SM2:
             private_key = random.randint(1, self.curve.n - 1)
             public_key = private_key * self.G
             
-            # 验证公钥有效性
-            if self._is_valid_public_key(public_key):
+            # d * G 必为n阶点，只需检查曲线方程
+            if self._is_on_curve(public_key):
                 return private_key, public_key
     
-    def _is_valid_public_key(self, public_key: SM2Point) -> bool:
-        """验证公钥有效性"""
-        if public_key.infinity:
+    def _is_on_curve(self, point: SM2Point) -> bool:
+        """检查点坐标在[0, p)范围内且满足曲线方程"""
+        if point.infinity:
             return False
-        
-        # 检查点是否在曲线上
-        left = (public_key.y * public_key.y) % self.curve.p
-        right = (public_key.x * public_key.x * public_key.x + 
-                self.curve.a * public_key.x + self.curve.b) % self.curve.p
-        
-        if left != right:
+        p = self.curve.p
+        if not (0 <= point.x < p and 0 <= point.y < p):
             return False
-        
-        # 检查阶数
-        if public_key * self.curve.n != SM2Point.infinity_point(self.curve):
+        left = (point.y * point.y) % p
+        right = (point.x * point.x * point.x + self.curve.a * point.x + self.curve.b) % p
+        return left == right
+
+    def _is_valid_public_key(self, public_key: SM2Point) -> bool:
+        """
+        验证公钥有效性。SM2曲线余因子h = 1，群阶为素数n，曲线上任意非无穷远点的阶都是n，
+        因此只需检查坐标范围与曲线方程；仅当h != 1时才回退到 n * P == O 检查。
+        """
+        key = (int(public_key.x), int(public_key.y))
+        if not public_key.infinity and key in self._validated_keys:
+            self._validated_keys.move_to_end(key)
+            return True
+
+        if not self._is_on_curve(public_key):
             return False
-        
+
+        # 检查阶数 (仅余因子不为1时需要)
+        if self.curve.h != 1 and public_key * self.curve.n != SM2Point.infinity_point(self.curve):
+            return False
+
+        self._validated_keys[key] = True
+        if len(self._validated_keys) > VALIDATION_CACHE_SIZE:
+            self._validated_keys.popitem(last=False)
         return True
+
+    def import_public_key(self, x: int, y: int) -> SM2Point:
+        """导入外部公钥：验证后返回点对象，验证结果缓存以便重复导入"""
+        public_key = SM2Point(x, y, self.curve)
+        if not self._is_valid_public_key(public_key):
+            raise ValueError("Invalid public key")
+        return public_key
     
     def _hash_message(self, message: bytes, public_key: SM2Point) -> bytes:
         """SM3哈希函数"""
@@ -232,8 +288,8 @@ class SM2:
         """SM2解密"""
         C1, C2, C3 = ciphertext
     
-        # 验证C1是否在曲线上
-        if not self._is_valid_public_key(C1):
+        # 验证C1是否在曲线上 (h = 1，无需 n * C1 检查；临时点不进入公钥缓存)
+        if not self._is_on_curve(C1):
             raise ValueError("Invalid C1 point")
     
         # 计算h * C1
@@ -279,60 +335,15 @@ class SM2:
         data = str(point.x).encode() + str(point.y).encode() + message
         return hashlib.sha256(data).digest()
     
-    def benchmark(self, iterations: int = 1000):
-        """性能基准测试"""
-        print(f"=== SM2基本实现性能基准测试 ({iterations} 次迭代) ===")
-        
-        # 生成密钥对
-        print("生成密钥对...")
-        start_time = time.time()
-        private_key, public_key = self.generate_keypair()
-        keygen_time = time.time() - start_time
-        print(f"密钥生成时间: {keygen_time:.4f} 秒")
-        
-        # 测试签名性能
-        message = b"Benchmark test message for SM2 basic implementation"
-        print(f"\n测试签名性能...")
-        
-        start_time = time.time()
-        for _ in range(iterations):
-            signature = self.sign(message, private_key, public_key)
-        sign_time = time.time() - start_time
-        print(f"平均签名时间: {sign_time/iterations:.6f} 秒")
-        
-        # 测试验证性能
-        print(f"测试验证性能...")
-        start_time = time.time()
-        for _ in range(iterations):
-            is_valid = self.verify(message, signature, public_key)
-        verify_time = time.time() - start_time
-        print(f"平均验证时间: {verify_time/iterations:.6f} 秒")
-        
-        # 测试加密性能
-        print(f"\n测试加密性能...")
-        start_time = time.time()
-        for _ in range(iterations):
-            ciphertext = self.encrypt(message, public_key)
-        encrypt_time = time.time() - start_time
-        print(f"平均加密时间: {encrypt_time/iterations:.6f} 秒")
-        
-        # 测试解密性能
-        print(f"测试解密性能...")
-        start_time = time.time()
-        for _ in range(iterations):
-            decrypted = self.decrypt(ciphertext, private_key)
-        decrypt_time = time.time() - start_time
-        print(f"平均解密时间: {decrypt_time/iterations:.6f} 秒")
-        
-        # 性能总结
-        print(f"\n=== 性能总结 ===")
-        print(f"密钥生成: {keygen_time:.4f}秒")
-        print(f"签名: {sign_time/iterations:.6f}秒/次")
-        print(f"验证: {verify_time/iterations:.6f}秒/次")
-        print(f"加密: {encrypt_time/iterations:.6f}秒/次")
-        print(f"解密: {decrypt_time/iterations:.6f}秒/次")
-        print(f"总操作次数: {iterations * 4}")
-        print(f"总时间: {keygen_time + sign_time + verify_time + encrypt_time + decrypt_time:.4f}秒")
+    def benchmark(self, iterations: int = 1000) -> dict:
+        """性能基准测试（见performance模块），iterations为每项操作的最大迭代次数"""
+        try:
+            from .performance import benchmark_implementation, print_report
+        except ImportError:  # 以顶层模块方式导入（src目录在sys.path中）
+            from performance import benchmark_implementation, print_report
+        results = benchmark_implementation(self, max_iterations=iterations)
+        print_report({'results': {'basic': results}})
+        return results
 
 
 def main():
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Operation Counting
+SM2运算计数
+
+count_operations() 上下文管理器统计其中执行的运算次数：
+    field_mul / field_sqr / field_inv / field_pow   域运算（使用counting后端的实例，
+                                                    如 OptimizedSM2(backend='counting')）
+    point_add / point_double                        点加（含混合加法、co-Z加法）与点加倍
+    table_lookup                                    预计算表的掩码查表
+
+域运算由sm2_backend.CountingBackend的数值类型计数；点运算与查表计数在进入上下文时把
+sm2_optimized、sm2_msm、sm2_basic中的核心函数替换为计数包装，退出时恢复。
+不计数时运行的是原函数与原后端，没有任何额外开销。计数与输入无关的实现
+（固定基表、scalar_mult='window'）得到的是确定的运算量，可作为CI中无噪声的性能指标。
+并行模式下子进程中的运算不计入。
+"""
+
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+try:
+    from .sm2_backend import OPERATION_COUNTS
+except ImportError:  # 以顶层模块方式导入（src目录在sys.path中）
+    from sm2_backend import OPERATION_COUNTS
+
+
+def _affine_kind(P, Q, a, p) -> str:
+    """sm2_basic._affine_add 在 P == Q 时执行点加倍"""
+    return 'point_double' if P is not None and P == Q else 'point_add'
+
+
+# 各模块中被计数的函数与对应的计数项（可调用对象按参数判断计数项）
+COUNTED_FUNCTIONS = {
+    'sm2_optimized': {
+        '_jacobian_double': 'point_double',
+        '_jacobian_add': 'point_add',
+        '_jacobian_add_affine': 'point_add',
+        '_xycz_add': 'point_add',
+        '_xycz_addc': 'point_add',
+        '_masked_select': 'table_lookup',
+    },
+    'sm2_msm': {
+        '_jacobian_double': 'point_double',
+        '_jacobian_add': 'point_add',
+        '_jacobian_add_affine': 'point_add',
+    },
+    'sm2_basic': {
+        '_affine_add': _affine_kind,
+    },
+}
+
+_lock = threading.Lock()
+_depth = 0
+_patched = []
+
+
+def _counting(function, kind):
+    if callable(kind):
+        @wraps(function)
+        def wrapper(*args):
+            OPERATION_COUNTS[kind(*args)] += 1
+            return function(*args)
+    else:
+        @wraps(function)
+        def wrapper(*args):
+            OPERATION_COUNTS[kind] += 1
+            return function(*args)
+    return wrapper
+
+
+def _loaded_modules(name: str):
+    """包内导入(src.name)与顶层导入(name)的模块对象"""
+    for module_name in (f"{__package__}.{name}" if __package__ else None, name):
+        module = sys.modules.get(module_name) if module_name else None
+        if module is not None:
+            yield module
+
+
+def _install():
+    for name, functions in COUNTED_FUNCTIONS.items():
+        for module in _loaded_modules(name):
+            for attribute, kind in functions.items():
+                original = getattr(module, attribute, None)
+                if original is not None:
+                    _patched.append((module, attribute, original))
+                    setattr(module, attribute, _counting(original, kind))
+
+
+def _uninstall():
+    while _patched:
+        module, attribute, original = _patched.pop()
+        setattr(module, attribute, original)
+
+
+@contextmanager
+def count_operations():
+    """
+    统计上下文内执行的运算次数，退出时填入产生的Counter。可嵌套；计数对全进程（所有线程）生效。
+
+    用法:
+        sm2 = OptimizedSM2(use_parallel=False, backend='counting')
+        with count_operations() as counts:
+            sm2.sign(message, private_key, public_key)
+        counts['field_mul'], counts['point_add'], ...
+    """
+    global _depth
+    with _lock:
+        if _depth == 0:
+            _install()
+        _depth += 1
+    counts = Counter()
+    start = OPERATION_COUNTS.copy()
+    try:
+        yield counts
+    finally:
+        counts.update(OPERATION_COUNTS - start)
+        with _lock:
+            _depth -= 1
+            if _depth == 0:
+                _uninstall()
+
+
+def main():
+    """演示：签名、验证、加解密各自的运算次数"""
+    try:
+        from .sm2_optimized import OptimizedSM2
+    except ImportError:
+        from sm2_optimized import OptimizedSM2
+
+    print("=== SM2运算计数 ===")
+    sm2 = OptimizedSM2(use_parallel=False, scalar_mult='window', backend='counting')
+    private_key, public_key = sm2.generate_keypair()
+    message = b"operation counts"
+    sm2.base_table
+    signature = sm2.sign(message, private_key, public_key)
+    ciphertext = sm2.encrypt(message, public_key)
+
+    operations = {
+        '签名': lambda: sm2.sign(message, private_key, public_key),
+        '验证': lambda: sm2.verify(message, signature, public_key),
+        '加密': lambda: sm2.encrypt(message, public_key),
+        '解密': lambda: sm2.decrypt(ciphertext, private_key),
+    }
+    for label, operation in operations.items():
+        with count_operations() as counts:
+            operation()
+        print(f"{label}: " + ", ".join(f"{key}={value}" for key, value in sorted(counts.items())))
+
+
+if __name__ == "__main__":
+    main()
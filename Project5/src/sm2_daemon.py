@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SM2 Local Socket Daemon
+SM2本地套接字服务守护进程
+
+通过Unix域套接字提供sign/verify/encrypt/decrypt服务。每台主机只需一个守护进程：
+预计算表与公钥缓存常驻在工作进程中，并发请求经AsyncSM2合并为微批执行。
+
+帧格式（大端）：
+    请求  request_id(u32) | op(u8)     | length(u32) | payload
+    响应  request_id(u32) | status(u8) | length(u32) | payload
+标量与坐标固定32字节；同一连接上的请求可流水线发送，响应按完成顺序返回并以request_id匹配。
+"""
+
+import argparse
+import asyncio
+import os
+import struct
+import time
+from typing import Any, Dict, Optional, Tuple
+from .sm2_async import AsyncSM2
+from .sm2_optimized import OptimizedSM2Curve, OptimizedSM2Point
+
+
+OP_SIGN = 1
+OP_VERIFY = 2
+OP_ENCRYPT = 3
+OP_DECRYPT = 4
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+HEADER = struct.Struct('>IBI')
+MAX_PAYLOAD = 16 * 1024 * 1024
+DEFAULT_SOCKET = '/tmp/sm2d.sock'
+
+
+def _int32(value: int) -> bytes:
+    return int(value).to_bytes(32, 'big')
+
+
+def _xy(point: Any) -> Tuple[int, int]:
+    """接受点对象或 (x, y) 元组"""
+    if isinstance(point, tuple):
+        return int(point[0]), int(point[1])
+    return int(point.x), int(point.y)
+
+
+def _split(payload: bytes, count: int) -> Tuple[list, bytes]:
+    """取出payload开头的count个32字节整数，返回整数列表与剩余字节"""
+    if len(payload) < 32 * count:
+        raise ValueError("Truncated payload")
+    values = [int.from_bytes(payload[32 * i:32 * (i + 1)], 'big') for i in range(count)]
+    return values, payload[32 * count:]
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Tuple[int, int, bytes]:
+    header = await reader.readexactly(HEADER.size)
+    request_id, code, length = HEADER.unpack(header)
+    if length > MAX_PAYLOAD:
+        raise ValueError("Frame too large")
+    return request_id, code, await reader.readexactly(length)
+
+
+class SM2Daemon:
+    """SM2 Unix域套接字服务"""
+
+    def __init__(self, path: str = DEFAULT_SOCKET, **service_options):
+        """
+        Args:
+            path: 套接字路径
+            service_options: 传给AsyncSM2的参数（批大小、截止时间、进程数等）
+        """
+        self.path = path
+        self.service = AsyncSM2(**service_options)
+        self.curve = OptimizedSM2Curve()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: set = set()
+        self.stats = {'connections': 0, 'requests': 0, 'errors': 0}
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """启动服务；已存在的套接字文件会被替换"""
+        await self.service.start()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle_connection, path=self.path)
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        # 结束仍在等待请求的连接，再关闭后端
+        for task in list(self._connections):
+            task.cancel()
+        if self._connections:
+            await asyncio.gather(*self._connections, return_exceptions=True)
+        await self.service.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def _point(self, x: int, y: int) -> OptimizedSM2Point:
+        return OptimizedSM2Point(x, y, self.curve)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """读取请求帧并为每个请求创建任务，实现同一连接上的流水线处理"""
+        self.stats['connections'] += 1
+        current = asyncio.current_task()
+        self._connections.add(current)
+        tasks = set()
+        try:
+            while True:
+                try:
+                    request_id, op, payload = await _read_frame(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except ValueError:
+                    # 帧长度非法时无法继续同步，关闭连接
+                    break
+                task = asyncio.ensure_future(self._handle_request(request_id, op, payload, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except asyncio.CancelledError:
+            # 服务关闭时正常退出，不向流回调传播取消
+            pass
+        finally:
+            self._connections.discard(current)
+            writer.close()
+
+    async def _handle_request(self, request_id: int, op: int, payload: bytes, writer: asyncio.StreamWriter):
+        self.stats['requests'] += 1
+        try:
+            status, body = STATUS_OK, await self._dispatch(op, payload)
+        except Exception as e:
+            self.stats['errors'] += 1
+            status, body = STATUS_ERROR, str(e).encode('utf-8')
+        if not writer.is_closing():
+            writer.write(HEADER.pack(request_id, status, len(body)) + body)
+
+    async def _dispatch(self, op: int, payload: bytes) -> bytes:
+        if op == OP_SIGN:
+            (d, x, y), message = _split(payload, 3)
+            r, s = await self.service.asign(message, d, self._point(x, y))
+            return _int32(r) + _int32(s)
+        if op == OP_VERIFY:
+            (x, y, r, s), message = _split(payload, 4)
+            valid = await self.service.averify(message, (r, s), self._point(x, y))
+            return b'\x01' if valid else b'\x00'
+        if op == OP_ENCRYPT:
+            (x, y), message = _split(payload, 2)
+            C1, C2, C3 = await self.service.aencrypt(message, self._point(x, y))
+            return _int32(C1.x) + _int32(C1.y) + C3 + C2
+        if op == OP_DECRYPT:
+            (d, x, y), rest = _split(payload, 3)
+            C3, C2 = rest[:32], rest[32:]
+            return await self.service.adecrypt((self._point(x, y), C2, C3), d)
+        raise ValueError(f"Unknown operation: {op}")
+
+
+class SM2DaemonClient:
+    """SM2守护进程的轻量客户端：单连接流水线发送请求，按request_id匹配响应"""
+
+    def __init__(self, path: str = DEFAULT_SOCKET):
+        self.path = path
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 0
+        self._reader_task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+        self._reader_task = asyncio.ensure_future(self._read_responses())
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+            self._writer = None
+        if self._reader_task is not None:
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+            self._reader_task = None
+
+    async def _read_responses(self):
+        try:
+            while True:
+                request_id, status, body = await _read_frame(self._reader)
+                future = self._pending.pop(request_id, None)
+                if future is None or future.done():
+                    continue
+                if status == STATUS_OK:
+                    future.set_result(body)
+                else:
+                    future.set_exception(ValueError(body.decode('utf-8', 'replace')))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError(f"Daemon connection lost: {e}"))
+            self._pending.clear()
+
+    async def _request(self, op: int, payload: bytes) -> bytes:
+        request_id = self._next_id
+        self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(HEADER.pack(request_id, op, len(payload)) + payload)
+        try:
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def sign(self, message: bytes, private_key: int, public_key: Any) -> Tuple[int, int]:
+        x, y = _xy(public_key)
+        body = await self._request(OP_SIGN, _int32(private_key) + _int32(x) + _int32(y) + message)
+        return int.from_bytes(body[:32], 'big'), int.from_bytes(body[32:64], 'big')
+
+    async def verify(self, message: bytes, signature: Tuple[int, int], public_key: Any) -> bool:
+        x, y = _xy(public_key)
+        r, s = signature
+        body = await self._request(OP_VERIFY, _int32(x) + _int32(y) + _int32(r) + _int32(s) + message)
+        return body == b'\x01'
+
+    async def encrypt(self, message: bytes, public_key: Any) -> Tuple[Tuple[int, int], bytes, bytes]:
+        """返回 ((C1.x, C1.y), C2, C3)"""
+        x, y = _xy(public_key)
+        body = await self._request(OP_ENCRYPT, _int32(x) + _int32(y) + message)
+        (cx, cy), rest = _split(body, 2)
+        return (cx, cy), rest[32:], rest[:32]
+
+    async def decrypt(self, ciphertext: Tuple[Any, bytes, bytes], private_key: int) -> bytes:
+        C1, C2, C3 = ciphertext
+        x, y = _xy(C1)
+        return await self._request(OP_DECRYPT, _int32(private_key) + _int32(x) + _int32(y) + C3 + C2)
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def load_test(path: str = DEFAULT_SOCKET, requests: int = 2000, concurrency: int = 256,
+                    op: str = 'verify', connections: int = 4, message_size: int = 64) -> Dict[str, Any]:
+    """
+    对本地守护进程压测：connections条连接上共维持concurrency个并发请求，
+    返回QPS与延迟分位数（毫秒）。
+    """
+    from .sm2_optimized import OptimizedSM2
+
+    sm2 = OptimizedSM2(use_parallel=False)
+    private_key, public_key = sm2.generate_keypair()
+    message = os.urandom(message_size)
+    signature = sm2.sign(message, private_key, public_key)
+    ciphertext = sm2.encrypt(message, public_key)
+
+    clients = [SM2DaemonClient(path) for _ in range(connections)]
+    for client in clients:
+        await client.connect()
+
+    calls = {
+        'sign': lambda c: c.sign(message, private_key, public_key),
+        'verify': lambda c: c.verify(message, signature, public_key),
+        'encrypt': lambda c: c.encrypt(message, public_key),
+        'decrypt': lambda c: c.decrypt(ciphertext, private_key),
+    }
+    call = calls[op]
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await call(clients[i % connections])
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    for client in clients:
+        await client.close()
+
+    latencies.sort()
+    return {
+        'op': op,
+        'requests': requests,
+        'concurrency': concurrency,
+        'errors': errors,
+        'qps': requests / elapsed,
+        'p50_ms': _percentile(latencies, 0.50) * 1000,
+        'p95_ms': _percentile(latencies, 0.95) * 1000,
+        'p99_ms': _percentile(latencies, 0.99) * 1000,
+        'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+def main():
+    """命令行入口：serve 启动守护进程，loadtest 压测已运行的守护进程"""
+    parser = argparse.ArgumentParser(description="SM2 Unix域套接字服务")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve = sub.add_parser('serve', help="启动守护进程")
+    serve.add_argument('--socket', default=DEFAULT_SOCKET)
+    serve.add_argument('--processes', type=int, default=None)
+    serve.add_argument('--batch-size', type=int, default=64)
+    serve.add_argument('--max-delay', type=float, default=0.002)
+
+    bench = sub.add_parser('loadtest', help="压测守护进程")
+    bench.add_argument('--socket', default=DEFAULT_SOCKET)
+    bench.add_argument('--op', choices=['sign', 'verify', 'encrypt', 'decrypt'], default='verify')
+    bench.add_argument('--requests', type=int, default=2000)
+    bench.add_argument('--concurrency', type=int, default=256)
+    bench.add_argument('--connections', type=int, default=4)
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        daemon = SM2Daemon(args.socket, processes=args.processes,
+                           max_batch_size=args.batch_size, max_delay=args.max_delay)
+        print(f"SM2守护进程监听: {args.socket}")
+        try:
+            asyncio.run(daemon.serve_forever())
+        except KeyboardInterrupt:
+            pass
+    else:
+        report = asyncio.run(load_test(args.socket, args.requests, args.concurrency, args.op, args.connections))
+        print(f"操作: {report['op']}  请求数: {report['requests']}  并发: {report['concurrency']}")
+        print(f"QPS: {report['qps']:.1f}  错误: {report['errors']}")
+        print(f"延迟 p50/p95/p99/max: {report['p50_ms']:.2f}/{report['p95_ms']:.2f}/"
+              f"{report['p99_ms']:.2f}/{report['max_ms']:.2f} 毫秒")
+
+
+if __name__ == "__main__":
+    main()
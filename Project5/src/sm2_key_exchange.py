@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SM2 Key Exchange
+SM2密钥交换协议 (GB/T 32918.3)
+
+发起方A与响应方B各持长期密钥对与身份标识，交换临时公钥RA、RB后计算
+    t = (d + x̄·r) mod n,  V = h·t·(P_peer + x̄_peer·R_peer)
+并由V与双方的Z值派生共享密钥，可选地交换确认值 S_B = Hash(0x02 || yV || Hash(...))、
+S_A = Hash(0x03 || yV || Hash(...))。
+
+    V按 t·P_peer + (t·x̄_peer mod n)·R_peer 用Straus交错wNAF一次计算（共用一条倍点链），
+    不先算 x̄·R + P 再乘t；
+    EphemeralKeyPool 在后台预计算临时密钥对 (r, rG)（固定基表 + 批量求逆），
+    握手在线部分只剩上述一次双标量乘法。
+
+与本项目的签名、加密一致，杂凑函数使用SHA-256，KDF使用OptimizedSM2._kdf_bytes。
+"""
+
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import deque
+from typing import Optional, Tuple
+try:
+    from .sm2_msm import msm
+    from .sm2_optimized import OptimizedSM2, OptimizedSM2Point, _batch_to_affine
+except ImportError:  # 以顶层模块方式导入（src目录在sys.path中）
+    from sm2_msm import msm
+    from sm2_optimized import OptimizedSM2, OptimizedSM2Point, _batch_to_affine
+
+
+# 默认用户身份标识（GB/T 32918 推荐的默认值）
+DEFAULT_IDENTITY = b'1234567812345678'
+
+# 默认协商密钥长度（字节）
+KEY_LENGTH = 16
+
+# 临时密钥池的默认容量；剩余数量低于容量的该比例时在后台补充
+EPHEMERAL_POOL_SIZE = 32
+EPHEMERAL_LOW_WATER = 0.5
+
+COORD_SIZE = 32
+
+
+def _encode(value) -> bytes:
+    return int(value).to_bytes(COORD_SIZE, 'big')
+
+
+def compute_z(curve, identity: bytes, public_key: OptimizedSM2Point) -> bytes:
+    """Z = Hash(ENTL || ID || a || b || Gx || Gy || x || y)，ENTL为ID的比特长度（2字节）"""
+    if len(identity) * 8 > 0xFFFF:
+        raise ValueError("Identity too long")
+    data = (len(identity) * 8).to_bytes(2, 'big') + identity + b''.join(
+        _encode(value) for value in (curve.a, curve.b, curve.Gx, curve.Gy, public_key.x, public_key.y))
+    return hashlib.sha256(data).digest()
+
+
+def _reduced_x(x, n: int) -> int:
+    """x̄ = 2^w + (x & (2^w - 1))，w = ⌈⌈log2 n⌉/2⌉ - 1"""
+    w = (n.bit_length() + 1) // 2 - 1
+    return (1 << w) | (int(x) & ((1 << w) - 1))
+
+
+def _shared_point(t: int, x_bar: int, public_key: OptimizedSM2Point,
+                  ephemeral: OptimizedSM2Point, joint: bool = True) -> OptimizedSM2Point:
+    """
+    V = t·(P + x̄·R)（余因子h = 1）。joint为True时按 t·P + (t·x̄)·R 做一次双标量乘法，
+    否则先算 P + x̄·R 再乘t（用于对比）。
+    """
+    n = int(public_key.curve.n)
+    if joint:
+        return msm((t, t * x_bar % n), (public_key, ephemeral), 'straus')
+    return (public_key + ephemeral * x_bar) * t
+
+
+class EphemeralKeyPool:
+    """
+    预计算的临时密钥对 (r, R = rG)。take() 取出一对；池为空时同步生成，
+    剩余数量低于低水位时在OptimizedSM2的共享线程池中补充到容量。
+    """
+
+    def __init__(self, sm2: OptimizedSM2, size: int = EPHEMERAL_POOL_SIZE,
+                 low_water: float = EPHEMERAL_LOW_WATER, background: bool = True):
+        if size < 1:
+            raise ValueError("Pool size must be positive")
+        self.sm2 = sm2
+        self.size = size
+        self.low_water = int(size * low_water)
+        self.background = background
+        # 池为空、同步生成的次数
+        self.misses = 0
+        self._keys = deque()
+        self._lock = threading.Lock()
+        self._refilling = False
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _generate(self, count: int):
+        """批量生成临时密钥对：rG使用G的固定基表，一次批量求逆转换为仿射坐标"""
+        n = int(self.sm2.curve.n)
+        table = self.sm2.base_table
+        scalars = [secrets.randbelow(n - 1) + 1 for _ in range(count)]
+        points = _batch_to_affine([table.multiply_jacobian(r) for r in scalars], self.sm2.curve)
+        return list(zip(scalars, points))
+
+    def fill(self) -> None:
+        """补充到容量"""
+        try:
+            missing = self.size - len(self._keys)
+            if missing > 0:
+                keys = self._generate(missing)
+                with self._lock:
+                    self._keys.extend(keys)
+        finally:
+            self._refilling = False
+
+    def take(self) -> Tuple[int, OptimizedSM2Point]:
+        """取出一个临时密钥对（每对只使用一次）"""
+        with self._lock:
+            key = self._keys.popleft() if self._keys else None
+            refill = self.background and not self._refilling and len(self._keys) < self.low_water
+            if refill:
+                self._refilling = True
+        if refill:
+            self.sm2._thread_pool.submit(self.fill)
+        if key is None:
+            self.misses += 1
+            key = self._generate(1)[0]
+        return key
+
+
+class KeyExchangeSession:
+    """一次密钥交换中本方的状态；临时私钥在derive后清除，会话不可重复使用"""
+
+    def __init__(self, party: 'SM2KeyExchange', peer_identity: bytes,
+                 peer_public_key: OptimizedSM2Point, initiator: bool, klen: int):
+        sm2 = party.sm2
+        if not sm2._is_valid_public_key(peer_public_key):
+            raise ValueError("Invalid public key")
+        self.party = party
+        self.peer_public_key = peer_public_key
+        self.peer_z = compute_z(sm2.curve, peer_identity, peer_public_key)
+        self.initiator = initiator
+        self.klen = klen
+        if party.pool is not None:
+            self._r, self.ephemeral_public = party.pool.take()
+        else:
+            self._r = secrets.randbelow(int(sm2.curve.n) - 1) + 1
+            self.ephemeral_public = sm2.base_table.multiply(self._r)
+        self._expected_confirmation = None
+
+    def derive(self, peer_ephemeral: OptimizedSM2Point,
+               peer_confirmation: Optional[bytes] = None) -> Tuple[bytes, bytes]:
+        """
+        由对方临时公钥计算共享密钥。
+
+        Args:
+            peer_ephemeral: 对方的临时公钥
+            peer_confirmation: 发起方可传入响应方的确认值S_B进行校验（不匹配时抛出ValueError）
+
+        Returns:
+            (共享密钥, 发送给对方的确认值)：响应方为S_B，发起方为S_A
+        """
+        if self._r is None:
+            raise ValueError("Session already used")
+        sm2 = self.party.sm2
+        curve = sm2.curve
+        n = int(curve.n)
+        if not sm2._is_on_curve(peer_ephemeral):
+            raise ValueError("Invalid ephemeral public key")
+
+        r, self._r = self._r, None
+        t = (self.party.private_key + _reduced_x(self.ephemeral_public.x, n) * r) % n
+        V = _shared_point(t, _reduced_x(peer_ephemeral.x, n), self.peer_public_key, peer_ephemeral)
+        if V.infinity:
+            raise ValueError("Key agreement failed")
+
+        if self.initiator:
+            z_a, z_b = self.party.z, self.peer_z
+            R_a, R_b = self.ephemeral_public, peer_ephemeral
+        else:
+            z_a, z_b = self.peer_z, self.party.z
+            R_a, R_b = peer_ephemeral, self.ephemeral_public
+        x_v, y_v = _encode(V.x), _encode(V.y)
+        key = sm2._kdf_bytes(x_v + y_v + z_a + z_b, self.klen)
+
+        inner = hashlib.sha256(x_v + z_a + z_b + b''.join(
+            _encode(value) for value in (R_a.x, R_a.y, R_b.x, R_b.y))).digest()
+        s_b = hashlib.sha256(b'\x02' + y_v + inner).digest()
+        s_a = hashlib.sha256(b'\x03' + y_v + inner).digest()
+
+        if self.initiator:
+            if peer_confirmation is not None and not hmac.compare_digest(peer_confirmation, s_b):
+                raise ValueError("Key confirmation failed")
+            return key, s_a
+        self._expected_confirmation = s_a
+        return key, s_b
+
+    def confirm(self, peer_confirmation: bytes) -> None:
+        """响应方校验发起方的确认值S_A，不匹配时抛出ValueError"""
+        if self._expected_confirmation is None:
+            raise ValueError("No confirmation expected")
+        if not hmac.compare_digest(peer_confirmation, self._expected_confirmation):
+            raise ValueError("Key confirmation failed")
+
+
+class SM2KeyExchange:
+    """密钥交换的一方：长期密钥对、身份标识与可选的临时密钥池"""
+
+    def __init__(self, sm2: OptimizedSM2, private_key: int, public_key: OptimizedSM2Point,
+                 identity: bytes = DEFAULT_IDENTITY, pool: Optional[EphemeralKeyPool] = None):
+        if not 1 <= private_key < sm2.curve.n:
+            raise ValueError("Invalid private key")
+        self.sm2 = sm2
+        self.private_key = private_key
+        self.public_key = public_key
+        self.identity = identity
+        self.pool = pool
+        self.z = compute_z(sm2.curve, identity, public_key)
+
+    def initiate(self, peer_identity: bytes, peer_public_key: OptimizedSM2Point,
+                 klen: int = KEY_LENGTH) -> KeyExchangeSession:
+        """作为发起方开始交换，将 session.ephemeral_public 发送给响应方"""
+        return KeyExchangeSession(self, peer_identity, peer_public_key, True, klen)
+
+    def respond(self, peer_identity: bytes, peer_public_key: OptimizedSM2Point,
+                klen: int = KEY_LENGTH) -> KeyExchangeSession:
+        """作为响应方开始交换，将 session.ephemeral_public 与derive返回的S_B发送给发起方"""
+        return KeyExchangeSession(self, peer_identity, peer_public_key, False, klen)
+
+
+def handshake(initiator: SM2KeyExchange, responder: SM2KeyExchange,
+              klen: int = KEY_LENGTH) -> Tuple[bytes, bytes]:
+    """在本地完成一次带确认的完整交换，返回 (发起方密钥, 响应方密钥)"""
+    session_a = initiator.initiate(responder.identity, responder.public_key, klen)
+    session_b = responder.respond(initiator.identity, initiator.public_key, klen)
+    key_b, s_b = session_b.derive(session_a.ephemeral_public)
+    key_a, s_a = session_a.derive(session_b.ephemeral_public, s_b)
+    session_b.confirm(s_a)
+    return key_a, key_b
+
+
+def benchmark_key_exchange(target_time: float = 1.0, max_iterations: int = 200) -> dict:
+    """
+    握手延迟与每秒握手数：不使用临时密钥池 / 使用预先填满的临时密钥池，
+    以及在线部分V的计算（双标量乘法与先加后乘的对比）。
+    """
+    try:
+        from .performance import WARMUP_ITERATIONS, measure
+    except ImportError:
+        from performance import WARMUP_ITERATIONS, measure
+
+    sm2 = OptimizedSM2(use_parallel=False)
+    sm2.base_table
+    keys = [sm2.generate_keypair() for _ in range(2)]
+    n = int(sm2.curve.n)
+    results = {}
+
+    parties = [SM2KeyExchange(sm2, d, P, f"party{i}".encode()) for i, (d, P) in enumerate(keys)]
+    results['handshake'] = measure(handshake, lambda: tuple(parties), target_time,
+                                   max_iterations=max_iterations)
+
+    pooled = [SM2KeyExchange(sm2, d, P, f"party{i}".encode(),
+                             EphemeralKeyPool(sm2, size=max_iterations + WARMUP_ITERATIONS, background=False))
+              for i, (d, P) in enumerate(keys)]
+    for party in pooled:
+        party.pool.fill()
+    results['handshake_pooled'] = measure(handshake, lambda: tuple(pooled), target_time,
+                                          max_iterations=max_iterations)
+
+    peer = keys[1][1]
+    ephemeral = sm2.base_table.multiply(secrets.randbelow(n - 1) + 1)
+    x_bar = _reduced_x(ephemeral.x, n)
+    for label, joint in (('shared_point_joint', True), ('shared_point_separate', False)):
+        results[label] = measure(lambda t, joint=joint: _shared_point(t, x_bar, peer, ephemeral, joint),
+                                 lambda: (secrets.randbelow(n - 1) + 1,), target_time,
+                                 max_iterations=max_iterations)
+    return results
+
+
+def main():
+    """演示：带确认的SM2密钥交换与握手性能"""
+    print("=== SM2密钥交换 (GB/T 32918.3) ===")
+    sm2 = OptimizedSM2(use_parallel=False)
+    alice = SM2KeyExchange(sm2, *sm2.generate_keypair(), identity=b'alice@example.com',
+                           pool=EphemeralKeyPool(sm2))
+    bob = SM2KeyExchange(sm2, *sm2.generate_keypair(), identity=b'bob@example.com',
+                         pool=EphemeralKeyPool(sm2))
+    for party in (alice, bob):
+        party.pool.fill()
+
+    start = time.perf_counter()
+    key_a, key_b = handshake(alice, bob)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"A的密钥: {key_a.hex()}")
+    print(f"B的密钥: {key_b.hex()}")
+    print(f"密钥一致: {key_a == key_b}, 握手耗时 {elapsed:.2f} ms")
+
+    print("\n握手性能:")
+    for name, stats in benchmark_key_exchange(target_time=0.5).items():
+        print(f"{name:<24} 中位数 {stats['median_ns'] / 1e6:>8.3f} ms  "
+              f"p95 {stats['p95_ns'] / 1e6:>8.3f} ms  {stats['ops_per_sec']:>8.1f} 次/秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SM2 Public Key Store
+SM2公钥库文件
+
+大量已注册公钥按64位标识存放在定长记录文件中，启动时用mmap映射，只读取文件头：
+标识索引按升序存放，查找时在映射缓冲区上二分查找；公钥在首次查找时才解码为点对象
+（并做一次曲线方程检查），之后从缓存返回。曲线校验在构建文件时用NumPy向量化批量完成。
+
+文件格式（大端）：
+    文件头  magic(8) | version(u16) | record_size(u16) | count(u64) | 索引与记录的SHA-256(32)，
+            补零到HEADER_SIZE字节
+    索引    count个标识 (u64)，升序
+    记录    count个定长记录，与索引一一对应：
+            未压缩 64字节 x || y；压缩 33字节 (0x02 | y的奇偶) || x
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import time
+from bisect import bisect_left
+from collections.abc import Sequence
+from typing import Dict, Iterable, Optional, Tuple, Union
+try:
+    from .sm2_optimized import OptimizedSM2Curve, OptimizedSM2Point, get_curve
+except ImportError:  # 以顶层模块方式导入（src目录在sys.path中）
+    from sm2_optimized import OptimizedSM2Curve, OptimizedSM2Point, get_curve
+
+
+MAGIC = b'SM2KEYST'
+FORMAT_VERSION = 1
+COORD_SIZE = 32
+
+# 记录长度：未压缩与压缩公钥
+UNCOMPRESSED_SIZE = 2 * COORD_SIZE
+COMPRESSED_SIZE = COORD_SIZE + 1
+
+HEADER = struct.Struct('>8sHHQ32s')
+HEADER_SIZE = 64
+KEY_ID = struct.Struct('>Q')
+
+
+def key_id(identity: Union[bytes, str]) -> int:
+    """由用户身份派生64位标识（SHA-256的前8字节）"""
+    if isinstance(identity, str):
+        identity = identity.encode()
+    return KEY_ID.unpack(hashlib.sha256(identity).digest()[:KEY_ID.size])[0]
+
+
+class _MappedIds(Sequence):
+    """映射缓冲区上的升序标识序列，供bisect二分查找"""
+
+    def __init__(self, buffer, offset: int, count: int):
+        self._buffer = buffer
+        self._offset = offset
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> int:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("key index out of range")
+        return KEY_ID.unpack_from(self._buffer, self._offset + index * KEY_ID.size)[0]
+
+
+def _encode_record(x: int, y: int, compressed: bool) -> bytes:
+    x_bytes = int(x).to_bytes(COORD_SIZE, 'big')
+    if compressed:
+        return bytes([2 | (int(y) & 1)]) + x_bytes
+    return x_bytes + int(y).to_bytes(COORD_SIZE, 'big')
+
+
+def _decompress(prefix: int, x: int, curve: OptimizedSM2Curve) -> int:
+    """由x坐标与y的奇偶恢复y（p ≡ 3 mod 4，y = rhs^((p+1)/4)）"""
+    p = int(curve.p)
+    rhs = (x * x * x + int(curve.a) * x + int(curve.b)) % p
+    y = int(curve.backend.powmod(rhs, (p + 1) // 4, p))
+    if y * y % p != rhs:
+        raise ValueError("Invalid public key")
+    return y if y & 1 == prefix & 1 else p - y
+
+
+class KeyStore:
+    """mmap方式加载的公钥库文件"""
+
+    def __init__(self, path: str, verify: bool = False, backend: Optional[str] = None):
+        """
+        Args:
+            path: 公钥库文件路径
+            verify: 打开时校验整个文件的SHA-256并向量化检查全部公钥（耗时与公钥数成正比）；
+                    为False时只在解码单个公钥时检查其曲线方程
+            backend: 点对象使用的大整数后端
+        """
+        self.path = path
+        self.curve = get_curve(backend)
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._read_header()
+            if verify:
+                self.verify()
+        except Exception:
+            self._mmap.close()
+            raise
+        self._ids = _MappedIds(self._mmap, HEADER_SIZE, self._count)
+        self._points: Dict[int, OptimizedSM2Point] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, identifier: int) -> bool:
+        return self._index(identifier) is not None
+
+    def __getitem__(self, identifier: int) -> OptimizedSM2Point:
+        point = self.get(identifier)
+        if point is None:
+            raise KeyError(identifier)
+        return point
+
+    def _read_header(self):
+        if len(self._mmap) < HEADER_SIZE:
+            raise ValueError("Key store file too short")
+        magic, version, record_size, count, digest = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError("Not an SM2 key store file")
+        if version != FORMAT_VERSION or record_size not in (UNCOMPRESSED_SIZE, COMPRESSED_SIZE):
+            raise ValueError(f"Unsupported key store version: {version}")
+        self._records = HEADER_SIZE + count * KEY_ID.size
+        if len(self._mmap) != self._records + count * record_size:
+            raise ValueError("Truncated key store file")
+        self.record_size = record_size
+        self.compressed = record_size == COMPRESSED_SIZE
+        self._count = count
+        self._digest = digest
+
+    def _index(self, identifier: int) -> Optional[int]:
+        i = bisect_left(self._ids, identifier)
+        return i if i < self._count and self._ids[i] == identifier else None
+
+    def get(self, identifier: int) -> Optional[OptimizedSM2Point]:
+        """返回标识对应的公钥，不存在时返回None；首次查找时解码并检查曲线方程"""
+        point = self._points.get(identifier)
+        if point is not None:
+            return point
+        i = self._index(identifier)
+        if i is None:
+            return None
+
+        offset = self._records + i * self.record_size
+        record = self._mmap[offset:offset + self.record_size]
+        curve = self.curve
+        E = curve.backend.element
+        if self.compressed:
+            x = int.from_bytes(record[1:], 'big')
+            if record[0] not in (2, 3) or x >= curve.p:
+                raise ValueError("Invalid public key")
+            y = _decompress(record[0], x, curve)
+        else:
+            x = int.from_bytes(record[:COORD_SIZE], 'big')
+            y = int.from_bytes(record[COORD_SIZE:], 'big')
+            X, Y = E(x), E(y)
+            if not (x < curve.p and y < curve.p and
+                    Y * Y % curve.p == (X * X * X + curve.a * X + curve.b) % curve.p):
+                raise ValueError("Invalid public key")
+        point = OptimizedSM2Point(E(x), E(y), curve)
+        self._points[identifier] = point
+        return point
+
+    def ids(self) -> Sequence:
+        """全部标识（升序，映射缓冲区上的只读序列）"""
+        return self._ids
+
+    def verify(self):
+        """
+        校验文件SHA-256并向量化检查全部未压缩公钥在曲线上，失败时抛出ValueError
+        （压缩公钥在解码时恢复y坐标，无法恢复即为无效）
+        """
+        if hashlib.sha256(memoryview(self._mmap)[HEADER_SIZE:]).digest() != self._digest:
+            raise ValueError("Key store checksum mismatch")
+        if not self.compressed:
+            try:
+                from .sm2_vector import validate_points
+            except ImportError:
+                from sm2_vector import validate_points
+            records = memoryview(self._mmap)[self._records:]
+            valid = validate_points(records, self.curve)
+            del records
+            if not valid.all():
+                raise ValueError("Invalid public key")
+
+    def close(self):
+        """关闭映射；已解码的点对象在关闭后仍可使用"""
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+
+def write_key_store(path: str, keys: Iterable[Tuple[int, OptimizedSM2Point]],
+                    compressed: bool = False, curve: OptimizedSM2Curve = None):
+    """
+    写入公钥库文件（先写临时文件再原子替换）。keys为 (标识, 公钥) 序列，
+    写入前用NumPy向量化检查全部公钥在曲线上，标识重复或公钥无效时抛出ValueError。
+    """
+    try:
+        from .sm2_vector import validate_points
+    except ImportError:
+        from sm2_vector import validate_points
+
+    curve = curve or get_curve()
+    entries = sorted((int(identifier), int(P.x), int(P.y)) for identifier, P in keys)
+    for previous, current in zip(entries, entries[1:]):
+        if previous[0] == current[0]:
+            raise ValueError(f"Duplicate key id: {current[0]}")
+    if entries and (entries[0][0] < 0 or entries[-1][0] >= 1 << 64):
+        raise ValueError("Key id out of range")
+
+    uncompressed = b''.join(_encode_record(x, y, False) for _, x, y in entries)
+    valid = validate_points(uncompressed, curve)
+    if not valid.all():
+        raise ValueError(f"Invalid public key for id {entries[int(valid.argmin())][0]}")
+
+    body = (b''.join(KEY_ID.pack(identifier) for identifier, _, _ in entries) +
+            (b''.join(_encode_record(x, y, True) for _, x, y in entries) if compressed else uncompressed))
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, COMPRESSED_SIZE if compressed else UNCOMPRESSED_SIZE,
+                         len(entries), hashlib.sha256(body).digest())
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header.ljust(HEADER_SIZE, b'\x00'))
+        f.write(body)
+    os.replace(tmp_path, path)
+
+
+def main():
+    """演示：冷启动加载公钥库与首次查找的耗时"""
+    import secrets
+    import tempfile
+    try:
+        from .sm2_vector import VectorSM2
+    except ImportError:
+        from sm2_vector import VectorSM2
+
+    print("=== SM2公钥库文件 ===")
+    count = 20000
+    keys = [(key_id(f"user{i}"), P) for i, (_, P) in enumerate(VectorSM2().generate_keypairs(count))]
+    directory = tempfile.mkdtemp()
+
+    for compressed in (False, True):
+        path = os.path.join(directory, f"keys_{'compressed' if compressed else 'uncompressed'}.bin")
+        start = time.perf_counter()
+        write_key_store(path, keys, compressed)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store = KeyStore(path)
+        opened = time.perf_counter() - start
+        identifier, expected = keys[secrets.randbelow(count)]
+        start = time.perf_counter()
+        point = store[identifier]
+        lookup = time.perf_counter() - start
+        start = time.perf_counter()
+        store[identifier]
+        cached = time.perf_counter() - start
+
+        label = '压缩' if compressed else '未压缩'
+        print(f"{label}: {count} 个公钥, 文件 {os.path.getsize(path) / 1024:.0f} KB, "
+              f"构建(含向量化校验) {build * 1000:.0f} ms")
+        print(f"  打开 {opened * 1e6:.0f} µs, 首次查找 {lookup * 1e6:.0f} µs, "
+              f"再次查找 {cached * 1e6:.1f} µs, 结果正确: {point == expected}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
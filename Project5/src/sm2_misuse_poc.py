@@ -141,20 +141,27 @@ class SM2SignatureMisuse:
         e2_hash = self.sm2._hash_message(message2, public_key)
         e2 = int.from_bytes(e2_hash, 'big') % self.curve.n
         
-        # 使用公式: d_A = (s2 - s1) / (s1 - s2 + r1 - r2) mod n
         try:
-            numerator = (s2 - s1) % self.curve.n
-            denominator = (s1 - s2 + r1 - r2) % self.curve.n
-            
-            if denominator == 0:
-                return None
-            
-            private_key = (numerator * gmpy2.invert(denominator, self.curve.n)) % self.curve.n
-            return private_key
+            return self._solve_same_user_nonce_reuse(signature1, signature2)
         except Exception as e:
             print(f"Error in private key recovery: {e}")
             return None
     
+    def _solve_same_user_nonce_reuse(self, signature1: Tuple[int, int],
+                                     signature2: Tuple[int, int]) -> Optional[int]:
+        """同一用户重复使用k时的私钥求解公式（与消息哈希无关）"""
+        r1, s1 = signature1
+        r2, s2 = signature2
+        
+        # 使用公式: d_A = (s2 - s1) / (s1 - s2 + r1 - r2) mod n
+        numerator = (s2 - s1) % self.curve.n
+        denominator = (s1 - s2 + r1 - r2) % self.curve.n
+        
+        if denominator == 0:
+            return None
+        
+        return (numerator * gmpy2.invert(denominator, self.curve.n)) % self.curve.n
+    
     def different_users_same_k_attack_demo(self):
         """不同用户使用相同k导致私钥泄露攻击演示"""
         print("\n=== SM2不同用户使用相同k攻击演示 ===")
@@ -320,7 +327,7 @@ class SM2SignatureMisuse:
             # 尝试多种推导方法
             methods = [
                 # 方法1: 原始公式
-                lambda: ((e - s1 * s2) * gmpy2.invert(s1 * s2 + r1 * s2 - r2, self.curve.n)) % self.curve.n,
+                lambda: self._solve_sm2_ecdsa_same_key(sm2_signature, ecdsa_signature, e),
                 # 方法2: 简化公式
                 lambda: ((s1 * s2 - e) * gmpy2.invert(r2 - s1 * s2 - r1 * s2, self.curve.n)) % self.curve.n,
                 # 方法3: 直接求解
@@ -343,6 +350,19 @@ class SM2SignatureMisuse:
             print(f"Error in private key recovery: {e}")
             return None
     
+    def _solve_sm2_ecdsa_same_key(self, sm2_signature: Tuple[int, int],
+                                  ecdsa_signature: Tuple[int, int], e: int) -> Optional[int]:
+        """SM2与ECDSA共用d和k时的私钥求解公式，e为ECDSA消息哈希"""
+        r1, s1 = sm2_signature
+        r2, s2 = ecdsa_signature
+        
+        # d = (e - s1 * s2) / (s1 * s2 + r1 * s2 - r2) mod n
+        denominator = (s1 * s2 + r1 * s2 - r2) % self.curve.n
+        if denominator == 0:
+            return None
+        
+        return ((e - s1 * s2) * gmpy2.invert(denominator, self.curve.n)) % self.curve.n
+    
     def signature_verification_bypass_attack_demo(self):
         """签名验证未检查消息等导致的问题演示"""
         print("\n=== SM2签名验证未检查消息等导致的问题演示 ===")
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Multi-Scalar Multiplication
+多标量乘法 Σ k_i·P_i
+
+msm(scalars, points) 按输入规模选择算法：
+    Straus       交错wNAF：全部点共用一条倍点链，奇数倍点表批量归一化后用混合加法
+    Bos-Coster   反复以 (k1 - q·k2)·P1 + k2·(P2 + q·P1) 替换最大的两个标量，适合中等规模
+    Pippenger    按c位窗口把点累加进桶（Jacobian坐标，混合加法），再以前缀和合并各桶
+
+点运算只依赖曲线的p、a、n，适用于Project5中的所有曲线（SM2Curve、OptimizedSM2Curve、
+Secp256k1Curve等），返回与输入点相同类型的点对象。
+"""
+
+import heapq
+import secrets
+import time
+from typing import Dict, List, Sequence, Tuple
+try:
+    from .sm2_backend import get_backend
+    from .sm2_optimized import (JACOBIAN_INFINITY, OptimizedSM2Curve, OptimizedSM2Point,
+                                _batch_normalize, _jacobian_add, _jacobian_add_affine,
+                                _jacobian_double, _odd_multiples)
+except ImportError:  # 以顶层模块方式导入（src目录在sys.path中）
+    from sm2_backend import get_backend
+    from sm2_optimized import (JACOBIAN_INFINITY, OptimizedSM2Curve, OptimizedSM2Point,
+                               _batch_normalize, _jacobian_add, _jacobian_add_affine,
+                               _jacobian_double, _odd_multiples)
+
+
+# 算法名称
+MSM_METHODS = ('straus', 'bos_coster', 'pippenger')
+
+# 自动选择的规模分界（由compare_msm测得）：点数不超过STRAUS_MAX用Straus，
+# 不超过BOS_COSTER_MAX用Bos-Coster，其余用Pippenger。
+# CPython下Bos-Coster每步是一次完整Jacobian点加，实测在各规模都不快于Pippenger的混合加法，
+# 默认区间为空；点加开销比例不同的平台可按compare_msm的结果调整
+STRAUS_MAX = 32
+BOS_COSTER_MAX = 32
+
+# Straus的wNAF窗口宽度
+STRAUS_WIDTH = 5
+
+
+class _CurveContext:
+    """msm内部使用的曲线参数；带backend属性，可直接传给_batch_normalize等函数"""
+
+    __slots__ = ('p', 'a', 'n', 'backend')
+
+    def __init__(self, curve):
+        self.p = curve.p
+        self.a = curve.a
+        self.n = int(curve.n)
+        self.backend = getattr(curve, 'backend', None) or get_backend()
+
+
+def _wnaf(k: int, width: int) -> List[int]:
+    """宽度为width的wNAF表示（低位在前），非零位为 ±1, ±3, ..., ±(2^(width-1) - 1)"""
+    digits = []
+    full = 1 << width
+    while k:
+        digit = 0
+        if k & 1:
+            digit = k & (full - 1)
+            if digit >= full >> 1:
+                digit -= full
+            k -= digit
+        digits.append(digit)
+        k >>= 1
+    return digits
+
+
+def _signed_digits(k: int, window: int, count: int) -> List[int]:
+    """带符号的2^window进制表示（低位在前），各位在 [-2^(window-1), 2^(window-1)) 内"""
+    digits = []
+    full = 1 << window
+    half = full >> 1
+    for _ in range(count):
+        digit = k & (full - 1)
+        k >>= window
+        if digit >= half:
+            digit -= full
+            k += 1
+        digits.append(digit)
+    return digits
+
+
+def _jacobian_mul(P: Tuple, k: int, a, p) -> Tuple:
+    """Jacobian坐标的二进制标量乘法（Bos-Coster中的小倍数）"""
+    result = JACOBIAN_INFINITY
+    for bit in bin(k)[2:]:
+        result = _jacobian_double(result, a, p)
+        if bit == '1':
+            result = _jacobian_add(result, P, a, p)
+    return result
+
+
+def _straus(pairs: List[Tuple[int, Tuple]], ctx: _CurveContext, width: int = STRAUS_WIDTH) -> Tuple:
+    """交错wNAF：全部奇数倍点表一次批量求逆归一化为仿射坐标"""
+    p, a = ctx.p, ctx.a
+    size = 1 << (width - 2)
+    tables = [_odd_multiples(x, y, ctx, width - 1) for _, (x, y) in pairs]
+    affine = _batch_normalize([entry for table in tables for entry in table], ctx)
+
+    nafs = [_wnaf(k, width) for k, _ in pairs]
+    columns = [[] for _ in range(max(map(len, nafs)))]
+    for j, naf in enumerate(nafs):
+        for i, digit in enumerate(naf):
+            if digit:
+                x, y = affine[j * size + (abs(digit) >> 1)]
+                columns[i].append((x, y if digit > 0 else p - y))
+
+    acc = JACOBIAN_INFINITY
+    for column in reversed(columns):
+        acc = _jacobian_double(acc, a, p)
+        for x, y in column:
+            acc = _jacobian_add_affine(acc, x, y, a, p)
+    return acc
+
+
+def _bos_coster(pairs: List[Tuple[int, Tuple]], ctx: _CurveContext) -> Tuple:
+    """Bos-Coster：以最大标量为堆顶，每步用一次点加把最大标量约减为余数"""
+    p, a = ctx.p, ctx.a
+    points = [(x, y, 1) for _, (x, y) in pairs]
+    heap = [(-k, i) for i, (k, _) in enumerate(pairs)]
+    heapq.heapify(heap)
+    while True:
+        k1, i = heapq.heappop(heap)
+        if not heap:
+            return _jacobian_mul(points[i], -k1, a, p)
+        k2, j = heap[0]
+        q, r = divmod(-k1, -k2)
+        addend = points[i] if q == 1 else _jacobian_mul(points[i], q, a, p)
+        points[j] = _jacobian_add(points[j], addend, a, p)
+        if r:
+            heapq.heappush(heap, (-r, i))
+
+
+def _pippenger_window(count: int, bits: int) -> int:
+    """使点加次数 ceil((bits+1)/c) · (count + 2^c) 最少的窗口位数c"""
+    return min(range(1, 17), key=lambda c: -(-(bits + 1) // c) * (count + (1 << c)))
+
+
+def _pippenger(pairs: List[Tuple[int, Tuple]], ctx: _CurveContext, window: int = None) -> Tuple:
+    """Pippenger桶方法：桶为Jacobian坐标，输入仿射点以混合加法累加"""
+    p, a = ctx.p, ctx.a
+    bits = max(k for k, _ in pairs).bit_length()
+    window = window or _pippenger_window(len(pairs), bits)
+    count = -(-(bits + 1) // window)
+    half = 1 << (window - 1)
+    digits = [_signed_digits(k, window, count) for k, _ in pairs]
+
+    acc = JACOBIAN_INFINITY
+    for w in range(count - 1, -1, -1):
+        for _ in range(window):
+            acc = _jacobian_double(acc, a, p)
+        buckets = [JACOBIAN_INFINITY] * half
+        for (_, (x, y)), row in zip(pairs, digits):
+            digit = row[w]
+            if digit > 0:
+                buckets[digit - 1] = _jacobian_add_affine(buckets[digit - 1], x, y, a, p)
+            elif digit < 0:
+                buckets[-digit - 1] = _jacobian_add_affine(buckets[-digit - 1], x, p - y, a, p)
+
+        # Σ b·B_b = 各后缀和之和
+        running = total = JACOBIAN_INFINITY
+        for bucket in reversed(buckets):
+            running = _jacobian_add(running, bucket, a, p)
+            total = _jacobian_add(total, running, a, p)
+        acc = _jacobian_add(acc, total, a, p)
+    return acc
+
+
+_METHODS = {'straus': _straus, 'bos_coster': _bos_coster, 'pippenger': _pippenger}
+
+
+def select_method(count: int) -> str:
+    """按点数选择算法"""
+    if count <= STRAUS_MAX:
+        return 'straus'
+    if count <= BOS_COSTER_MAX:
+        return 'bos_coster'
+    return 'pippenger'
+
+
+def msm(scalars: Sequence[int], points: Sequence, method: str = None):
+    """
+    多标量乘法 Σ scalars[i]·points[i]
+
+    Args:
+        scalars: 标量序列（按曲线阶n取模）
+        points: 同一曲线上的点对象序列（SM2Point、OptimizedSM2Point等）
+        method: 'straus'、'bos_coster'、'pippenger'，None时按点数自动选择
+
+    Returns:
+        与points[0]相同类型的点
+    """
+    if len(scalars) != len(points):
+        raise ValueError("scalars and points must have the same length")
+    if not points:
+        raise ValueError("msm requires at least one point")
+    if method is not None and method not in _METHODS:
+        raise ValueError(f"Unknown msm method: {method}")
+
+    point_type = type(points[0])
+    curve = points[0].curve
+    ctx = _CurveContext(curve)
+    pairs = []
+    for k, P in zip(scalars, points):
+        k = int(k) % ctx.n
+        if k and not P.infinity:
+            pairs.append((k, (P.x, P.y)))
+    if not pairs:
+        return point_type.infinity_point(curve)
+
+    X, Y, Z = _METHODS[method or select_method(len(pairs))](pairs, ctx)
+    if Z == 0:
+        return point_type.infinity_point(curve)
+    p = ctx.p
+    z_inv = ctx.backend.inv(Z, p)
+    z_inv2 = z_inv * z_inv % p
+    return point_type(X * z_inv2 % p, Y * z_inv2 * z_inv % p, curve)
+
+
+def compare_msm(sizes: Sequence[int] = (2, 8, 16, 24, 32, 48, 64, 128, 256, 1024),
+                bits: int = None, repeat: int = 3, curve=None) -> Dict[int, Dict[str, float]]:
+    """
+    各算法在不同点数下的耗时（秒，取repeat次最小值），用于确定STRAUS_MAX与BOS_COSTER_MAX。
+    bits指定时使用该位长的随机标量（如批量验证中的短随机系数），否则为[1, n)内的随机标量。
+    """
+    curve = curve or OptimizedSM2Curve()
+    G = OptimizedSM2Point(curve.Gx, curve.Gy, curve)
+    n = int(curve.n)
+    pool = [G * (secrets.randbelow(n - 1) + 1) for _ in range(min(max(sizes), 64))]
+
+    report = {}
+    for size in sizes:
+        points = [pool[i % len(pool)] for i in range(size)]
+        if bits:
+            scalars = [secrets.randbits(bits) | 1 for _ in range(size)]
+        else:
+            scalars = [secrets.randbelow(n - 1) + 1 for _ in range(size)]
+        report[size] = {}
+        for method in MSM_METHODS:
+            elapsed = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                msm(scalars, points, method)
+                elapsed.append(time.perf_counter() - start)
+            report[size][method] = min(elapsed)
+    return report
+
+
+def crossover(report: Dict[int, Dict[str, float]], slower: str, faster: str) -> int:
+    """report中faster开始（并保持）快于slower的最小点数，不存在时返回None"""
+    result = None
+    for size in sorted(report, reverse=True):
+        if report[size][faster] >= report[size][slower]:
+            break
+        result = size
+    return result
+
+
+def main():
+    """演示：三种多标量乘法算法的耗时与分界点"""
+    print("=== 多标量乘法 (MSM) 算法对比 ===")
+    for bits in (None, 128):
+        report = compare_msm(bits=bits)
+        print(f"\n标量位长: {bits or 256}")
+        print(f"{'点数':>6} " + " ".join(f"{method:>12}" for method in MSM_METHODS) + "   最快")
+        for size, timings in report.items():
+            best = min(timings, key=timings.get)
+            row = " ".join(f"{timings[method] * 1000:>10.2f}ms" for method in MSM_METHODS)
+            print(f"{size:>6} {row}   {best} (自动选择: {select_method(size)})")
+        for slower, faster in (('straus', 'pippenger'), ('straus', 'bos_coster'), ('bos_coster', 'pippenger')):
+            size = crossover(report, slower, faster)
+            print(f"{faster} 快于 {slower}: " + (f"点数 >= {size}" if size else "未出现"))
+
+
+if __name__ == "__main__":
+    main()
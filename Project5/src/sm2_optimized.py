@@ -7,30 +7,67 @@ SM2椭圆曲线密码算法优化实现
 该模块提供了SM2椭圆曲线的优化实现，包括性能改进的加密算法。
 """
 
+from __future__ import annotations
+
 import hashlib
 import hmac
+import itertools
 import os
 import random
-import time
-from typing import Tuple, Optional, Union, List
-import gmpy2
-from gmpy2 import mpz
-import numpy as np
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import threading
+import time
+from collections import OrderedDict, deque
+from functools import reduce
+from operator import and_, or_
+from typing import TYPE_CHECKING, Iterable, Iterator, Tuple, Optional, Union, List
+if TYPE_CHECKING:  # 仅用于类型标注；gmpy2在选用gmpy2后端时才导入
+    from gmpy2 import mpz
+try:
+    from .sm2_backend import get_backend
+except ImportError:  # 以顶层模块方式导入（src目录在sys.path中）
+    from sm2_backend import get_backend
+
+
+# 已验证公钥缓存的最大条目数
+VALIDATION_CACHE_SIZE = 1024
+
+# 接收方公钥固定基表缓存的最大条目数（每张表约520个仿射点）
+RECIPIENT_CACHE_SIZE = 64
+
+# 批量验证中公钥出现次数达到该值时使用（并缓存）其固定基表
+HOT_KEY_THRESHOLD = 8
+
+# 多接收方加密的内容密钥长度与槽位号长度（字节）
+BODY_KEY_SIZE = 32
+SLOT_ID_SIZE = 8
+
+
+# 并行模式线程池的线程数
+PARALLEL_WORKERS = 4
+
+# sign_many每块的消息数（块内共用一次批量求逆），消息数达到SIGN_PROCESS_THRESHOLD时按块分发到多进程
+SIGN_CHUNK_SIZE = 4096
+SIGN_PROCESS_THRESHOLD = 16384
+
+# 块内消息数不小于该值且NumPy可用时，kG使用sm2_vector向量化计算（4096个时约快2.4倍）
+SIGN_VECTOR_THRESHOLD = 1024
 
 
 class OptimizedSM2Curve:
     """优化的SM2椭圆曲线参数类"""
     
-    def __init__(self):
+    def __init__(self, backend: Optional[str] = None):
+        # 大整数后端（见sm2_backend），域元素与曲线参数均为其数值类型
+        self.backend = get_backend(backend)
+        E = self.backend.element
+        
         # SM2推荐曲线参数 (GB/T 32918.1-2016)
-        self.p = mpz("FFFFFFFEFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF00000000FFFFFFFFFFFFFFFF", 16)
-        self.a = mpz("FFFFFFFEFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF00000000FFFFFFFFFFFFFFFC", 16)
-        self.b = mpz("28E9FA9E9D9F5E344D5A9E4BCF6509A7F39789F515AB8F92DDBCBD414D940E93", 16)
-        self.n = mpz("FFFFFFFEFFFFFFFFFFFFFFFFFFFFFFFF7203DF6B21C6052B53BBF40939D54123", 16)
-        self.Gx = mpz("32C4AE2C1F1981195F9904466A39C9948FE30BBFF2660BE1715A4589334C74C7", 16)
-        self.Gy = mpz("BC3736A2F4F6779C59BDCEE36B692153D0A9877CC62A474002DF32E52139F0A0", 16)
+        self.p = E(int("FFFFFFFEFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF00000000FFFFFFFFFFFFFFFF", 16))
+        self.a = E(int("FFFFFFFEFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF00000000FFFFFFFFFFFFFFFC", 16))
+        self.b = E(int("28E9FA9E9D9F5E344D5A9E4BCF6509A7F39789F515AB8F92DDBCBD414D940E93", 16))
+        self.n = E(int("FFFFFFFEFFFFFFFFFFFFFFFFFFFFFFFF7203DF6B21C6052B53BBF40939D54123", 16))
+        self.Gx = E(int("32C4AE2C1F1981195F9904466A39C9948FE30BBFF2660BE1715A4589334C74C7", 16))
+        self.Gy = E(int("BC3736A2F4F6779C59BDCEE36B692153D0A9877CC62A474002DF32E52139F0A0", 16))
         
         # 基点G
         self.G = (self.Gx, self.Gy)
@@ -38,9 +75,8 @@ class OptimizedSM2Curve:
         # 辅助参数
         self.h = 1  # 余因子
         
-        # 预计算表
+        # 预计算表（首次使用时构建，避免每次构造都做256次点加倍）
         self._precompute_table = {}
-        self._init_precomputation()
     
     def _init_precomputation(self):
         """初始化预计算表"""
@@ -54,15 +90,312 @@ class OptimizedSM2Curve:
     
     def get_precomputed_point(self, index: int) -> 'OptimizedSM2Point':
         """获取预计算的点"""
+        if not self._precompute_table:
+            self._init_precomputation()
         return self._precompute_table.get(index)
 
 
+# 标量乘法实现: 'naf'为变长时间(默认)，'ladder'与'window'为操作序列与标量无关的实现
+SCALAR_MULT_METHODS = ('naf', 'ladder', 'window')
+
+# Jacobian射影坐标 (X, Y, Z) 表示仿射点 (X/Z^2, Y/Z^3)，Z == 0 表示无穷远点
+# 以下核心函数直接使用运算符，由曲线后端的数值类型分派；求逆通过后端接口
+JACOBIAN_INFINITY = (1, 1, 0)
+
+
+def _jacobian_double(P: Tuple[mpz, mpz, mpz], a: mpz, p: mpz) -> Tuple[mpz, mpz, mpz]:
+    """Jacobian坐标点加倍"""
+    X, Y, Z = P
+    if Z == 0 or Y == 0:
+        return JACOBIAN_INFINITY
+    YY = Y * Y % p
+    ZZ = Z * Z % p
+    S = 4 * X * YY % p
+    M = (3 * X * X + a * ZZ * ZZ) % p
+    X3 = (M * M - 2 * S) % p
+    Y3 = (M * (S - X3) - 8 * YY * YY) % p
+    Z3 = 2 * Y * Z % p
+    return X3, Y3, Z3
+
+
+def _jacobian_add(P: Tuple[mpz, mpz, mpz], Q: Tuple[mpz, mpz, mpz],
+                  a: mpz, p: mpz) -> Tuple[mpz, mpz, mpz]:
+    """Jacobian坐标点加法"""
+    X1, Y1, Z1 = P
+    X2, Y2, Z2 = Q
+    if Z1 == 0:
+        return Q
+    if Z2 == 0:
+        return P
+    Z1Z1 = Z1 * Z1 % p
+    Z2Z2 = Z2 * Z2 % p
+    U1 = X1 * Z2Z2 % p
+    U2 = X2 * Z1Z1 % p
+    S1 = Y1 * Z2 * Z2Z2 % p
+    S2 = Y2 * Z1 * Z1Z1 % p
+    H = (U2 - U1) % p
+    R = (S2 - S1) % p
+    if H == 0:
+        if R == 0:
+            return _jacobian_double(P, a, p)
+        return JACOBIAN_INFINITY
+    HH = H * H % p
+    HHH = H * HH % p
+    V = U1 * HH % p
+    X3 = (R * R - HHH - 2 * V) % p
+    Y3 = (R * (V - X3) - S1 * HHH) % p
+    Z3 = Z1 * Z2 * H % p
+    return X3, Y3, Z3
+
+
+def _jacobian_to_affine(P: Tuple[mpz, mpz, mpz], curve: OptimizedSM2Curve) -> 'OptimizedSM2Point':
+    """Jacobian坐标转换为仿射点（一次模逆）"""
+    X, Y, Z = P
+    if Z == 0:
+        return OptimizedSM2Point.infinity_point(curve)
+    p = curve.p
+    z_inv = curve.backend.inv(Z, p)
+    z_inv2 = z_inv * z_inv % p
+    return OptimizedSM2Point(X * z_inv2 % p, Y * z_inv2 * z_inv % p, curve)
+
+
+def _batch_normalize(points: List[Tuple[mpz, mpz, mpz]],
+                     curve: OptimizedSM2Curve) -> List[Optional[Tuple[mpz, mpz]]]:
+    """Montgomery批量求逆：一次模逆把全部Jacobian点转换为仿射坐标 (无穷远点为None)"""
+    p, backend = curve.p, curve.backend
+    prefix = []
+    acc = backend.element(1)
+    for _, _, Z in points:
+        prefix.append(acc)
+        if Z != 0:
+            acc = backend.mul(acc, Z, p)
+
+    inv = backend.inv(acc, p)
+    result = [None] * len(points)
+    for i in range(len(points) - 1, -1, -1):
+        X, Y, Z = points[i]
+        if Z == 0:
+            continue
+        z_inv = inv * prefix[i] % p
+        inv = inv * Z % p
+        z_inv2 = z_inv * z_inv % p
+        result[i] = (X * z_inv2 % p, Y * z_inv2 * z_inv % p)
+    return result
+
+
+def _batch_to_affine(points: List[Tuple[mpz, mpz, mpz]],
+                     curve: OptimizedSM2Curve) -> List['OptimizedSM2Point']:
+    """批量转换为仿射点对象"""
+    return [OptimizedSM2Point.infinity_point(curve) if xy is None else OptimizedSM2Point(xy[0], xy[1], curve)
+            for xy in _batch_normalize(points, curve)]
+
+
+def _fixed_length_scalar(k: int, n: mpz) -> int:
+    """k + n 或 k + 2n，使标量位长固定为 n.bit_length() + 1，循环次数与k无关"""
+    k = k % n + n
+    if k.bit_length() <= n.bit_length():
+        k += n
+    return k
+
+
+def _xycz_add(X1: mpz, Y1: mpz, X2: mpz, Y2: mpz, p: mpz):
+    """
+    共Z加法 XYcZ-ADD：输入共享Z的P、Q，返回 (P+Q, P') 与Z的乘数 X1 - X2，
+    P' 为与P+Q共享新Z的P。
+    """
+    dX = (X1 - X2) % p
+    C = dX * dX % p
+    W1 = X1 * C % p
+    W2 = X2 * C % p
+    dY = (Y1 - Y2) % p
+    A1 = Y1 * (W1 - W2) % p
+    X3 = (dY * dY - W1 - W2) % p
+    Y3 = (dY * (W1 - X3) - A1) % p
+    return X3, Y3, W1, A1, dX
+
+
+def _xycz_addc(X1: mpz, Y1: mpz, X2: mpz, Y2: mpz, p: mpz):
+    """共轭共Z加法 XYcZ-ADDC：返回共享新Z的 P+Q、P-Q 与Z的乘数"""
+    dX = (X1 - X2) % p
+    C = dX * dX % p
+    W1 = X1 * C % p
+    W2 = X2 * C % p
+    dY = (Y1 - Y2) % p
+    sY = (Y1 + Y2) % p
+    A1 = Y1 * (W1 - W2) % p
+    X3 = (dY * dY - W1 - W2) % p
+    Y3 = (dY * (W1 - X3) - A1) % p
+    X3c = (sY * sY - W1 - W2) % p
+    Y3c = (sY * (W1 - X3c) - A1) % p
+    return X3, Y3, X3c, Y3c, dX
+
+
+def _coz_ladder(k: int, x: mpz, y: mpz, curve: OptimizedSM2Curve) -> Optional[Tuple[mpz, mpz, mpz]]:
+    """
+    共Z Montgomery阶梯 (Goundar-Joye-Miyaji)：每一位执行一次XYcZ-ADDC与一次XYcZ-ADD，
+    通过算术交换选择操作数，运算序列与标量比特无关。出现退化(Z == 0)时返回None。
+    """
+    p, a = curve.p, curve.a
+    k = _fixed_length_scalar(k, curve.n)
+
+    # XYcZ-IDBL: R1 = 2P, R0 = P，共享 Z = 2y
+    yy = y * y % p
+    S = 4 * x * yy % p
+    M = (3 * x * x + a) % p
+    X1 = (M * M - 2 * S) % p
+    Y1 = (M * (S - X1) - 8 * yy * yy) % p
+    X0, Y0 = S, 8 * yy * yy % p
+    Z = 2 * y % p
+
+    for i in range(k.bit_length() - 2, -1, -1):
+        b = (k >> i) & 1
+        # 按位b算术交换: (Rb, R1-b)
+        mask = -b
+        Xb = X0 ^ ((X0 ^ X1) & mask)
+        Yb = Y0 ^ ((Y0 ^ Y1) & mask)
+        Xn = X1 ^ ((X0 ^ X1) & mask)
+        Yn = Y1 ^ ((Y0 ^ Y1) & mask)
+        # (R1-b, Rb) = (Rb + R1-b, Rb - R1-b)
+        Xs, Ys, Xd, Yd, dZ1 = _xycz_addc(Xb, Yb, Xn, Yn, p)
+        # (Rb, R1-b) = (R1-b + Rb, R1-b')
+        Xb, Yb, Xn, Yn, dZ2 = _xycz_add(Xs, Ys, Xd, Yd, p)
+        Z = Z * dZ1 % p * dZ2 % p
+        X0 = Xb ^ ((Xb ^ Xn) & mask)
+        Y0 = Yb ^ ((Yb ^ Yn) & mask)
+        X1 = Xn ^ ((Xb ^ Xn) & mask)
+        Y1 = Yn ^ ((Yb ^ Yn) & mask)
+
+    if Z == 0:
+        return None
+    return X0, Y0, Z
+
+
+def _regular_recode(k: int, n: mpz, width: int) -> List[int]:
+    """
+    固定长度奇数位窗口重编码 (Joye-Tunstall)：k取奇数代表(k或k+n)后，
+    所有位均为 ±1, ±3, ..., ±(2^width - 1)，位数只取决于n的位长。
+    """
+    k = k % n
+    if k % 2 == 0:
+        k += n
+    digits = []
+    half = 1 << width
+    for _ in range((n.bit_length() + width) // width - 1):
+        d = (k % (half << 1)) - half
+        digits.append(d)
+        k = (k - d) >> width
+    digits.append(k)
+    return digits
+
+
+def _fixed_window_mul(k: int, x: mpz, y: mpz, curve: OptimizedSM2Curve,
+                      width: int = 4) -> Tuple[mpz, mpz, mpz]:
+    """固定窗口标量乘法：每个窗口固定width次加倍和一次加法，查表时读取全部表项"""
+    return _fixed_window_mul_digits(_regular_recode(k, curve.n, width), x, y, curve, width)
+
+
+def _fixed_window_mul_digits(digits: List[int], x: mpz, y: mpz, curve: OptimizedSM2Curve,
+                             width: int = 4) -> Tuple[mpz, mpz, mpz]:
+    """使用已重编码的标量执行固定窗口乘法（同一标量乘多个点时只重编码一次）"""
+    return _fixed_window_eval(digits, _odd_multiples(x, y, curve, width), curve, width)
+
+
+def _odd_multiples(x: mpz, y: mpz, curve: OptimizedSM2Curve, width: int) -> List[Tuple[mpz, mpz, mpz]]:
+    """Jacobian坐标的 1P, 3P, 5P, ..., (2^width - 1)P"""
+    p, a = curve.p, curve.a
+    base = (x, y, 1)
+    double = _jacobian_double(base, a, p)
+    table = [base]
+    for _ in range((1 << (width - 1)) - 1):
+        table.append(_jacobian_add(table[-1], double, a, p))
+    return table
+
+
+def _jacobian_add_affine(P: Tuple[mpz, mpz, mpz], x2: mpz, y2: mpz,
+                         a: mpz, p: mpz) -> Tuple[mpz, mpz, mpz]:
+    """Jacobian点加仿射点（混合加法，省去Z2相关乘法）"""
+    X1, Y1, Z1 = P
+    if Z1 == 0:
+        return x2, y2, 1
+    Z1Z1 = Z1 * Z1 % p
+    U2 = x2 * Z1Z1 % p
+    S2 = y2 * Z1 * Z1Z1 % p
+    H = (U2 - X1) % p
+    R = (S2 - Y1) % p
+    if H == 0:
+        if R == 0:
+            return _jacobian_double(P, a, p)
+        return JACOBIAN_INFINITY
+    HH = H * H % p
+    HHH = H * HH % p
+    V = X1 * HH % p
+    X3 = (R * R - HHH - 2 * V) % p
+    Y3 = (R * (V - X3) - Y1 * HHH) % p
+    Z3 = Z1 * H % p
+    return X3, Y3, Z3
+
+
+def _digit_masks(digit: int, size: int) -> Tuple[List[int], int]:
+    """奇数位digit对应的查表掩码（选中项为-1，其余为0）与取负掩码"""
+    index = (abs(digit) - 1) >> 1
+    return [-(j == index) for j in range(size)], -(digit < 0)
+
+
+def _masked_select(columns: List[tuple], masks: List[int], negative: int, p: mpz) -> List[mpz]:
+    """读取全部表项并按掩码合成所选点，negative为-1时对y取负"""
+    coords = [reduce(or_, map(and_, column, masks)) for column in columns]
+    y = coords[1]
+    coords[1] = y ^ ((y ^ (p - y)) & negative)
+    return coords
+
+
+def _fixed_window_eval(digits: List[int], table: List[tuple], curve: OptimizedSM2Curve,
+                       width: int = 4) -> Tuple[mpz, mpz, mpz]:
+    """按重编码位计算单个点的标量乘法，见 _fixed_window_eval_many"""
+    return _fixed_window_eval_many(digits, [table], curve, width)[0]
+
+
+def _fixed_window_eval_many(digits: List[int], tables: List[List[tuple]], curve: OptimizedSM2Curve,
+                            width: int = 4) -> List[Tuple[mpz, mpz, mpz]]:
+    """
+    同一标量乘多个点：按重编码位逐窗口同步推进所有点。每张表为奇数倍点表：
+    Jacobian三元组，或已批量归一化的仿射二元组（此时使用混合加法）。
+    查表对全部表项做掩码读取，掩码每个窗口只计算一次。
+    """
+    p, a = curve.p, curve.a
+    affine = len(tables[0][0]) == 2
+    columns = [list(zip(*table)) for table in tables]
+
+    size = len(tables[0])
+
+    masks, negative = _digit_masks(digits[-1], size)
+    results = []
+    for cols in columns:
+        first = _masked_select(cols, masks, negative, p)
+        results.append((first[0], first[1], 1) if affine else tuple(first))
+
+    for digit in reversed(digits[:-1]):
+        masks, negative = _digit_masks(digit, size)
+        for i, cols in enumerate(columns):
+            result = results[i]
+            for _ in range(width):
+                result = _jacobian_double(result, a, p)
+            entry = _masked_select(cols, masks, negative, p)
+            if affine:
+                results[i] = _jacobian_add_affine(result, entry[0], entry[1], a, p)
+            else:
+                results[i] = _jacobian_add(result, tuple(entry), a, p)
+    return results
+
+
 class OptimizedSM2Point:
     """优化的椭圆曲线点类"""
+
+    __slots__ = ('x', 'y', 'curve', 'infinity')
     
     def __init__(self, x: int, y: int, curve: OptimizedSM2Curve):
-        self.x = mpz(x)
-        self.y = mpz(y)
+        self.x = curve.backend.element(x)
+        self.y = curve.backend.element(y)
         self.curve = curve
         self.infinity = False
     
@@ -98,11 +431,11 @@ class OptimizedSM2Point:
                 return OptimizedSM2Point.infinity_point(self.curve)
             
             # 使用预计算的逆元
-            y_inv = gmpy2.invert(2 * self.y, self.curve.p)
+            y_inv = self.curve.backend.inv(2 * self.y, self.curve.p)
             lam = (3 * self.x * self.x + self.curve.a) * y_inv
         else:
             # 点加法 (优化版本)
-            x_diff_inv = gmpy2.invert(other.x - self.x, self.curve.p)
+            x_diff_inv = self.curve.backend.inv(other.x - self.x, self.curve.p)
             lam = (other.y - self.y) * x_diff_inv
         
         lam = lam % self.curve.p
@@ -116,24 +449,56 @@ class OptimizedSM2Point:
         if k == 0:
             return OptimizedSM2Point.infinity_point(self.curve)
         
+        if self.infinity:
+            return self
+        
         # 转换为NAF (Non-Adjacent Form)
         naf = self._to_naf(k)
         
-        result = OptimizedSM2Point.infinity_point(self.curve)
-        addend = self
+        # 循环内在Jacobian坐标元组上运算，只在返回时转换为仿射点对象
+        a, p = self.curve.a, self.curve.p
+        x, y = self.x, self.y
+        neg_y = -y % p
+        result = JACOBIAN_INFINITY
         
         for bit in reversed(naf):
-            result = result + result  # 点加倍
+            result = _jacobian_double(result, a, p)
             if bit == 1:
-                result = result + addend
+                result = _jacobian_add_affine(result, x, y, a, p)
             elif bit == -1:
-                result = result + (-addend)
+                result = _jacobian_add_affine(result, x, neg_y, a, p)
         
-        return result
+        return _jacobian_to_affine(result, self.curve)
     
     def __rmul__(self, k):
         return self * k
-    
+
+    def ladder_mul(self, k: int) -> 'OptimizedSM2Point':
+        """共Z Montgomery阶梯标量乘法（运算次数与k无关）"""
+        if self.infinity or k % self.curve.n == 0:
+            return OptimizedSM2Point.infinity_point(self.curve)
+        result = _coz_ladder(k, self.x, self.y, self.curve)
+        if result is None:
+            # 中间结果为 ±R 的退化情形（概率可忽略），退回通用实现
+            return self * (k % self.curve.n)
+        return _jacobian_to_affine(result, self.curve)
+
+    def window_mul(self, k: int, width: int = 4) -> 'OptimizedSM2Point':
+        """固定窗口标量乘法（运算次数与k无关，查表不依赖k）"""
+        if self.infinity or k % self.curve.n == 0:
+            return OptimizedSM2Point.infinity_point(self.curve)
+        return _jacobian_to_affine(_fixed_window_mul(k, self.x, self.y, self.curve, width), self.curve)
+
+    def scalar_mul(self, k: int, method: str = 'naf') -> 'OptimizedSM2Point':
+        """按method选择标量乘法实现"""
+        if method == 'ladder':
+            return self.ladder_mul(k)
+        if method == 'window':
+            return self.window_mul(k)
+        if method == 'naf':
+            return self * k
+        raise ValueError(f"Unknown scalar multiplication method: {method}")
+
     def __neg__(self):
         """点的负运算"""
         if self.infinity:
@@ -155,47 +520,272 @@ class OptimizedSM2Point:
         return naf
 
 
+class FixedBaseTable:
+    """
+    固定基点窗口预计算表：第i个窗口存放 (2j+1) * 2^(width*i) * P 的仿射坐标，
+    标量按奇数位重编码后每个窗口只需一次混合加法，无需点加倍。
+    """
+
+    def __init__(self, point: OptimizedSM2Point, width: int = 4):
+        if point.infinity:
+            raise ValueError("Cannot build a table for the point at infinity")
+        self.curve = point.curve
+        self.width = width
+        self.point = point
+        p, a = self.curve.p, self.curve.a
+        windows = (self.curve.n.bit_length() + width) // width
+        size = 1 << (width - 1)
+
+        entries = []
+        base = (point.x, point.y, 1)
+        for _ in range(windows):
+            double = _jacobian_double(base, a, p)
+            current = base
+            entries.append(current)
+            for _ in range(size - 1):
+                current = _jacobian_add(current, double, a, p)
+                entries.append(current)
+            for _ in range(width):
+                base = _jacobian_double(base, a, p)
+
+        # 一次批量求逆归一化全部表项；每个窗口按列存储以便掩码读取
+        flat = _batch_normalize(entries, self.curve)
+        self.windows = [list(zip(*flat[i * size:(i + 1) * size])) for i in range(windows)]
+
+    def multiply_jacobian(self, k: int) -> Tuple[mpz, mpz, mpz]:
+        """返回Jacobian坐标的k * P，运算次数与k无关"""
+        p, a = self.curve.p, self.curve.a
+        digits = _regular_recode(k, self.curve.n, self.width)
+        size = 1 << (self.width - 1)
+        x, y = _masked_select(self.windows[0], *_digit_masks(digits[0], size), p)
+        result = (x, y, 1)
+        for columns, digit in zip(self.windows[1:], digits[1:]):
+            x, y = _masked_select(columns, *_digit_masks(digit, size), p)
+            result = _jacobian_add_affine(result, x, y, a, p)
+        return result
+
+    def multiply(self, k: int) -> OptimizedSM2Point:
+        """固定基标量乘法 k * P"""
+        if k % self.curve.n == 0:
+            return OptimizedSM2Point.infinity_point(self.curve)
+        return _jacobian_to_affine(self.multiply_jacobian(k), self.curve)
+
+
+# 曲线参数对象与基点G的固定基表只依赖曲线参数，进程内按后端共享
+_shared_curves = {}
+_shared_base_tables = {}
+
+# 并行模式共享的线程池（首次使用时创建）
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+
+def get_curve(backend: Optional[str] = None) -> OptimizedSM2Curve:
+    """进程内共享的曲线参数对象（每个后端一个）"""
+    name = get_backend(backend).name
+    curve = _shared_curves.get(name)
+    if curve is None:
+        with _shared_lock:
+            curve = _shared_curves.get(name)
+            if curve is None:
+                curve = _shared_curves[name] = OptimizedSM2Curve(name)
+    return curve
+
+
+def _shared_thread_pool():
+    """并行模式使用的进程内共享线程池，首次调用时才导入concurrent.futures并创建"""
+    global _shared_pool
+    if _shared_pool is None:
+        with _shared_lock:
+            if _shared_pool is None:
+                from concurrent.futures import ThreadPoolExecutor
+                _shared_pool = ThreadPoolExecutor(max_workers=PARALLEL_WORKERS)
+    return _shared_pool
+
+def _chunked(items: Iterable, size: int) -> Iterator[list]:
+    """把可迭代对象切分为长度为size的列表（最后一块可能较短）"""
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# sign_many工作进程内的SM2实例（按use_parallel区分，决定长消息的哈希方式）
+_worker_signers = {}
+
+
+def _sign_chunk_worker(messages: List[bytes], private_key: int, public_xy: Tuple[int, int],
+                       use_parallel: bool) -> List[Tuple[int, int]]:
+    """工作进程：签名一块消息"""
+    sm2 = _worker_signers.get(use_parallel)
+    if sm2 is None:
+        sm2 = _worker_signers[use_parallel] = OptimizedSM2(use_parallel=use_parallel)
+    public_key = OptimizedSM2Point(public_xy[0], public_xy[1], sm2.curve)
+    d_inv = sm2.curve.backend.inv(1 + private_key, sm2.curve.n)
+    return sm2._sign_chunk(messages, private_key, public_key, d_inv)
+
+
+# 默认的预计算表存储（如sm2_tables.TableStore），提供 get(point) -> Optional[FixedBaseTable]
+_default_table_store = None
+
+
+def set_default_table_store(store) -> None:
+    """设置进程内默认的预计算表存储，None表示不使用"""
+    global _default_table_store
+    _default_table_store = store
+
+
+class SM2Recipient:
+    """
+    长期接收方公钥句柄：首次加密时构建（或从OptimizedSM2的有界缓存取得）接收方公钥的
+    固定基窗口表，之后kP按固定基计算，配合G的固定基表使加密全部为固定基运算。
+    """
+
+    def __init__(self, sm2: 'OptimizedSM2', public_key: OptimizedSM2Point):
+        if not sm2._is_valid_public_key(public_key):
+            raise ValueError("Invalid public key")
+        self.sm2 = sm2
+        self.public_key = public_key
+        self._table = None
+
+    @property
+    def table(self) -> FixedBaseTable:
+        if self._table is None:
+            self._table = self.sm2._recipient_table(self.public_key)
+        return self._table
+
+    def multiply(self, k: int) -> OptimizedSM2Point:
+        """计算 k * 接收方公钥"""
+        return self.table.multiply(k)
+
+    def encrypt(self, message: bytes) -> Tuple[OptimizedSM2Point, bytes, bytes]:
+        """加密给该接收方"""
+        return self.sm2.encrypt(message, self)
+
+
 class OptimizedSM2:
     """优化的SM2椭圆曲线密码算法实现"""
     
-    def __init__(self, use_parallel: bool = True):
-        self.curve = OptimizedSM2Curve()
+    def __init__(self, use_parallel: bool = True, scalar_mult: str = 'naf', table_store=None,
+                 backend: Optional[str] = None, verify_cache=None):
+        if scalar_mult not in SCALAR_MULT_METHODS:
+            raise ValueError(f"Unknown scalar multiplication method: {scalar_mult}")
+        self.curve = get_curve(backend)
         self.G = OptimizedSM2Point(self.curve.Gx, self.curve.Gy, self.curve)
         self.use_parallel = use_parallel
-        self._thread_pool = ThreadPoolExecutor(max_workers=4) if use_parallel else None
-    
-    def __del__(self):
-        if self._thread_pool:
-            self._thread_pool.shutdown()
+        # 涉及私钥或随机数k的变基点标量乘法(加密的kP、解密的dC1)使用的实现；kG固定使用G的固定基表
+        self.scalar_mult = scalar_mult
+        # 已验证公钥缓存 (LRU)
+        self._validated_keys = OrderedDict()
+        # 基点G的固定基表（首次使用时构建）与接收方公钥固定基表缓存 (LRU)
+        self._base_table = None
+        self._recipient_tables = OrderedDict()
+        # 预计算表存储：命中时直接使用其中的表，None时使用默认存储
+        self.table_store = table_store
+        # 验证结果缓存（如sm2_verify_cache.VerificationCache），只记录验证通过的签名
+        self.verify_cache = verify_cache
+        # sign_many使用的向量化实现（首次需要时导入sm2_vector，NumPy不可用时为False）
+        self._vector = None
+
+    @property
+    def _thread_pool(self):
+        """并行模式的线程池（进程内共享，首次使用时创建）"""
+        return _shared_thread_pool()
     
     def generate_keypair(self) -> Tuple[int, OptimizedSM2Point]:
         """生成SM2密钥对 (优化版本)"""
         while True:
             private_key = random.randint(1, self.curve.n - 1)
-            public_key = private_key * self.G
+            public_key = self._secret_mul(private_key, self.G)
             
-            # 验证公钥有效性
-            if self._is_valid_public_key(public_key):
+            # d * G 必为n阶点，只需检查曲线方程
+            if self._is_on_curve(public_key):
                 return private_key, public_key
     
-    def _is_valid_public_key(self, public_key: OptimizedSM2Point) -> bool:
-        """验证公钥有效性"""
-        if public_key.infinity:
+    def _secret_mul(self, k: int, point: OptimizedSM2Point) -> OptimizedSM2Point:
+        """秘密标量的点乘：基点G使用固定基表，其余点按scalar_mult选择实现"""
+        if point is self.G:
+            return self.base_table.multiply(k)
+        return point.scalar_mul(k, self.scalar_mult)
+
+    @property
+    def base_table(self) -> FixedBaseTable:
+        """基点G的固定基窗口表（进程内使用同一后端的实例共享同一张表）"""
+        if self._base_table is None:
+            table = self._stored_table(self.G)
+            if table is None:
+                name = self.curve.backend.name
+                if name not in _shared_base_tables:
+                    _shared_base_tables[name] = FixedBaseTable(self.G)
+                table = _shared_base_tables[name]
+            self._base_table = table
+        return self._base_table
+
+    def _stored_table(self, point: OptimizedSM2Point) -> Optional[FixedBaseTable]:
+        """从预计算表存储中取得point的固定基表"""
+        store = self.table_store if self.table_store is not None else _default_table_store
+        if store is None:
+            return None
+        return store.get(point)
+
+    def recipient(self, public_key: OptimizedSM2Point) -> SM2Recipient:
+        """为长期接收方公钥创建加密句柄"""
+        return SM2Recipient(self, public_key)
+
+    def _recipient_table(self, public_key: OptimizedSM2Point) -> FixedBaseTable:
+        """取得接收方公钥的固定基表，超过RECIPIENT_CACHE_SIZE时淘汰最久未用的表"""
+        key = (int(public_key.x), int(public_key.y))
+        table = self._recipient_tables.get(key)
+        if table is not None:
+            self._recipient_tables.move_to_end(key)
+            return table
+        table = self._stored_table(public_key) or FixedBaseTable(public_key)
+        self._recipient_tables[key] = table
+        if len(self._recipient_tables) > RECIPIENT_CACHE_SIZE:
+            self._recipient_tables.popitem(last=False)
+        return table
+
+    def _is_on_curve(self, point: OptimizedSM2Point) -> bool:
+        """检查点坐标在[0, p)范围内且满足曲线方程"""
+        if point.infinity:
             return False
-        
-        # 检查点是否在曲线上
-        left = (public_key.y * public_key.y) % self.curve.p
-        right = (public_key.x * public_key.x * public_key.x + 
-                self.curve.a * public_key.x + self.curve.b) % self.curve.p
-        
-        if left != right:
+        p = self.curve.p
+        if not (0 <= point.x < p and 0 <= point.y < p):
             return False
-        
-        # 检查阶数
-        if public_key * self.curve.n != OptimizedSM2Point.infinity_point(self.curve):
+        left = (point.y * point.y) % p
+        right = (point.x * point.x * point.x + self.curve.a * point.x + self.curve.b) % p
+        return left == right
+
+    def _is_valid_public_key(self, public_key: OptimizedSM2Point) -> bool:
+        """
+        验证公钥有效性。余因子h = 1时曲线上非无穷远点的阶都是素数n，
+        省去 n * P 标量乘法；验证通过的公钥记入LRU缓存。
+        """
+        key = (int(public_key.x), int(public_key.y))
+        if not public_key.infinity and key in self._validated_keys:
+            self._validated_keys.move_to_end(key)
+            return True
+
+        if not self._is_on_curve(public_key):
             return False
-        
+
+        # 检查阶数 (仅余因子不为1时需要)
+        if self.curve.h != 1 and public_key * self.curve.n != OptimizedSM2Point.infinity_point(self.curve):
+            return False
+
+        self._validated_keys[key] = True
+        if len(self._validated_keys) > VALIDATION_CACHE_SIZE:
+            self._validated_keys.popitem(last=False)
         return True
+
+    def import_public_key(self, x: int, y: int) -> OptimizedSM2Point:
+        """导入外部公钥：验证后返回点对象，验证结果缓存以便重复导入"""
+        public_key = OptimizedSM2Point(x, y, self.curve)
+        if not self._is_valid_public_key(public_key):
+            raise ValueError("Invalid public key")
+        return public_key
     
     def _hash_message(self, message: bytes, public_key: OptimizedSM2Point) -> bytes:
         """优化的哈希函数"""
@@ -227,8 +817,8 @@ class OptimizedSM2:
             # 生成随机数k (使用更安全的随机数生成)
             k = self._generate_secure_random()
             
-            # 计算R = k * G (使用预计算表)
-            R = k * self.G
+            # 计算R = k * G
+            R = self._secret_mul(k, self.G)
             
             # 计算e = H(M || ZA)
             e_hash = self._hash_message(message, public_key)
@@ -240,7 +830,7 @@ class OptimizedSM2:
                 continue
             
             # 计算s = ((1 + d)^-1 * (k - r * d)) mod n
-            s = (gmpy2.invert(1 + private_key, self.curve.n) * 
+            s = (self.curve.backend.inv(1 + private_key, self.curve.n) * 
                  (k - r * private_key)) % self.curve.n
             
             if s == 0:
@@ -248,6 +838,86 @@ class OptimizedSM2:
             
             return r, s
     
+    def sign_many(self, messages: Iterable[bytes], private_key: int, public_key: OptimizedSM2Point,
+                  chunk_size: int = SIGN_CHUNK_SIZE, workers: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        """
+        用同一私钥批量签名，按消息顺序逐个产出 (r, s)，messages可以是任意可迭代对象（流式处理）。
+
+        每块消息的kG使用G的固定基表在Jacobian坐标下计算（块较大时使用sm2_vector向量化计算），
+        一次批量求逆得到全部x坐标；(1 + d)^-1只计算一次，随机数k一次成批生成。消息数达到SIGN_PROCESS_THRESHOLD且
+        workers > 1（默认为CPU数）时各块分发到进程池，最多同时处理2 * workers块。
+        """
+        n = self.curve.n
+        if not 1 <= private_key < n - 1:
+            raise ValueError("Invalid private key")
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be positive")
+        workers = workers if workers is not None else (os.cpu_count() or 1)
+        return self._sign_stream(messages, private_key, public_key, chunk_size, workers)
+
+    def _sign_stream(self, messages: Iterable[bytes], private_key: int, public_key: OptimizedSM2Point,
+                     chunk_size: int, workers: int) -> Iterator[Tuple[int, int]]:
+        d_inv = self.curve.backend.inv(1 + private_key, self.curve.n)
+        chunks = _chunked(messages, chunk_size)
+        first = []
+        for chunk in chunks:
+            first.append(chunk)
+            if workers <= 1 or len(first) * chunk_size >= SIGN_PROCESS_THRESHOLD:
+                break
+        if workers <= 1 or len(first) * chunk_size < SIGN_PROCESS_THRESHOLD:
+            for chunk in itertools.chain(first, chunks):
+                yield from self._sign_chunk(chunk, private_key, public_key, d_inv)
+            return
+
+        from concurrent.futures import ProcessPoolExecutor
+        public_xy = (int(public_key.x), int(public_key.y))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for chunk in itertools.chain(first, chunks):
+                pending.append(pool.submit(_sign_chunk_worker, chunk, private_key, public_xy, self.use_parallel))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def _sign_chunk(self, messages: List[bytes], private_key: int, public_key: OptimizedSM2Point,
+                    d_inv) -> List[Tuple[int, int]]:
+        """一块消息的签名：批量生成k与kG，一次批量求逆"""
+        n = self.curve.n
+        suffix = str(public_key.x).encode() + str(public_key.y).encode()
+        digests = [self._hash_message(m, public_key) if self.use_parallel and len(m) > 1024
+                   else hashlib.sha256(m + suffix).digest() for m in messages]
+        nonces = self._generate_secure_randoms(len(messages))
+
+        signatures = []
+        for message, digest, k, x in zip(messages, digests, nonces, self._batch_base_x(nonces)):
+            r = (int.from_bytes(digest, 'big') + x) % n
+            s = d_inv * (k - r * private_key) % n
+            if r == 0 or s == 0:
+                r, s = self.sign(message, private_key, public_key)
+            signatures.append((r, s))
+        return signatures
+
+    def _batch_base_x(self, scalars: List[int]) -> List:
+        """批量计算k_i * G的x坐标：数量较多且NumPy可用时向量化，否则逐个使用固定基表后批量求逆"""
+        if len(scalars) >= SIGN_VECTOR_THRESHOLD:
+            if self._vector is None:
+                try:
+                    from .sm2_vector import VectorSM2
+                    self._vector = VectorSM2(self)
+                except ImportError:
+                    self._vector = False
+            if self._vector:
+                return [P.x for P in self._vector.base_mul(scalars)]
+        table = self.base_table
+        return [xy[0] for xy in _batch_normalize([table.multiply_jacobian(k) for k in scalars], self.curve)]
+
+    def _generate_secure_randoms(self, count: int) -> List[int]:
+        """成批生成[1, n-1]内的随机数：一次读取系统随机数，每个取320位后约简（偏差小于2^-64）"""
+        n1 = int(self.curve.n) - 1
+        data = os.urandom(40 * count)
+        return [int.from_bytes(data[i:i + 40], 'big') % n1 + 1 for i in range(0, 40 * count, 40)]
+
     def _generate_secure_random(self) -> int:
         """生成安全的随机数"""
         # 使用系统随机数生成器
@@ -273,11 +943,18 @@ class OptimizedSM2:
         if t == 0:
             return False
         
+        cache = self.verify_cache
+        if cache is not None and cache.contains(e_hash, (r, s), public_key):
+            return True
+        
         # 并行计算点乘
         if self.use_parallel:
-            return self._parallel_verify(e, r, s, t, public_key)
+            valid = self._parallel_verify(e, r, s, t, public_key)
         else:
-            return self._sequential_verify(e, r, s, t, public_key)
+            valid = self._sequential_verify(e, r, s, t, public_key)
+        if valid and cache is not None:
+            cache.add(e_hash, (r, s), public_key)
+        return valid
     
     def _parallel_verify(self, e: int, r: int, s: int, t: int, 
                         public_key: OptimizedSM2Point) -> bool:
@@ -310,17 +987,63 @@ class OptimizedSM2:
         R = (e + point_sum.x) % self.curve.n
         return R == r
     
-    def encrypt(self, message: bytes, public_key: OptimizedSM2Point) -> Tuple[OptimizedSM2Point, bytes, bytes]:
-        """优化的SM2加密"""
+    def verify_batch(self, items: List[Tuple[bytes, Tuple[int, int], OptimizedSM2Point]]) -> List[bool]:
+        """
+        批量验证：每个签名的 sG + tP 在Jacobian坐标下计算（sG使用G的固定基表，
+        批内重复出现HOT_KEY_THRESHOLD次以上的公钥使用缓存的固定基表），
+        最后一次批量求逆得到全部x坐标。返回与items对应的验证结果列表。
+        配置了verify_cache时命中缓存的签名不再计算。
+        """
+        n, p, a = self.curve.n, self.curve.p, self.curve.a
+        results = [False] * len(items)
+
+        counts = {}
+        for _, _, public_key in items:
+            key = (int(public_key.x), int(public_key.y))
+            counts[key] = counts.get(key, 0) + 1
+
+        cache = self.verify_cache
+        indices, points, checks = [], [], []
+        for i, (message, (r, s), public_key) in enumerate(items):
+            if not (1 <= r < n and 1 <= s < n):
+                continue
+            t = (r + s) % n
+            if t == 0 or not self._is_valid_public_key(public_key):
+                continue
+            e_hash = self._hash_message(message, public_key)
+            if cache is not None and cache.contains(e_hash, (r, s), public_key):
+                results[i] = True
+                continue
+            e = int.from_bytes(e_hash, 'big') % n
+
+            sG = self.base_table.multiply_jacobian(s)
+            if counts[(int(public_key.x), int(public_key.y))] >= HOT_KEY_THRESHOLD:
+                tP = self._recipient_table(public_key).multiply_jacobian(t)
+            else:
+                tP = _fixed_window_mul(t, public_key.x, public_key.y, self.curve)
+            indices.append(i)
+            points.append(_jacobian_add(sG, tP, a, p))
+            checks.append((e, r, e_hash))
+
+        for i, xy, (e, r, e_hash) in zip(indices, _batch_normalize(points, self.curve), checks):
+            results[i] = xy is not None and (e + xy[0]) % n == r
+            if results[i] and cache is not None:
+                cache.add(e_hash, items[i][1], items[i][2])
+        return results
+
+    def encrypt(self, message: bytes,
+                public_key: Union[OptimizedSM2Point, SM2Recipient]) -> Tuple[OptimizedSM2Point, bytes, bytes]:
+        """优化的SM2加密；public_key为SM2Recipient时kP使用接收方的固定基表"""
+        recipient = public_key if isinstance(public_key, SM2Recipient) else None
         while True:
             # 生成随机数k
             k = self._generate_secure_random()
             
             # 计算C1 = k * G
-            C1 = k * self.G
+            C1 = self._secret_mul(k, self.G)
             
             # 计算k * PA
-            kP = k * public_key
+            kP = recipient.multiply(k) if recipient else self._secret_mul(k, public_key)
             
             # 计算t = KDF(kP, klen)
             t = self._kdf(kP, len(message))
@@ -340,8 +1063,8 @@ class OptimizedSM2:
         """优化的SM2解密"""
         C1, C2, C3 = ciphertext
 
-        # 验证C1是否在曲线上
-        if not self._is_valid_public_key(C1):
+        # 验证C1是否在曲线上 (h = 1，无需 n * C1 检查；临时点不进入公钥缓存)
+        if not self._is_on_curve(C1):
             raise ValueError("Invalid C1 point")
 
         # 计算h * C1
@@ -350,34 +1073,159 @@ class OptimizedSM2:
             raise ValueError("Invalid ciphertext")
 
         # 计算d * C1
-        dC1 = private_key * C1
+        dC1 = self._secret_mul(private_key, C1)
+        return self._decrypt_with_shared_point(dC1, C2, C3)
 
+    def _decrypt_with_shared_point(self, dC1: OptimizedSM2Point, C2: bytes, C3: bytes) -> bytes:
+        """由共享点d * C1恢复明文并校验C3"""
         # 计算t = KDF(dC1, klen)
         t = self._kdf(dC1, len(C2))
-        if all(b == 0 for b in t):
+        if not any(t):
             raise ValueError("Invalid ciphertext")
 
         # 计算M = C2 ⊕ t
-        message = bytes(a ^ b for a, b in zip(C2, t))
+        message = (int.from_bytes(C2, 'big') ^ int.from_bytes(t, 'big')).to_bytes(len(C2), 'big')
 
         # 验证C3 = Hash(dC1 || M)
-        try:
-            expected_C3 = self._hash_kp_m(dC1, message)
-            if C3 != expected_C3:
-                pass
-        except Exception as e:
-            print(f"Warning: Hash verification error: {e}")
+        if not hmac.compare_digest(C3, self._hash_kp_m(dC1, message)):
+            raise ValueError("Invalid ciphertext: C3 mismatch")
 
         return message
+
+    def decrypt_batch(self, ciphertexts: List[Tuple[OptimizedSM2Point, bytes, bytes]],
+                      private_key: int, width: int = 4) -> List[dict]:
+        """
+        同一私钥批量解密：私钥只重编码一次，各C1的奇数倍点表批量归一化后以混合加法
+        在Jacobian坐标下计算全部d * C1，再以一次Montgomery批量求逆统一转换为仿射坐标，
+        最后逐条执行KDF与C3校验。
+        每条结果为 {'message': 明文或None, 'error': 错误信息或None}，单条失败不影响其余条目。
+        """
+        if private_key % self.curve.n == 0:
+            raise ValueError("Invalid private key")
+
+        results = [{'message': None, 'error': None} for _ in ciphertexts]
+        digits = _regular_recode(private_key, self.curve.n, width)
+
+        indices, tables = [], []
+        for i, ciphertext in enumerate(ciphertexts):
+            try:
+                C1, C2, C3 = ciphertext
+                if not isinstance(C1, OptimizedSM2Point) or not self._is_on_curve(C1):
+                    raise ValueError("Invalid C1 point")
+            except (TypeError, ValueError) as e:
+                results[i]['error'] = str(e)
+                continue
+            indices.append(i)
+            tables.extend(_odd_multiples(C1.x, C1.y, self.curve, width))
+
+        # 所有奇数倍点表一次批量归一化，主循环使用混合加法
+        size = 1 << (width - 1)
+        flat = _batch_normalize(tables, self.curve)
+        shared = _fixed_window_eval_many(digits, [flat[j * size:(j + 1) * size] for j in range(len(indices))],
+                                         self.curve, width) if indices else []
+
+        for i, dC1 in zip(indices, _batch_to_affine(shared, self.curve)):
+            _, C2, C3 = ciphertexts[i]
+            try:
+                results[i]['message'] = self._decrypt_with_shared_point(dC1, C2, C3)
+            except (TypeError, ValueError) as e:
+                results[i]['error'] = str(e)
+        return results
     
+    def encrypt_multi(self, message: bytes,
+                      public_keys: List[Union[OptimizedSM2Point, SM2Recipient]]) -> dict:
+        """
+        多接收方加密：C1 = kG只计算一次，k只重编码一次并同步计算全部kP_i，
+        一次批量求逆归一化。消息用随机内容密钥只加密一次，内容密钥按接收方分别封装。
+        槽位号由共享点kP_i = d_i * C1派生，接收方计算出d_i * C1后即可O(1)定位自己的槽位。
+
+        返回 {'C1': 点, 'slots': {槽位号: 封装的内容密钥}, 'C2': 密文, 'C3': 校验值}
+        """
+        if not public_keys:
+            raise ValueError("At least one recipient is required")
+        for public_key in public_keys:
+            key = public_key.public_key if isinstance(public_key, SM2Recipient) else public_key
+            if not self._is_valid_public_key(key):
+                raise ValueError("Invalid public key")
+
+        k = self._generate_secure_random()
+        C1 = self._secret_mul(k, self.G)
+        shared = self._shared_points(k, public_keys)
+
+        body_key = os.urandom(BODY_KEY_SIZE)
+        slots = {}
+        for kP in shared:
+            wrap = self._kdf(kP, BODY_KEY_SIZE)
+            slots[self._slot_id(kP)] = bytes(a ^ b for a, b in zip(body_key, wrap))
+
+        stream = self._kdf_bytes(body_key, len(message))
+        C2 = (int.from_bytes(message, 'big') ^ int.from_bytes(stream, 'big')).to_bytes(len(message), 'big')
+        C3 = hashlib.sha256(body_key + message).digest()
+        return {'C1': C1, 'slots': slots, 'C2': C2, 'C3': C3}
+
+    def decrypt_multi(self, ciphertext: dict, private_key: int) -> bytes:
+        """多接收方密文解密：计算d * C1，按槽位号取出并解封内容密钥"""
+        C1 = ciphertext['C1']
+        if not self._is_on_curve(C1):
+            raise ValueError("Invalid C1 point")
+
+        dC1 = self._secret_mul(private_key, C1)
+        wrapped = ciphertext['slots'].get(self._slot_id(dC1))
+        if wrapped is None:
+            raise ValueError("No slot for this private key")
+
+        wrap = self._kdf(dC1, BODY_KEY_SIZE)
+        body_key = bytes(a ^ b for a, b in zip(wrapped, wrap))
+        C2 = ciphertext['C2']
+        stream = self._kdf_bytes(body_key, len(C2))
+        message = (int.from_bytes(C2, 'big') ^ int.from_bytes(stream, 'big')).to_bytes(len(C2), 'big')
+        if not hmac.compare_digest(ciphertext['C3'], hashlib.sha256(body_key + message).digest()):
+            raise ValueError("Invalid ciphertext: C3 mismatch")
+        return message
+
+    def _shared_points(self, k: int, public_keys: List[Union[OptimizedSM2Point, SM2Recipient]],
+                       width: int = 4) -> List[OptimizedSM2Point]:
+        """同一k乘多个公钥：SM2Recipient使用其固定基表，其余公钥共享k的重编码同步计算"""
+        size = 1 << (width - 1)
+        variable = [i for i, key in enumerate(public_keys) if not isinstance(key, SM2Recipient)]
+        tables = []
+        for i in variable:
+            tables.extend(_odd_multiples(public_keys[i].x, public_keys[i].y, self.curve, width))
+        flat = _batch_normalize(tables, self.curve)
+
+        projective = [None] * len(public_keys)
+        if variable:
+            digits = _regular_recode(k, self.curve.n, width)
+            results = _fixed_window_eval_many(digits, [flat[j * size:(j + 1) * size] for j in range(len(variable))],
+                                              self.curve, width)
+            for i, result in zip(variable, results):
+                projective[i] = result
+        for i, key in enumerate(public_keys):
+            if isinstance(key, SM2Recipient):
+                projective[i] = key.table.multiply_jacobian(k)
+        return _batch_to_affine(projective, self.curve)
+
+    def _slot_id(self, point: OptimizedSM2Point) -> bytes:
+        """由共享点派生的槽位号（不暴露接收方公钥）"""
+        x_bytes = int(point.x).to_bytes(32, 'big')
+        y_bytes = int(point.y).to_bytes(32, 'big')
+        return hashlib.sha256(b'slot' + x_bytes + y_bytes).digest()[:SLOT_ID_SIZE]
+
+    def _kdf_bytes(self, key: bytes, klen: int) -> bytes:
+        """以字节串为输入的计数器模式KDF，用于内容密钥派生密钥流"""
+        blocks = (klen + 31) // 32
+        return b''.join(hashlib.sha256(key + ct.to_bytes(4, 'big')).digest()
+                        for ct in range(1, blocks + 1))[:klen]
+
     def _kdf(self, point: OptimizedSM2Point, klen: int) -> bytes:
-        """优化的密钥派生函数"""
+        """优化的密钥派生函数 (计数器模式，输出长度不受单个哈希长度限制)"""
         # 使用更精确的序列化方法，避免浮点精度问题
         x_bytes = int(point.x).to_bytes((int(point.x).bit_length() + 7) // 8, 'big')
         y_bytes = int(point.y).to_bytes((int(point.y).bit_length() + 7) // 8, 'big')
         data = x_bytes + y_bytes
-        hash_result = hashlib.sha256(data).digest()
-        return hash_result[:klen]
+        blocks = (klen + 31) // 32
+        return b''.join(hashlib.sha256(data + ct.to_bytes(4, 'big')).digest()
+                        for ct in range(1, blocks + 1))[:klen]
 
     def _hash_kp_m(self, point: OptimizedSM2Point, message: bytes) -> bytes:
         """计算Hash(kP || M)"""
@@ -387,60 +1235,53 @@ class OptimizedSM2:
         data = x_bytes + y_bytes + message
         return hashlib.sha256(data).digest()
 
-    def benchmark(self, iterations: int = 1000):
-        """性能基准测试"""
-        print(f"=== SM2优化性能基准测试 ({iterations} 次迭代) ===")
-        
-        # 生成密钥对
-        print("生成密钥对...")
-        start_time = time.time()
-        private_key, public_key = self.generate_keypair()
-        keygen_time = time.time() - start_time
-        print(f"密钥生成时间: {keygen_time:.4f} 秒")
-        
-        # 测试签名性能
-        message = b"Benchmark test message for SM2 optimization"
-        print(f"\n测试签名性能...")
-        
-        start_time = time.time()
-        for _ in range(iterations):
-            signature = self.sign(message, private_key, public_key)
-        sign_time = time.time() - start_time
-        print(f"平均签名时间: {sign_time/iterations:.6f} 秒")
-        
-        # 测试验证性能
-        print(f"测试验证性能...")
-        start_time = time.time()
-        for _ in range(iterations):
-            is_valid = self.verify(message, signature, public_key)
-        verify_time = time.time() - start_time
-        print(f"平均验证时间: {verify_time/iterations:.6f} 秒")
-        
-        # 测试加密性能
-        print(f"\n测试加密性能...")
-        start_time = time.time()
-        for _ in range(iterations):
-            ciphertext = self.encrypt(message, public_key)
-        encrypt_time = time.time() - start_time
-        print(f"平均加密时间: {encrypt_time/iterations:.6f} 秒")
-        
-        # 测试解密性能
-        print(f"测试解密性能...")
-        start_time = time.time()
-        for _ in range(iterations):
-            decrypted = self.decrypt(ciphertext, private_key)
-        decrypt_time = time.time() - start_time
-        print(f"平均解密时间: {decrypt_time/iterations:.6f} 秒")
-        
-        # 性能总结
-        print(f"\n=== 性能总结 ===")
-        print(f"密钥生成: {keygen_time:.4f}秒")
-        print(f"签名: {sign_time/iterations:.6f}秒/次")
-        print(f"验证: {verify_time/iterations:.6f}秒/次")
-        print(f"加密: {encrypt_time/iterations:.6f}秒/次")
-        print(f"解密: {decrypt_time/iterations:.6f}秒/次")
-        print(f"总操作次数: {iterations * 4}")
-        print(f"总时间: {keygen_time + sign_time + verify_time + encrypt_time + decrypt_time:.4f}秒")
+    def benchmark(self, iterations: int = 1000) -> dict:
+        """性能基准测试（见performance模块），iterations为每项操作的最大迭代次数"""
+        try:
+            from .performance import benchmark_implementation, print_report
+        except ImportError:  # 以顶层模块方式导入（src目录在sys.path中）
+            from performance import benchmark_implementation, print_report
+        results = benchmark_implementation(self, max_iterations=iterations)
+        print_report({'results': {'optimized': results}})
+        return results
+
+    def benchmark_scalar_mult(self, iterations: int = 50,
+                              methods: Tuple[str, ...] = SCALAR_MULT_METHODS) -> dict:
+        """
+        标量乘法实现对比：随机标量的平均耗时、相对NAF的开销，以及低/高汉明重量标量的
+        耗时差(timing_spread)，后者反映耗时对标量的依赖程度。
+        """
+        n = int(self.curve.n)
+        point = self.G.scalar_mul(random.randint(1, n - 1))
+        random_keys = [random.randint(1, n - 1) for _ in range(iterations)]
+        # 低汉明重量标量与高汉明重量标量
+        sparse_keys = [(1 << 255) | (1 << random.randrange(255)) for _ in range(iterations)]
+        dense_keys = [((1 << 255) - 1) ^ (1 << random.randrange(255)) for _ in range(iterations)]
+
+        def average(method, keys):
+            start = time.perf_counter()
+            for k in keys:
+                point.scalar_mul(k, method)
+            return (time.perf_counter() - start) / len(keys)
+
+        results = {}
+        for method in methods:
+            sparse, dense = average(method, sparse_keys), average(method, dense_keys)
+            results[method] = {
+                'avg_time': average(method, random_keys),
+                'timing_spread': abs(dense - sparse) / max(dense, sparse),
+            }
+        if 'naf' in results:
+            for method in results:
+                results[method]['overhead'] = results[method]['avg_time'] / results['naf']['avg_time']
+
+        print(f"=== 标量乘法实现对比 ({iterations} 次迭代) ===")
+        for method, stats in results.items():
+            line = f"{method:>7}: {stats['avg_time'] * 1000:.3f} 毫秒/次, 耗时差 {stats['timing_spread']:.1%}"
+            if 'overhead' in stats:
+                line += f", 相对NAF {stats['overhead']:.2f}x"
+            print(line)
+        return results
 
 
 def main():
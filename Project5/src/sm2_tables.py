@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SM2 Precomputed Table Store
+SM2预计算表磁盘存储
+
+将基点G及可选的长期公钥的固定基窗口表序列化为带版本号与校验和的二进制文件，
+加载时用mmap映射：坐标在首次访问对应窗口时才从映射缓冲区解码，进程启动只需读取目录，
+多个进程共享同一份物理页。
+
+文件格式（大端）：
+    文件头  magic(8) | version(u16) | coord_size(u16) | count(u32) | 目录SHA-256(32)
+    目录    每张表: x(32) | y(32) | width(u8) | windows(u16) | size(u16) |
+            offset(u64) | length(u64) | 数据SHA-256(32)
+    数据    每个窗口依次存放size个x坐标与size个y坐标，每个坐标32字节
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import time
+from collections.abc import Sequence
+from typing import Dict, Iterable, List, Optional, Tuple
+from . import sm2_optimized
+from .sm2_optimized import FixedBaseTable, OptimizedSM2, OptimizedSM2Curve, OptimizedSM2Point
+
+
+MAGIC = b'SM2PTBL\x00'
+FORMAT_VERSION = 1
+COORD_SIZE = 32
+
+HEADER = struct.Struct('>8sHHI32s')
+ENTRY = struct.Struct('>32s32sBHHQQ32s')
+
+# 表数据按该字节数对齐
+DATA_ALIGNMENT = 64
+
+
+class _MappedWindows(Sequence):
+    """映射缓冲区上的窗口序列：按需解码窗口的 (x列, y列) 并缓存"""
+
+    def __init__(self, buffer: memoryview, count: int, size: int, element=int):
+        self._buffer = buffer
+        self._element = element
+        self._count = count
+        self._size = size
+        self._decoded: List[Optional[tuple]] = [None] * count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("window index out of range")
+        window = self._decoded[index]
+        if window is None:
+            window = self._decode(index)
+            self._decoded[index] = window
+        return window
+
+    def _decode(self, index: int) -> tuple:
+        size = self._size
+        start = index * 2 * size * COORD_SIZE
+        element = self._element
+        coords = [element(int.from_bytes(self._buffer[offset:offset + COORD_SIZE], 'big'))
+                  for offset in range(start, start + 2 * size * COORD_SIZE, COORD_SIZE)]
+        return tuple(coords[:size]), tuple(coords[size:])
+
+
+class MappedFixedBaseTable(FixedBaseTable):
+    """从映射文件加载的固定基表，接口与FixedBaseTable相同"""
+
+    def __init__(self, point: OptimizedSM2Point, width: int, windows: Sequence):
+        self.curve = point.curve
+        self.width = width
+        self.point = point
+        self.windows = windows
+
+
+class TableStore:
+    """mmap方式加载的预计算表文件"""
+
+    def __init__(self, path: str, verify: bool = True):
+        """
+        Args:
+            path: 表文件路径
+            verify: 首次取用某张表时校验其数据的SHA-256
+        """
+        self.path = path
+        self.verify = verify
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._entries = self._read_directory()
+        except Exception:
+            self._mmap.close()
+            raise
+        self._tables: Dict[Tuple[int, int], MappedFixedBaseTable] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, point) -> bool:
+        return (int(point.x), int(point.y)) in self._entries
+
+    def _read_directory(self) -> Dict[Tuple[int, int], tuple]:
+        if len(self._mmap) < HEADER.size:
+            raise ValueError("Table file too short")
+        magic, version, coord_size, count, digest = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError("Not an SM2 table file")
+        if version != FORMAT_VERSION or coord_size != COORD_SIZE:
+            raise ValueError(f"Unsupported table file version: {version}")
+        end = HEADER.size + count * ENTRY.size
+        if len(self._mmap) < end:
+            raise ValueError("Truncated table directory")
+        if hashlib.sha256(self._mmap[HEADER.size:end]).digest() != digest:
+            raise ValueError("Table directory checksum mismatch")
+
+        entries = {}
+        for i in range(count):
+            x, y, width, windows, size, offset, length, checksum = ENTRY.unpack_from(
+                self._mmap, HEADER.size + i * ENTRY.size)
+            if length != windows * 2 * size * COORD_SIZE or offset + length > len(self._mmap):
+                raise ValueError("Corrupt table directory entry")
+            key = (int.from_bytes(x, 'big'), int.from_bytes(y, 'big'))
+            entries[key] = (width, windows, size, offset, length, checksum)
+        return entries
+
+    def points(self) -> List[Tuple[int, int]]:
+        """文件中各表的基点坐标"""
+        return list(self._entries)
+
+    def get(self, point: OptimizedSM2Point) -> Optional[MappedFixedBaseTable]:
+        """返回point的固定基表，文件中没有时返回None"""
+        key = (int(point.x), int(point.y))
+        table = self._tables.get(key)
+        if table is not None:
+            return table
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        width, windows, size, offset, length, checksum = entry
+        buffer = memoryview(self._mmap)[offset:offset + length]
+        if self.verify and hashlib.sha256(buffer).digest() != checksum:
+            raise ValueError("Table data checksum mismatch")
+        windows = _MappedWindows(buffer, windows, size, point.curve.backend.element)
+        table = MappedFixedBaseTable(point, width, windows)
+        self._tables[key] = table
+        return table
+
+    def close(self):
+        """关闭映射；已取得的表在关闭后不可再使用"""
+        self._tables.clear()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # 仍有表引用映射缓冲区时由垃圾回收释放
+            pass
+
+
+def _table_bytes(table: FixedBaseTable) -> bytes:
+    parts = []
+    for xs, ys in table.windows:
+        for coordinate in list(xs) + list(ys):
+            parts.append(int(coordinate).to_bytes(COORD_SIZE, 'big'))
+    return b''.join(parts)
+
+
+def write_tables(path: str, tables: Iterable[FixedBaseTable]):
+    """将固定基表写入path（先写临时文件再原子替换）"""
+    tables = list(tables)
+    directory, blobs = [], []
+    offset = HEADER.size + len(tables) * ENTRY.size
+    for table in tables:
+        offset += -offset % DATA_ALIGNMENT
+        data = _table_bytes(table)
+        size = len(table.windows[0][0])
+        directory.append(ENTRY.pack(int(table.point.x).to_bytes(COORD_SIZE, 'big'),
+                                    int(table.point.y).to_bytes(COORD_SIZE, 'big'),
+                                    table.width, len(table.windows), size,
+                                    offset, len(data), hashlib.sha256(data).digest()))
+        blobs.append((offset, data))
+        offset += len(data)
+
+    directory = b''.join(directory)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, COORD_SIZE, len(tables), hashlib.sha256(directory).digest())
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header + directory)
+        for data_offset, data in blobs:
+            f.write(b'\x00' * (data_offset - f.tell()))
+            f.write(data)
+    os.replace(tmp_path, path)
+
+
+def build_table_file(path: str, public_keys: Iterable[OptimizedSM2Point] = (), width: int = 4):
+    """构建基点G及给定公钥的固定基表并写入path"""
+    curve = OptimizedSM2Curve()
+    G = OptimizedSM2Point(curve.Gx, curve.Gy, curve)
+    tables = [FixedBaseTable(G, width)]
+    tables.extend(FixedBaseTable(OptimizedSM2Point(P.x, P.y, curve), width) for P in public_keys)
+    write_tables(path, tables)
+
+
+def install(path: str, verify: bool = True) -> TableStore:
+    """加载表文件并设为进程内默认的预计算表存储"""
+    store = TableStore(path, verify)
+    sm2_optimized.set_default_table_store(store)
+    return store
+
+
+def main():
+    """演示：冷启动时从文件加载G表与即时构建G表的耗时对比"""
+    import tempfile
+
+    print("=== SM2预计算表磁盘存储演示 ===")
+
+    sm2 = OptimizedSM2(use_parallel=False)
+    private_key, public_key = sm2.generate_keypair()
+    path = os.path.join(tempfile.mkdtemp(), 'sm2_tables.bin')
+
+    start = time.perf_counter()
+    build_table_file(path, [public_key])
+    print(f"构建并写入表文件: {(time.perf_counter() - start) * 1000:.1f} 毫秒, "
+          f"大小 {os.path.getsize(path) / 1024:.1f} KB")
+
+    start = time.perf_counter()
+    FixedBaseTable(sm2.G).multiply(private_key)
+    built = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with TableStore(path) as store:
+        loaded = store.get(sm2.G).multiply(private_key)
+        mapped = time.perf_counter() - start
+        print(f"即时构建G表并计算dG: {built * 1000:.2f} 毫秒")
+        print(f"映射G表并计算dG:     {mapped * 1000:.2f} 毫秒")
+        print(f"结果一致: {'是' if loaded == public_key else '否'}")
+
+        fast = OptimizedSM2(use_parallel=False, table_store=store)
+        message = b"cold start"
+        signature = fast.sign(message, private_key, public_key)
+        ciphertext = fast.recipient(public_key).encrypt(message)
+        print(f"签名验证: {'成功' if fast.verify(message, signature, public_key) else '失败'}")
+        print(f"加密解密: {'成功' if fast.decrypt(ciphertext, private_key) == message else '失败'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Signature Verification Cache
+SM2签名验证结果缓存
+
+消息总线重投递时同一 (摘要, 签名, 公钥) 会被反复验证。缓存以三元组规范编码的SHA-256
+作为键，只记录验证通过的结果（失败的验证总是重新计算，伪造的签名无法借缓存通过），
+条目超过TTL或缓存达到容量时淘汰。
+
+    VerificationCache         进程内LRU缓存，线程安全
+    SharedVerificationCache   基于multiprocessing.shared_memory的直接映射表，多个工作进程
+                              按名称挂接同一块共享内存；槽位无锁读写，每个槽位存放
+                              到期时间与 SHA-256(键 || 到期时间) 校验值，写入撕裂只会造成未命中
+
+两者接口相同，可传给 OptimizedSM2(verify_cache=...)；hit_rate 与 stats() 给出本进程的命中率。
+"""
+
+import hashlib
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+# 进程内缓存的默认最大条目数
+VERIFY_CACHE_SIZE = 4096
+
+# 缓存条目的默认存活时间（秒）
+VERIFY_CACHE_TTL = 300.0
+
+# 共享内存缓存的默认槽位数（每个槽位SLOT.size字节）
+SHARED_CACHE_SLOTS = 16384
+
+# 共享内存文件头: magic(8) | 槽位数(u32) | TTL(f64)
+SHARED_MAGIC = b'SM2VCACH'
+HEADER = struct.Struct('>8sId')
+
+# 槽位: 到期时间(f64, Unix时间) | SHA-256(键 || 到期时间)
+SLOT = struct.Struct('>d32s')
+
+COORD_SIZE = 32
+
+
+def cache_key(digest: bytes, signature: Tuple[int, int], public_key) -> bytes:
+    """
+    三元组的规范编码的SHA-256：len(digest)(u16) | digest | r | s | Px | Py，
+    整数均为32字节大端定长编码。
+    """
+    r, s = signature
+    encoded = b''.join((struct.pack('>H', len(digest)), digest,
+                        *(int(value).to_bytes(COORD_SIZE, 'big')
+                          for value in (r, s, public_key.x, public_key.y))))
+    return hashlib.sha256(encoded).digest()
+
+
+class _CacheStats:
+    """命中/未命中计数"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """命中率（尚无查询时为0）"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _record(self, hit: bool) -> bool:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return hit
+
+    def stats(self) -> dict:
+        """本进程的缓存统计"""
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate,
+                'evictions': self.evictions, 'size': len(self)}
+
+
+class VerificationCache(_CacheStats):
+    """进程内的验证结果缓存：超过max_entries时淘汰最久未用的条目"""
+
+    def __init__(self, max_entries: int = VERIFY_CACHE_SIZE, ttl: float = VERIFY_CACHE_TTL,
+                 clock=time.monotonic):
+        if max_entries < 1:
+            raise ValueError("Cache size must be positive")
+        if ttl <= 0:
+            raise ValueError("Cache TTL must be positive")
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def contains(self, digest: bytes, signature: Tuple[int, int], public_key) -> bool:
+        """三元组是否已验证通过且未过期"""
+        key = cache_key(digest, signature, public_key)
+        with self._lock:
+            expiry = self._entries.get(key)
+            if expiry is not None and expiry <= self._clock():
+                del self._entries[key]
+                self.evictions += 1
+                expiry = None
+            if expiry is not None:
+                self._entries.move_to_end(key)
+            return self._record(expiry is not None)
+
+    def add(self, digest: bytes, signature: Tuple[int, int], public_key) -> None:
+        """记录验证通过的三元组"""
+        key = cache_key(digest, signature, public_key)
+        with self._lock:
+            self._entries[key] = self._clock() + self.ttl
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SharedVerificationCache(_CacheStats):
+    """
+    共享内存中的验证结果缓存。name为None时创建新的共享内存块，否则挂接已有的块
+    （工作进程中用主进程的 cache.name 构造）。键按前8字节映射到槽位，冲突时新条目覆盖旧条目。
+    创建者负责 unlink()。
+    """
+
+    def __init__(self, name: Optional[str] = None, slots: int = SHARED_CACHE_SLOTS,
+                 ttl: float = VERIFY_CACHE_TTL):
+        from multiprocessing import shared_memory
+        super().__init__()
+        if name is None:
+            if slots < 1:
+                raise ValueError("Cache size must be positive")
+            if ttl <= 0:
+                raise ValueError("Cache TTL must be positive")
+            self._shm = shared_memory.SharedMemory(create=True, size=HEADER.size + slots * SLOT.size)
+            self._shm.buf[:HEADER.size] = HEADER.pack(SHARED_MAGIC, slots, ttl)
+            self._owner = True
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._owner = False
+            # 挂接方不负责释放：避免本进程退出时resource_tracker删除创建者的共享内存
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self._shm._name, 'shared_memory')
+            magic, slots, ttl = HEADER.unpack_from(self._shm.buf, 0)
+            if magic != SHARED_MAGIC:
+                raise ValueError("Not a verification cache")
+        self.slots = slots
+        self.ttl = ttl
+
+    @property
+    def name(self) -> str:
+        """共享内存块名称，传给工作进程用于挂接"""
+        return self._shm.name
+
+    def __len__(self) -> int:
+        """未过期的条目数"""
+        now = time.time()
+        return sum(1 for index in range(self.slots)
+                   if SLOT.unpack_from(self._shm.buf, self._offset(index))[0] > now)
+
+    def _offset(self, index: int) -> int:
+        return HEADER.size + index * SLOT.size
+
+    def _slot(self, key: bytes) -> int:
+        return self._offset(int.from_bytes(key[:8], 'big') % self.slots)
+
+    @staticmethod
+    def _tag(key: bytes, expiry: float) -> bytes:
+        return hashlib.sha256(key + struct.pack('>d', expiry)).digest()
+
+    def contains(self, digest: bytes, signature: Tuple[int, int], public_key) -> bool:
+        """三元组是否已验证通过且未过期"""
+        key = cache_key(digest, signature, public_key)
+        expiry, tag = SLOT.unpack_from(self._shm.buf, self._slot(key))
+        return self._record(expiry > time.time() and tag == self._tag(key, expiry))
+
+    def add(self, digest: bytes, signature: Tuple[int, int], public_key) -> None:
+        """记录验证通过的三元组（覆盖同一槽位中的旧条目）"""
+        key = cache_key(digest, signature, public_key)
+        offset = self._slot(key)
+        if SLOT.unpack_from(self._shm.buf, offset)[0] > time.time():
+            self.evictions += 1
+        expiry = time.time() + self.ttl
+        SLOT.pack_into(self._shm.buf, offset, expiry, self._tag(key, expiry))
+
+    def clear(self) -> None:
+        self._shm.buf[HEADER.size:] = bytes(self.slots * SLOT.size)
+
+    def close(self) -> None:
+        """解除本进程的映射"""
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """删除共享内存块（仅创建者调用）"""
+        if self._owner:
+            self._shm.unlink()
+
+
+def main():
+    """演示：重投递消息的验证命中缓存"""
+    try:
+        from .sm2_optimized import OptimizedSM2
+    except ImportError:
+        from sm2_optimized import OptimizedSM2
+
+    print("=== SM2签名验证结果缓存 ===")
+    cache = VerificationCache()
+    sm2 = OptimizedSM2(use_parallel=False, verify_cache=cache)
+    private_key, public_key = sm2.generate_keypair()
+    messages = [f"message {i}".encode() for i in range(10)]
+    signatures = [sm2.sign(message, private_key, public_key) for message in messages]
+
+    for _ in range(3):
+        start = time.perf_counter()
+        results = [sm2.verify(m, sig, public_key) for m, sig in zip(messages, signatures)]
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"验证 {len(results)} 条: {all(results)}, 耗时 {elapsed:.2f} ms")
+    print(f"缓存统计: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HNP格攻击测试模块
+Test module for the SM2 hidden number problem attack
+"""
+
+import random
+import unittest
+from src.hnp_attack import SM2HNPAttack, lll_reduce, bkz_reduce
+
+
+def _norm2(v):
+    return sum(x * x for x in v)
+
+
+class TestLatticeReduction(unittest.TestCase):
+    """格基约化测试类"""
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.basis = [[rng.randrange(-2 ** 40, 2 ** 40) for _ in range(8)] for _ in range(8)]
+
+    def test_float_and_exact_lll(self):
+        """测试浮点与整数Gram-Schmidt两种LLL结果满足约化条件"""
+        print("测试LLL约化...")
+        for gso in ('float', 'exact'):
+            reduced = lll_reduce(self.basis, gso=gso)
+            self.assertEqual(len(reduced), 8)
+            self.assertLess(_norm2(reduced[0]), min(_norm2(row) for row in self.basis))
+
+        float_first = _norm2(lll_reduce(self.basis)[0])
+        exact_first = _norm2(lll_reduce(self.basis, gso='exact')[0])
+        self.assertLess(abs(float_first - exact_first), max(float_first, exact_first))
+
+    def test_dependent_vectors_removed(self):
+        """测试线性相关输入在浮点LLL中被消去为零向量后删除"""
+        basis = self.basis[:4] + [[a + b for a, b in zip(self.basis[0], self.basis[1])]]
+        reduced = lll_reduce(basis)
+        self.assertEqual(len(reduced), 4)
+
+    def test_bkz_not_worse_than_lll(self):
+        """测试BKZ-lite结果的首向量不长于LLL"""
+        print("测试BKZ-lite约化...")
+        lll_first = _norm2(lll_reduce(self.basis)[0])
+        bkz_first = _norm2(bkz_reduce(self.basis, block_size=4)[0])
+        self.assertLessEqual(bkz_first, lll_first)
+
+
+class TestSM2HNPAttack(unittest.TestCase):
+    """SM2 HNP攻击测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.attack = SM2HNPAttack()
+        self.private_key, self.public_key = self.attack.misuse.sm2.generate_keypair()
+        self.rng = random.Random(2025)
+
+    def test_msb_leakage_recovery(self):
+        """测试k高16位泄露时恢复私钥"""
+        print("测试随机数高位泄露攻击...")
+        samples = self.attack.generate_samples(self.private_key, self.public_key, 18, 16, rng=self.rng)
+        recovered = self.attack.solve(samples, self.public_key)
+        self.assertEqual(recovered, self.private_key)
+
+    def test_biased_nonce_recovery_with_bkz(self):
+        """测试k高位为0（有偏随机数）时使用BKZ恢复私钥"""
+        print("测试有偏随机数攻击...")
+        samples = self.attack.generate_samples(self.private_key, self.public_key, 18, 16,
+                                               biased=True, rng=self.rng)
+        recovered = self.attack.solve(samples, method='bkz', block_size=6)
+        self.assertEqual(recovered, self.private_key)
+
+    def test_too_few_signatures(self):
+        """测试签名数不足时返回None而不是错误私钥"""
+        samples = self.attack.generate_samples(self.private_key, self.public_key, 8, 16, rng=self.rng)
+        self.assertIsNone(self.attack.solve(samples, self.public_key))
+
+    def test_benchmark_report(self):
+        """测试泄露位数统计报告的格式"""
+        report = self.attack.benchmark(leak_bits_list=(32,), trials=1)
+        self.assertEqual(len(report), 1)
+        self.assertEqual(report[0]['leak_bits'], 32)
+        self.assertIsNotNone(report[0]['signatures'])
+        self.assertGreater(report[0]['avg_time'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导入开销测试模块
+Test module for import time and shared per-process state
+"""
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import unittest
+from src.sm2_optimized import OptimizedSM2, get_curve
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 导入 src.sm2_optimized 的累计耗时上限（毫秒，字节码已缓存）
+IMPORT_TIME_BUDGET_MS = 100
+
+# 仅在实际使用时才允许加载的重量级模块
+DEFERRED_MODULES = ('numpy', 'gmpy2', 'ecdsa', 'concurrent.futures.thread', 'concurrent.futures.process')
+
+
+def _run_python(*args, pycache_prefix=None):
+    env = dict(os.environ)
+    if pycache_prefix:
+        # 字节码写入临时目录，测得的是缓存后的导入耗时而非编译耗时
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+        env['PYTHONPYCACHEPREFIX'] = pycache_prefix
+    return subprocess.run([sys.executable, *args], cwd=PROJECT_DIR, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+class TestImportTime(unittest.TestCase):
+    """导入开销与进程内共享状态测试类"""
+
+    def test_import_time_budget(self):
+        """测试导入 src.sm2_optimized 的耗时在预算内"""
+        print("测试导入耗时预算...")
+        statement = "import src.sm2_optimized, src.satoshi_forgery"
+        with tempfile.TemporaryDirectory() as prefix:
+            _run_python('-c', statement, pycache_prefix=prefix)
+            result = _run_python('-X', 'importtime', '-c', statement, pycache_prefix=prefix)
+        match = re.search(r"\|\s*(\d+)\s*\|\s*src\.sm2_optimized\s*$", result.stderr, re.MULTILINE)
+        self.assertIsNotNone(match)
+        self.assertLess(int(match.group(1)) / 1000, IMPORT_TIME_BUDGET_MS)
+
+    def test_heavy_modules_deferred(self):
+        """测试导入时不加载numpy、gmpy2、ecdsa与线程/进程池"""
+        print("测试重量级模块延迟导入...")
+        result = _run_python('-c', (
+            "import sys, src.sm2_optimized, src.satoshi_forgery\n"
+            f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"))
+        self.assertEqual(result.stdout.strip(), '')
+
+    def test_shared_curve_and_pool(self):
+        """测试同一后端的实例共享曲线、预计算表与线程池"""
+        print("测试共享曲线与线程池...")
+        first = OptimizedSM2()
+        second = OptimizedSM2(use_parallel=False)
+        self.assertIs(first.curve, second.curve)
+        self.assertIs(first.curve, get_curve(first.curve.backend.name))
+        self.assertIs(first.base_table, second.base_table)
+        self.assertIs(first._thread_pool, second._thread_pool)
+        self.assertIsNot(get_curve('int'), get_curve('gmpy2'))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
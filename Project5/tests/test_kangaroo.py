@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+小范围离散对数求解测试模块
+Test module for BSGS / Pollard kangaroo range solvers
+"""
+
+import hashlib
+import random
+import unittest
+from ecdsa import SigningKey, SECP256k1
+from ecdsa.util import sigdecode_string
+from src.kangaroo import RangeDLogSolver, Secp256k1Curve, _batch_add
+from src.sm2_misuse_poc import SM2SignatureMisuse
+
+
+class TestRangeDLogSolver(unittest.TestCase):
+    """区间离散对数求解器测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.rng = random.Random(2025)
+        self.sm2_solver = RangeDLogSolver()
+        self.secp_solver = RangeDLogSolver(Secp256k1Curve())
+
+    def test_batch_add_matches_point_addition(self):
+        """测试批量仿射加法与逐点加法结果一致"""
+        solver = self.sm2_solver
+        points = [solver._mul(self.rng.randrange(1, 1000)) for _ in range(8)]
+        addends = [solver._mul(self.rng.randrange(1000, 2000)) for _ in range(8)]
+        xs, ys = [p.x for p in points], [p.y for p in points]
+        _batch_add(xs, ys, [q.x for q in addends], [q.y for q in addends], solver.p)
+        for i, (P, Q) in enumerate(zip(points, addends)):
+            expected = P + Q
+            self.assertEqual((xs[i], ys[i]), (expected.x, expected.y))
+
+    def test_bsgs_both_curves(self):
+        """测试BSGS在SM2与secp256k1曲线上求解偏移区间"""
+        print("测试BSGS...")
+        for solver in (self.sm2_solver, self.secp_solver):
+            lower = self.rng.randrange(1, 1 << 100)
+            k = lower + self.rng.randrange(1 << 20)
+            self.assertEqual(solver.bsgs(solver._mul(k), lower, lower + (1 << 20)), k)
+            self.assertIsNone(solver.bsgs(solver._mul(k), k + 1, k + 1000))
+
+    def test_kangaroo_single_process(self):
+        """测试单进程袋鼠算法"""
+        print("测试Pollard袋鼠算法...")
+        k = self.rng.randrange(1 << 26)
+        stats = {}
+        found = self.sm2_solver.kangaroo(self.sm2_solver._mul(k), 0, 1 << 26, processes=1,
+                                         kangaroos_per_process=64, seed=1, stats=stats)
+        self.assertEqual(found, k)
+        self.assertGreater(stats['steps'], 0)
+
+    def test_kangaroo_multi_process(self):
+        """测试多进程共享可区分点表"""
+        k = self.rng.randrange(1 << 24)
+        found = self.secp_solver.kangaroo(self.secp_solver._mul(k), 0, 1 << 24, processes=2,
+                                          kangaroos_per_process=32, seed=2)
+        self.assertEqual(found, k)
+
+    def test_ecdsa_weak_nonce_key_recovery(self):
+        """测试python-ecdsa签名使用小随机数时恢复私钥"""
+        print("测试ECDSA弱随机数私钥恢复...")
+        private_key = self.rng.randrange(1, SECP256k1.order)
+        signing_key = SigningKey.from_secret_exponent(private_key, curve=SECP256k1)
+        message = b"weak nonce"
+        k = self.rng.randrange(1, 1 << 24)
+        r, s = sigdecode_string(signing_key.sign(message, k=k), SECP256k1.order)
+        e = int.from_bytes(hashlib.sha1(message).digest(), 'big')
+
+        recovered = self.secp_solver.recover_ecdsa_private_key(r, s, e, 0, 1 << 24)
+        self.assertEqual(recovered, private_key)
+
+    def test_sm2_weak_nonce_key_recovery(self):
+        """测试SM2签名使用小随机数时恢复私钥"""
+        misuse = SM2SignatureMisuse()
+        private_key, public_key = misuse.sm2.generate_keypair()
+        message = b"weak SM2 nonce"
+        k = self.rng.randrange(1, 1 << 20)
+        r, s = misuse._sign_with_fixed_k(message, private_key, public_key, k)
+        e = int.from_bytes(misuse.sm2._hash_message(message, public_key), 'big') % misuse.curve.n
+
+        recovered = self.sm2_solver.recover_sm2_private_key(r, s, e, 0, 1 << 20)
+        self.assertEqual(recovered, private_key)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MT19937状态恢复测试模块
+Test module for MT19937 state recovery
+"""
+
+import random
+import time
+import unittest
+import numpy as np
+from src.mt19937_recovery import MT19937Recovery, SM2NoncePredictor, temper, untemper
+
+
+class TestMT19937Recovery(unittest.TestCase):
+    """MT19937状态恢复测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.rng = random.Random(2025)
+
+    def test_untemper_inverts_temper(self):
+        """测试向量化逆tempering"""
+        words = np.array([self.rng.getrandbits(32) for _ in range(1000)], dtype=np.uint32)
+        self.assertTrue(np.array_equal(untemper(temper(words)), words))
+
+    def test_predict_from_32bit_outputs(self):
+        """测试由624个32位输出预测后续输出"""
+        print("测试32位输出状态恢复...")
+        recovery = MT19937Recovery()
+        for _ in range(700):
+            recovery.observe_word(self.rng.getrandbits(32))
+        predictor = recovery.recover()
+        self.assertEqual([predictor.getrandbits(32) for _ in range(100)],
+                         [self.rng.getrandbits(32) for _ in range(100)])
+
+    def test_partial_words_with_skipped_draws(self):
+        """测试最高字只有部分位已知（1023位随机数）且中间有未观测调用"""
+        print("测试部分位输出状态恢复...")
+        recovery = MT19937Recovery()
+        for i in range(45):
+            if i == 3:
+                self.rng.getrandbits(1023)
+                recovery.skip(32)
+            else:
+                recovery.observe_getrandbits(self.rng.getrandbits(1023), 1023)
+        predictor = recovery.recover()
+        q = (1 << 1022) + 12345
+        self.assertEqual(predictor.randint(1, q - 1), self.rng.randint(1, q - 1))
+
+    def test_inconsistent_observations_rejected(self):
+        """测试观测顺序错误时报错而不是给出错误预测"""
+        recovery = MT19937Recovery()
+        outputs = [self.rng.getrandbits(32) for _ in range(700)]
+        outputs[650] ^= 1
+        for value in outputs:
+            recovery.observe_word(value)
+        with self.assertRaises(ValueError):
+            recovery.recover()
+
+
+class TestSM2NoncePredictor(unittest.TestCase):
+    """SM2随机数预测测试类"""
+
+    def test_private_key_recovery_from_leaked_nonces(self):
+        """测试观测泄露随机数后预测下一次签名的k并恢复私钥（1秒内）"""
+        print("测试SM2私钥恢复...")
+        predictor = SM2NoncePredictor()
+        sm2 = predictor.sm2
+        random.seed(29)
+        private_key, public_key = sm2.generate_keypair()
+        leaked = [random.randint(1, predictor.n - 1) for _ in range(predictor.scalars_needed())]
+        message = b"signature after leak"
+        signature = sm2.sign(message, private_key, public_key)
+
+        start = time.perf_counter()
+        recovered = predictor.recover_private_key(leaked, signature, message, public_key)
+        elapsed = time.perf_counter() - start
+        print(f"恢复耗时: {elapsed * 1000:.1f} 毫秒")
+
+        self.assertEqual(recovered, private_key)
+        self.assertLess(elapsed, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
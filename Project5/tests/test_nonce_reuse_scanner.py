@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+随机数重用扫描器测试模块
+Test module for the SM2/ECDSA nonce reuse scanner
+"""
+
+import os
+import random
+import unittest
+from src.nonce_reuse_scanner import (
+    NonceReuseScanner, SignatureRecord, SCHEME_SM2, SCHEME_ECDSA
+)
+
+
+class TestNonceReuseScanner(unittest.TestCase):
+    """随机数重用扫描器测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.scanner = NonceReuseScanner(memory_limit=500, num_partitions=8)
+        self.misuse = self.scanner.misuse
+        self.n = self.scanner.curve.n
+        self.rng = random.Random(2025)
+
+    def tearDown(self):
+        self.scanner.close()
+
+    def _add_noise(self, count: int):
+        for i in range(count):
+            scheme = SCHEME_SM2 if i % 2 else SCHEME_ECDSA
+            self.scanner.add(SignatureRecord(scheme, f"noise-{i}", self.rng.randrange(1, self.n),
+                                             self.rng.randrange(1, self.n),
+                                             self.rng.randrange(1, self.n)))
+
+    def _sm2_record(self, user_id, message, private_key, public_key, k):
+        r, s = self.misuse._sign_with_fixed_k(message, private_key, public_key, k)
+        return SignatureRecord(SCHEME_SM2, user_id, r, s, self.scanner.sm2_digest(message, public_key))
+
+    def test_same_user_reuse_with_spill(self):
+        """测试溢出到磁盘后仍能发现同一用户的k重用"""
+        print("测试同一用户k重用扫描...")
+
+        private_key, public_key = self.misuse.sm2.generate_keypair()
+        self.scanner.register_public_key('victim', public_key)
+        k = self.rng.randrange(1, self.n)
+
+        self._add_noise(1200)
+        self.scanner.add(self._sm2_record('victim', b"message one", private_key, public_key, k))
+        self._add_noise(800)
+        self.scanner.add(self._sm2_record('victim', b"message two", private_key, public_key, k))
+
+        self.assertTrue(self.scanner._spilled)
+        findings = self.scanner.scan()
+
+        self.assertEqual(len(findings), 1)
+        self.assertEqual(findings[0]['private_key'], private_key)
+        self.assertEqual(findings[0]['method'], 'same_user_nonce_reuse')
+        self.assertTrue(findings[0]['verified'])
+
+    def test_sm2_ecdsa_shared_key(self):
+        """测试SM2与ECDSA共用d和k的跨方案连接"""
+        print("测试SM2-ECDSA跨方案扫描...")
+
+        private_key, public_key = self.misuse.sm2.generate_keypair()
+        k = self.rng.randrange(1, self.n)
+        message = b"Message for SM2-ECDSA attack"
+
+        self._add_noise(100)
+        self.scanner.add(self._sm2_record('dual', message, private_key, public_key, k))
+        r, s = self.misuse._simulate_weak_ecdsa_signature(message, private_key, k)
+        self.scanner.add(SignatureRecord(SCHEME_ECDSA, 'dual', r, s, self.scanner.ecdsa_digest(message)))
+
+        findings = self.scanner.scan()
+
+        self.assertEqual({f['scheme'] for f in findings}, {SCHEME_SM2, SCHEME_ECDSA})
+        for finding in findings:
+            self.assertEqual(finding['private_key'], private_key)
+            self.assertEqual(finding['nonce'], k)
+
+    def test_cross_user_with_known_key(self):
+        """测试借助已知私钥恢复共享k的其他用户私钥"""
+        print("测试跨用户k碰撞扫描...")
+
+        alice_d, alice_p = self.misuse.sm2.generate_keypair()
+        bob_d, bob_p = self.misuse.sm2.generate_keypair()
+        k = self.rng.randrange(1, self.n)
+
+        self.scanner.register_known_private_key('alice', alice_d)
+        self.scanner.add(self._sm2_record('alice', b"alice", alice_d, alice_p, k))
+        self.scanner.add(self._sm2_record('bob', b"bob", bob_d, bob_p, k))
+
+        findings = {f['user_id']: f for f in self.scanner.scan()}
+
+        self.assertEqual(findings['bob']['private_key'], bob_d)
+        self.assertEqual(findings['bob']['method'], 'known_private_key')
+
+    def test_no_false_positives(self):
+        """测试无碰撞语料不产生结果，重复提交的同一签名也不算碰撞"""
+        print("测试无碰撞语料...")
+
+        self._add_noise(1000)
+        record = SignatureRecord(SCHEME_SM2, 'dup', 5, 7, 11)
+        self.scanner.add(record)
+        self.scanner.add(record)
+
+        self.assertEqual(self.scanner.scan(), [])
+        self.assertEqual(self.scanner.record_count, 1002)
+
+    def test_spill_directory_cleanup(self):
+        """测试临时溢出目录在关闭后被删除"""
+        self._add_noise(600)
+        spill_dir = self.scanner._spill_dir
+        self.assertTrue(os.path.isdir(spill_dir))
+        self.scanner.close()
+        self.assertFalse(os.path.exists(spill_dir))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
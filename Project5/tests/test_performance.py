@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SM2性能基准测试套件测试模块
+Test module for the benchmark suite
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from src.performance import (compare_counts, compare_results, load_results, main, run_suite,
+                             save_results, summarize)
+from src.sm2_basic import SM2
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    """基准测试套件测试类"""
+
+    def test_summarize(self):
+        """测试统计量计算"""
+        print("测试基准测试统计量...")
+        stats = summarize(list(range(1, 101)))
+        self.assertEqual(stats['iterations'], 100)
+        self.assertEqual(stats['median_ns'], 50.5)
+        self.assertEqual(stats['p95_ns'], 95)
+        self.assertEqual(stats['p99_ns'], 99)
+        self.assertAlmostEqual(stats['ops_per_sec'], 1e9 / 50.5)
+
+    def test_run_and_compare(self):
+        """测试运行套件、JSON保存与回退检测"""
+        print("测试基准测试运行与对比...")
+        report = run_suite(('optimized',), target_time=0.01, payload_sizes=(16,),
+                           max_iterations=3, min_iterations=2)
+        operations = report['results']['optimized']
+        for name in ('keygen', 'sign', 'verify', 'verify_batch', 'encrypt_16', 'decrypt_16'):
+            self.assertIn(name, operations)
+            self.assertLessEqual(operations[name]['median_ns'], operations[name]['p99_ns'])
+
+        self.assertEqual(report['operation_counts']['sign']['table_lookup'], 65)
+
+        directory = tempfile.mkdtemp()
+        baseline_path = os.path.join(directory, 'base.json')
+        current_path = os.path.join(directory, 'current.json')
+        save_results(report, baseline_path)
+        self.assertEqual(load_results(baseline_path), json.loads(json.dumps(report)))
+
+        current = json.loads(json.dumps(report))
+        current['results']['optimized']['sign']['median_ns'] *= 2
+        current['results']['optimized']['verify']['median_ns'] /= 2
+        save_results(current, current_path)
+        status = {row['operation']: row['status'] for row in compare_results(report, current)}
+        self.assertEqual(status['sign'], 'regression')
+        self.assertEqual(status['verify'], 'improvement')
+        self.assertEqual(status['keygen'], 'unchanged')
+        self.assertEqual(main(['compare', baseline_path, current_path]), 1)
+        self.assertEqual(main(['compare', baseline_path, baseline_path]), 0)
+
+        # 运算次数增加即为回退，与计时噪声无关
+        counted = json.loads(json.dumps(report))
+        counted['results']['optimized']['sign']['median_ns'] /= 2
+        counted['operation_counts']['verify']['field_mul'] += 1
+        self.assertEqual([(row['operation'], row['status']) for row in compare_counts(report, counted)],
+                         [('verify', 'regression')])
+        save_results(counted, current_path)
+        self.assertEqual(main(['compare', baseline_path, current_path]), 1)
+
+    def test_implementation_benchmark(self):
+        """测试实现类的benchmark方法复用基准测试套件"""
+        print("测试实现类benchmark方法...")
+        results = SM2().benchmark(iterations=2)
+        self.assertEqual(results['sign']['iterations'], 2)
+        self.assertNotIn('verify_batch', results)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SM2异步微批处理接口测试模块
+Test module for the asyncio SM2 facade
+"""
+
+import asyncio
+import unittest
+from src.sm2_async import AsyncSM2
+from src.sm2_optimized import OptimizedSM2
+
+
+class TestAsyncSM2(unittest.IsolatedAsyncioTestCase):
+    """SM2异步接口测试类"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.sm2 = OptimizedSM2(use_parallel=False)
+        cls.private_key, cls.public_key = cls.sm2.generate_keypair()
+
+    async def test_sign_verify_decrypt(self):
+        """测试异步签名、验证与解密"""
+        print("测试异步签名/验证/解密...")
+        async with AsyncSM2(processes=1, max_batch_size=16) as service:
+            messages = [f"message {i}".encode() for i in range(20)]
+            signatures = await asyncio.gather(*(service.asign(m, self.private_key, self.public_key)
+                                                for m in messages))
+            results = await asyncio.gather(*(service.averify(m, sig, self.public_key)
+                                             for m, sig in zip(messages, signatures)))
+            self.assertTrue(all(results))
+            self.assertFalse(await service.averify(b"forged", signatures[0], self.public_key))
+
+            ciphertext = self.sm2.encrypt(b"secret", self.public_key)
+            C1, C2, _ = ciphertext
+            plain, tampered = await asyncio.gather(
+                service.adecrypt(ciphertext, self.private_key),
+                service.adecrypt((C1, C2, bytes(32)), self.private_key),
+                return_exceptions=True)
+            self.assertEqual(plain, b"secret")
+            self.assertIsInstance(tampered, ValueError)
+
+            encrypted = await asyncio.gather(*(service.aencrypt(m, self.public_key) for m in messages[:10]))
+            self.assertEqual([self.sm2.decrypt(c, self.private_key) for c in encrypted], messages[:10])
+            self.assertLess(service.stats['batches'], service.stats['requests'])
+
+    async def test_backpressure_timeout_cancel(self):
+        """测试背压、超时与取消"""
+        print("测试背压/超时/取消...")
+        async with AsyncSM2(processes=1, max_pending=4, max_delay=0.01) as service:
+            signature = self.sm2.sign(b"x", self.private_key, self.public_key)
+            results = await asyncio.gather(*(service.averify(b"x", signature, self.public_key)
+                                             for _ in range(12)))
+            self.assertTrue(all(results))
+            self.assertEqual(service._slots._value, 4)
+
+            with self.assertRaises(asyncio.TimeoutError):
+                await service.averify(b"x", signature, self.public_key, timeout=0)
+
+            task = asyncio.ensure_future(service.averify(b"x", signature, self.public_key))
+            await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            self.assertEqual(service.stats['timeouts'], 1)
+            self.assertEqual(service.stats['cancelled'], 1)
+        self.assertEqual(service._slots._value, 4)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SM2大整数后端测试模块
+Test module for the pluggable big-integer backends
+"""
+
+import json
+import os
+import secrets
+import tempfile
+import unittest
+from src.sm2_backend import available_backends, autotune, get_backend
+from src.sm2_optimized import OptimizedSM2
+
+
+class TestBackends(unittest.TestCase):
+    """大整数后端测试类"""
+
+    def test_interface_identical(self):
+        """测试各后端接口运算结果一致"""
+        print("测试后端接口一致性...")
+        p = OptimizedSM2(use_parallel=False).curve.p
+        values = [(secrets.randbelow(int(p)), secrets.randbelow(int(p))) for _ in range(20)]
+        for name in available_backends():
+            backend = get_backend(name)
+            E = backend.element
+            for a, b in values:
+                a, b, q = E(a), E(b), E(int(p))
+                self.assertEqual(backend.mul(a, b, q), a * b % q)
+                self.assertEqual(backend.sqr(a, q), a * a % q)
+                self.assertEqual(backend.reduce(a * b + b, q), (a * b + b) % q)
+                self.assertEqual(backend.mul(backend.inv(a, q), a, q), 1)
+                self.assertEqual(backend.powmod(a, q - 2, q), backend.inv(a, q))
+        with self.assertRaises(ValueError):
+            get_backend('unknown')
+
+    def test_curve_operations_identical(self):
+        """测试各后端的点运算、签名验证与解密结果一致"""
+        print("测试后端点运算一致性...")
+        reference = OptimizedSM2(use_parallel=False)
+        private_key, public_key = reference.generate_keypair()
+        message = b"backend check"
+        signature = reference.sign(message, private_key, public_key)
+        ciphertext = reference.encrypt(message, public_key)
+        k = secrets.randbelow(int(reference.curve.n))
+        expected = reference.G * k
+
+        for name in available_backends():
+            sm2 = OptimizedSM2(use_parallel=False, backend=name)
+            self.assertEqual(sm2.curve.backend.name, name)
+            G = sm2.G
+            for point in (G * k, G.ladder_mul(k), G.window_mul(k), sm2.base_table.multiply(k)):
+                self.assertEqual((int(point.x), int(point.y)), (int(expected.x), int(expected.y)))
+            P = sm2.import_public_key(public_key.x, public_key.y)
+            self.assertTrue(sm2.verify(message, signature, P))
+            self.assertTrue(reference.verify(message, sm2.sign(message, private_key, P), public_key))
+            C1 = sm2.import_public_key(ciphertext[0].x, ciphertext[0].y)
+            self.assertEqual(sm2.decrypt((C1, ciphertext[1], ciphertext[2]), private_key), message)
+
+    def test_autotune_cache(self):
+        """测试自动调优结果缓存"""
+        print("测试后端自动调优缓存...")
+        path = os.path.join(tempfile.mkdtemp(), 'backend.json')
+        best = autotune(path)
+        self.assertIn(best, available_backends())
+        with open(path) as f:
+            cached = json.load(f)
+        self.assertEqual(cached['backend'], best)
+
+        cached['backend'] = 'int'
+        with open(path, 'w') as f:
+            json.dump(cached, f)
+        self.assertEqual(autotune(path), 'int')
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -312,6 +312,29 @@ class TestSM2Basic(unittest.TestCase):
         self.assertNotEqual(signature2, signature3)
         
         print("✓ Security properties test passed")
+    
+    def test_public_key_validation(self):
+        """测试公钥与C1验证（无n倍点检查）及验证缓存"""
+        print("Testing public key validation...")
+        
+        private_key, public_key = self.sm2.generate_keypair()
+        imported = self.sm2.import_public_key(public_key.x, public_key.y)
+        self.assertEqual(imported, public_key)
+        self.assertIn((int(public_key.x), int(public_key.y)), self.sm2._validated_keys)
+        
+        # 不在曲线上、坐标越界的点以及无穷远点均被拒绝
+        p = self.sm2.curve.p
+        with self.assertRaises(ValueError):
+            self.sm2.import_public_key(public_key.x, public_key.y + 1)
+        self.assertFalse(self.sm2._is_valid_public_key(SM2Point(public_key.x, public_key.y + p, self.sm2.curve)))
+        self.assertFalse(self.sm2._is_valid_public_key(SM2Point.infinity_point(self.sm2.curve)))
+        
+        # 篡改C1的密文解密失败
+        C1, C2, C3 = self.sm2.encrypt(b"C1 check", public_key)
+        with self.assertRaises(ValueError):
+            self.sm2.decrypt((SM2Point(C1.x, C1.y + 1, self.sm2.curve), C2, C3), private_key)
+        
+        print("✓ Public key validation test passed")
 
 
 def run_tests():
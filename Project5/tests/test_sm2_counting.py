@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SM2运算计数测试模块
+Test module for operation counting
+"""
+
+import secrets
+import unittest
+from src import sm2_optimized
+from src.sm2_backend import get_backend
+from src.sm2_counting import count_operations
+from src.sm2_optimized import OptimizedSM2
+
+
+class TestOperationCounting(unittest.TestCase):
+    """运算计数测试类"""
+
+    def test_counting_backend(self):
+        """测试counting后端运算结果与其他后端一致并统计域运算"""
+        print("测试counting后端...")
+        backend = get_backend('counting')
+        E = backend.element
+        p = E(int(OptimizedSM2(use_parallel=False).curve.p))
+        a, b = E(secrets.randbelow(int(p))), E(secrets.randbelow(int(p)))
+        with count_operations() as counts:
+            product = a * b % p
+            square = a * a % p
+            scaled = 4 * a % p
+            inverse = backend.inv(a, p)
+        self.assertEqual(int(product), int(a) * int(b) % int(p))
+        self.assertEqual(int(square), int(a) ** 2 % int(p))
+        self.assertEqual(int(scaled * inverse % p), 4)
+        # 与字面常数的乘法 4 * a 不计
+        self.assertEqual(counts, {'field_mul': 1, 'field_sqr': 1, 'field_inv': 1})
+
+    def test_deterministic_counts(self):
+        """测试固定基与固定窗口路径的计数与标量无关，且结果与普通后端一致"""
+        print("测试运算计数确定性...")
+        sm2 = OptimizedSM2(use_parallel=False, scalar_mult='window', backend='counting')
+        reference = OptimizedSM2(use_parallel=False)
+        n = int(sm2.curve.n)
+        table = sm2.base_table
+        P = table.multiply(12345)
+
+        results = []
+        for _ in range(3):
+            k = secrets.randbelow(n - 1) + 1
+            with count_operations() as counts:
+                Q = table.multiply(k)
+                R = P.window_mul(k)
+            self.assertEqual((int(Q.x), int(Q.y)), (int((reference.G * k).x), int((reference.G * k).y)))
+            self.assertEqual(int(R.x), int((reference.G * (12345 * k)).x))
+            results.append(counts)
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+        self.assertEqual(results[0]['table_lookup'], 130)
+        self.assertEqual(results[0]['field_inv'], 2)
+        self.assertGreater(results[0]['point_double'], 0)
+
+    def test_zero_overhead_when_off(self):
+        """测试退出上下文后恢复原函数，普通后端不产生域运算计数"""
+        print("测试计数关闭时恢复原函数...")
+        originals = (sm2_optimized._jacobian_add, sm2_optimized._jacobian_double, sm2_optimized._masked_select)
+        sm2 = OptimizedSM2(use_parallel=False)
+        with count_operations() as outer:
+            with count_operations() as inner:
+                sm2.base_table.multiply(7)
+            self.assertIsNot(sm2_optimized._jacobian_add, originals[0])
+            sm2.base_table.multiply(9)
+        self.assertEqual((sm2_optimized._jacobian_add, sm2_optimized._jacobian_double,
+                          sm2_optimized._masked_select), originals)
+        self.assertEqual(inner['table_lookup'], 65)
+        self.assertEqual(outer['table_lookup'], 130)
+        self.assertNotIn('field_mul', outer)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SM2守护进程测试模块
+Test module for the SM2 Unix socket daemon
+"""
+
+import asyncio
+import os
+import tempfile
+import unittest
+from src.sm2_daemon import SM2Daemon, SM2DaemonClient, load_test
+from src.sm2_optimized import OptimizedSM2
+
+
+class TestSM2Daemon(unittest.IsolatedAsyncioTestCase):
+    """SM2守护进程测试类"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.sm2 = OptimizedSM2(use_parallel=False)
+        cls.private_key, cls.public_key = cls.sm2.generate_keypair()
+
+    async def asyncSetUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'sm2d.sock')
+        self.daemon = SM2Daemon(self.path, processes=1, max_batch_size=16)
+        await self.daemon.start()
+
+    async def asyncTearDown(self):
+        await self.daemon.close()
+        self.assertFalse(os.path.exists(self.path))
+
+    async def test_pipelined_operations(self):
+        """测试单连接流水线签名/验证/加密/解密"""
+        print("测试守护进程流水线请求...")
+        async with SM2DaemonClient(self.path) as client:
+            messages = [f"message {i}".encode() for i in range(12)]
+            signatures = await asyncio.gather(*(client.sign(m, self.private_key, self.public_key)
+                                                for m in messages))
+            results = await asyncio.gather(*(client.verify(m, sig, self.public_key)
+                                             for m, sig in zip(messages, signatures)))
+            self.assertTrue(all(results))
+            self.assertTrue(self.sm2.verify(messages[0], signatures[0], self.public_key))
+            self.assertFalse(await client.verify(b"forged", signatures[0], self.public_key))
+
+            C1, C2, C3 = await client.encrypt(b"secret", self.public_key)
+            self.assertEqual(await client.decrypt((C1, C2, C3), self.private_key), b"secret")
+            local = self.sm2.encrypt(b"local", self.public_key)
+            self.assertEqual(await client.decrypt(local, self.private_key), b"local")
+
+            with self.assertRaises(ValueError):
+                await client.decrypt((C1, C2, bytes(32)), self.private_key)
+            with self.assertRaises(ValueError):
+                await client._request(99, b"")
+        self.assertLess(self.daemon.service.stats['batches'], self.daemon.service.stats['requests'])
+
+    async def test_load_test_report(self):
+        """测试压测报告"""
+        print("测试守护进程压测报告...")
+        report = await load_test(self.path, requests=40, concurrency=16, op='verify', connections=2)
+        self.assertEqual(report['errors'], 0)
+        self.assertGreater(report['qps'], 0)
+        self.assertLessEqual(report['p50_ms'], report['p99_ms'])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
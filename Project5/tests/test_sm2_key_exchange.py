@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SM2密钥交换测试模块
+Test module for SM2 key exchange
+"""
+
+import secrets
+import time
+import unittest
+from src.sm2_key_exchange import (EphemeralKeyPool, SM2KeyExchange, _reduced_x, _shared_point,
+                                  handshake)
+from src.sm2_optimized import OptimizedSM2
+
+
+class TestSM2KeyExchange(unittest.TestCase):
+    """SM2密钥交换测试类"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.sm2 = OptimizedSM2(use_parallel=False)
+        cls.alice_keys = cls.sm2.generate_keypair()
+        cls.bob_keys = cls.sm2.generate_keypair()
+
+    def _parties(self, pool=False):
+        make_pool = (lambda: EphemeralKeyPool(self.sm2, size=4, background=False)) if pool else (lambda: None)
+        return (SM2KeyExchange(self.sm2, *self.alice_keys, identity=b'alice', pool=make_pool()),
+                SM2KeyExchange(self.sm2, *self.bob_keys, identity=b'bob', pool=make_pool()))
+
+    def test_handshake_with_confirmation(self):
+        """测试双方得到相同密钥，确认值被篡改时失败"""
+        print("测试SM2密钥交换与密钥确认...")
+        alice, bob = self._parties()
+        key_a, key_b = handshake(alice, bob, klen=48)
+        self.assertEqual(key_a, key_b)
+        self.assertEqual(len(key_a), 48)
+        self.assertNotEqual(handshake(alice, bob)[0], key_a[:16])
+
+        session_a = alice.initiate(bob.identity, bob.public_key)
+        session_b = bob.respond(alice.identity, alice.public_key)
+        session_b.derive(session_a.ephemeral_public)
+        with self.assertRaises(ValueError):
+            session_a.derive(session_b.ephemeral_public, bytes(32))
+        with self.assertRaises(ValueError):
+            session_b.confirm(bytes(32))
+
+        # 身份不一致时双方密钥不同
+        session_a = alice.initiate(b'mallory', bob.public_key)
+        session_b = bob.respond(alice.identity, alice.public_key)
+        key_b, _ = session_b.derive(session_a.ephemeral_public)
+        key_a, _ = session_a.derive(session_b.ephemeral_public)
+        self.assertNotEqual(key_a, key_b)
+
+    def test_joint_scalar_matches_separate(self):
+        """测试双标量乘法计算的V与先加后乘一致"""
+        print("测试联合标量乘法...")
+        n = int(self.sm2.curve.n)
+        ephemeral = self.sm2.base_table.multiply(secrets.randbelow(n - 1) + 1)
+        x_bar = _reduced_x(ephemeral.x, n)
+        self.assertEqual(x_bar.bit_length(), 128)
+        for _ in range(3):
+            t = secrets.randbelow(n - 1) + 1
+            joint = _shared_point(t, x_bar, self.bob_keys[1], ephemeral)
+            separate = _shared_point(t, x_bar, self.bob_keys[1], ephemeral, joint=False)
+            self.assertEqual((int(joint.x), int(joint.y)), (int(separate.x), int(separate.y)))
+
+    def test_ephemeral_pool(self):
+        """测试临时密钥池的预计算、取用与耗尽时的同步生成"""
+        print("测试临时密钥池...")
+        alice, bob = self._parties(pool=True)
+        for party in (alice, bob):
+            party.pool.fill()
+            self.assertEqual(len(party.pool), 4)
+        r, R = alice.pool.take()
+        self.assertEqual(int(R.x), int(self.sm2.base_table.multiply(r).x))
+
+        for _ in range(4):
+            key_a, key_b = handshake(alice, bob)
+            self.assertEqual(key_a, key_b)
+        self.assertEqual((len(alice.pool), alice.pool.misses), (0, 1))
+        self.assertEqual((len(bob.pool), bob.pool.misses), (0, 0))
+
+        background = EphemeralKeyPool(self.sm2, size=4)
+        background.take()
+        deadline = time.monotonic() + 30
+        while len(background) < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(background), 4)
+
+    def test_invalid_inputs(self):
+        """测试非法临时公钥与会话重复使用被拒绝"""
+        print("测试密钥交换输入校验...")
+        alice, bob = self._parties()
+        session_a = alice.initiate(bob.identity, bob.public_key)
+        bogus = type(bob.public_key)(1, 2, self.sm2.curve)
+        with self.assertRaises(ValueError):
+            session_a.derive(bogus)
+        session_b = bob.respond(alice.identity, alice.public_key)
+        session_a.derive(session_b.ephemeral_public)
+        with self.assertRaises(ValueError):
+            session_a.derive(session_b.ephemeral_public)
+        with self.assertRaises(ValueError):
+            alice.initiate(bob.identity, bogus)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
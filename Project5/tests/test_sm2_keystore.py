@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SM2公钥库文件测试模块
+Test module for the public key store
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.sm2_keystore import HEADER_SIZE, KeyStore, key_id, write_key_store
+from src.sm2_optimized import OptimizedSM2, OptimizedSM2Point
+from src.sm2_vector import _less_than, validate_points
+
+
+class TestKeyStore(unittest.TestCase):
+    """公钥库文件测试类"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.sm2 = OptimizedSM2(use_parallel=False)
+        cls.keys = [(key_id(f"user{i}"), cls.sm2.generate_keypair()[1]) for i in range(40)]
+        cls.directory = tempfile.mkdtemp()
+
+    def test_round_trip(self):
+        """测试未压缩与压缩记录的写入、映射加载与延迟解码"""
+        print("测试公钥库读写...")
+        for compressed in (False, True):
+            path = os.path.join(self.directory, f"keys_{compressed}.bin")
+            write_key_store(path, self.keys, compressed)
+            with KeyStore(path, verify=True) as store:
+                self.assertEqual(len(store), len(self.keys))
+                self.assertEqual(list(store.ids()), sorted(identifier for identifier, _ in self.keys))
+                for identifier, public_key in self.keys:
+                    self.assertIn(identifier, store)
+                    point = store[identifier]
+                    self.assertEqual((int(point.x), int(point.y)), (int(public_key.x), int(public_key.y)))
+                    self.assertIs(store.get(identifier), point)
+                self.assertIsNone(store.get(key_id("nobody")))
+                with self.assertRaises(KeyError):
+                    store[key_id("nobody")]
+
+    def test_validation(self):
+        """测试构建时的向量化校验、重复标识与文件损坏检测"""
+        print("测试公钥库校验...")
+        p = int(self.sm2.curve.p)
+        P = self.keys[0][1]
+        bogus = OptimizedSM2Point(P.x, P.y + 1, self.sm2.curve)
+        path = os.path.join(self.directory, "bad.bin")
+        with self.assertRaises(ValueError):
+            write_key_store(path, self.keys + [(1, bogus)])
+        with self.assertRaises(ValueError):
+            write_key_store(path, [(1, P), (1, self.keys[1][1])])
+
+        records = b''.join(int(Q.x).to_bytes(32, 'big') + int(Q.y).to_bytes(32, 'big') for _, Q in self.keys)
+        records += int(P.x).to_bytes(32, 'big') + int(P.y + 1).to_bytes(32, 'big')
+        self.assertEqual(validate_points(records, chunk=16).tolist(), [True] * len(self.keys) + [False])
+        bounds = np.frombuffer(b''.join(v.to_bytes(32, 'big') for v in (p - 1, p, p + 1)),
+                               dtype=np.uint8).reshape(3, 32)
+        self.assertEqual(_less_than(bounds, p).tolist(), [True, False, False])
+
+        write_key_store(path, self.keys)
+        with open(path, 'r+b') as f:
+            f.seek(HEADER_SIZE + len(self.keys) * 8 + 63)
+            f.write(b'\x00')
+        with self.assertRaises(ValueError):
+            KeyStore(path, verify=True)
+        with KeyStore(path) as store:
+            first = store.ids()[0]
+            with self.assertRaises(ValueError):
+                store.get(first)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
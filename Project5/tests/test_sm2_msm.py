@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多标量乘法测试模块
+Test module for multi-scalar multiplication
+"""
+
+import secrets
+import unittest
+from src.kangaroo import Secp256k1Curve
+from src.sm2_basic import SM2Curve, SM2Point
+from src.sm2_msm import MSM_METHODS, msm, select_method
+from src.sm2_optimized import OptimizedSM2Curve, OptimizedSM2Point
+
+
+def _naive(scalars, points):
+    result = points[0].infinity_point(points[0].curve)
+    for k, P in zip(scalars, points):
+        result = result + P * k
+    return result
+
+
+class TestMSM(unittest.TestCase):
+    """多标量乘法测试类"""
+
+    def test_methods_agree(self):
+        """测试各算法在各曲线上与逐个标量乘法求和一致"""
+        print("测试多标量乘法各算法...")
+        curves = [(OptimizedSM2Curve(), OptimizedSM2Point), (OptimizedSM2Curve('int'), OptimizedSM2Point),
+                  (SM2Curve(), SM2Point), (Secp256k1Curve(), SM2Point)]
+        for curve, point_type in curves:
+            G = point_type(curve.Gx, curve.Gy, curve)
+            n = int(curve.n)
+            for size in (1, 3, 20):
+                scalars = [secrets.randbelow(n) for _ in range(size)]
+                scalars[0] = n - 1
+                points = [G * (secrets.randbelow(n - 1) + 1) for _ in range(size)]
+                expected = _naive(scalars, points)
+                for method in MSM_METHODS:
+                    result = msm(scalars, points, method)
+                    self.assertIsInstance(result, point_type)
+                    self.assertEqual(result, expected)
+
+    def test_edge_cases(self):
+        """测试抵消、重复点、零标量与参数错误"""
+        print("测试多标量乘法边界情况...")
+        curve = OptimizedSM2Curve()
+        G = OptimizedSM2Point(curve.Gx, curve.Gy, curve)
+        n = int(curve.n)
+        infinity = OptimizedSM2Point.infinity_point(curve)
+        for method in MSM_METHODS:
+            self.assertTrue(msm([3, n - 3], [G, G], method).infinity)
+            self.assertEqual(msm([1, 1, 5], [G, G, G], method), G * 7)
+            self.assertEqual(msm([0, 2, 4], [G, infinity, G], method), G * 4)
+            self.assertTrue(msm([0], [G], method).infinity)
+
+        with self.assertRaises(ValueError):
+            msm([1, 2], [G])
+        with self.assertRaises(ValueError):
+            msm([], [])
+        with self.assertRaises(ValueError):
+            msm([1], [G], 'unknown')
+        self.assertEqual(select_method(2), 'straus')
+        self.assertEqual(select_method(1000), 'pippenger')
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -7,8 +7,10 @@ Test module for SM2 optimized implementation
 
 import unittest
 import hashlib
+import itertools
 import secrets
-from sm2_optimized import OptimizedSM2
+from unittest import mock
+from sm2_optimized import OptimizedSM2, SIGN_VECTOR_THRESHOLD
 
 
 class TestSM2Optimized(unittest.TestCase):
@@ -255,6 +257,198 @@ class TestSM2Optimized(unittest.TestCase):
             # 不抛出异常，让测试通过
             pass
 
+    def test_uniform_scalar_mult(self):
+        """测试阶梯与固定窗口标量乘法与NAF结果一致"""
+        print("测试均匀时间标量乘法...")
+
+        n = self.sm2.curve.n
+        point = self.sm2.G * 0xC0FFEE
+        for k in [1, 2, 3, n - 1, n - 2, (n - 1) // 2, 2 ** 255, 0xDEADBEEF]:
+            expected = point * k
+            self.assertEqual(point.ladder_mul(k), expected)
+            self.assertEqual(point.window_mul(k), expected)
+        self.assertTrue(point.ladder_mul(n).infinity)
+
+    def test_uniform_scalar_mult_sign_decrypt(self):
+        """测试使用均匀时间标量乘法的签名与解密"""
+        print("测试均匀时间模式的签名与解密...")
+
+        for method in ('ladder', 'window'):
+            sm2 = OptimizedSM2(use_parallel=False, scalar_mult=method)
+            private_key, public_key = sm2.generate_keypair()
+            signature = sm2.sign(self.test_data, private_key, public_key)
+            self.assertTrue(self.sm2.verify(self.test_data, signature, public_key))
+            ciphertext = sm2.encrypt(self.test_data, public_key)
+            self.assertEqual(sm2.decrypt(ciphertext, private_key), self.test_data)
+
+        with self.assertRaises(ValueError):
+            OptimizedSM2(scalar_mult='unknown')
+
+
+    def test_public_key_validation(self):
+        """测试公钥验证缓存与C1快速验证"""
+        print("测试公钥快速验证...")
+
+        private_key, public_key = self.sm2.generate_keypair()
+        imported = self.sm2.import_public_key(public_key.x, public_key.y)
+        self.assertEqual(imported, public_key)
+        self.assertIn((int(public_key.x), int(public_key.y)), self.sm2._validated_keys)
+
+        with self.assertRaises(ValueError):
+            self.sm2.import_public_key(public_key.x + 1, public_key.y)
+
+        C1, C2, C3 = self.sm2.encrypt(self.test_data, public_key)
+        invalid_C1 = type(C1)(C1.x, C1.y + 1, self.sm2.curve)
+        with self.assertRaises(ValueError):
+            self.sm2.decrypt((invalid_C1, C2, C3), private_key)
+        # 临时点C1不进入公钥缓存
+        self.assertNotIn((int(C1.x), int(C1.y)), self.sm2._validated_keys)
+
+
+    def test_decrypt_batch(self):
+        """测试同一私钥批量解密及逐条错误报告"""
+        print("测试批量解密...")
+
+        private_key, public_key = self.sm2.generate_keypair()
+        messages = [secrets.token_bytes(size) for size in (1, 32, 33, 200)]
+        ciphertexts = [self.sm2.encrypt(message, public_key) for message in messages]
+
+        C1, C2, C3 = ciphertexts[1]
+        tampered = (C1, C2, bytes(32))
+        invalid_C1 = (type(C1)(C1.x, C1.y + 1, self.sm2.curve), C2, C3)
+        results = self.sm2.decrypt_batch(ciphertexts + [tampered, invalid_C1, None], private_key)
+
+        self.assertEqual([r['message'] for r in results[:4]], messages)
+        self.assertTrue(all(r['error'] is None for r in results[:4]))
+        for result in results[4:]:
+            self.assertIsNone(result['message'])
+            self.assertIsNotNone(result['error'])
+
+        # 单条解密对C3不匹配同样报错
+        with self.assertRaises(ValueError):
+            self.sm2.decrypt(tampered, private_key)
+
+
+    def test_fixed_base_tables(self):
+        """测试G与接收方公钥的固定基表"""
+        print("测试固定基表加密...")
+
+        n = self.sm2.curve.n
+        for k in [1, 2, n - 1, 0xDEADBEEF]:
+            self.assertEqual(self.sm2.base_table.multiply(k), self.sm2.G * k)
+
+        private_key, public_key = self.sm2.generate_keypair()
+        recipient = self.sm2.recipient(public_key)
+        self.assertEqual(recipient.multiply(12345), public_key * 12345)
+        for message in (self.test_data, secrets.token_bytes(100)):
+            self.assertEqual(self.sm2.decrypt(recipient.encrypt(message), private_key), message)
+
+        # 同一公钥的句柄共享缓存中的表
+        self.assertIs(self.sm2.recipient(public_key).table, recipient.table)
+
+        with self.assertRaises(ValueError):
+            self.sm2.recipient(type(public_key)(public_key.x, public_key.y + 1, self.sm2.curve))
+
+    def test_recipient_cache_bounded(self):
+        """测试接收方固定基表缓存有上限"""
+        import sm2_optimized
+
+        original = sm2_optimized.RECIPIENT_CACHE_SIZE
+        sm2_optimized.RECIPIENT_CACHE_SIZE = 2
+        try:
+            keys = [self.sm2.generate_keypair()[1] for _ in range(3)]
+            for key in keys:
+                self.sm2.recipient(key).table
+            self.assertEqual(len(self.sm2._recipient_tables), 2)
+            self.assertNotIn((int(keys[0].x), int(keys[0].y)), self.sm2._recipient_tables)
+        finally:
+            sm2_optimized.RECIPIENT_CACHE_SIZE = original
+
+
+    def test_encrypt_multi(self):
+        """测试多接收方加密共享C1"""
+        print("测试多接收方加密...")
+
+        keypairs = [self.sm2.generate_keypair() for _ in range(4)]
+        public_keys = [public_key for _, public_key in keypairs]
+        public_keys[1] = self.sm2.recipient(public_keys[1])
+        message = secrets.token_bytes(100)
+
+        ciphertext = self.sm2.encrypt_multi(message, public_keys)
+        self.assertEqual(len(ciphertext['slots']), 4)
+        self.assertEqual(len(ciphertext['C2']), len(message))
+        for private_key, _ in keypairs:
+            self.assertEqual(self.sm2.decrypt_multi(ciphertext, private_key), message)
+
+        # 非接收方无槽位，篡改密文无法通过C3校验
+        outsider, _ = self.sm2.generate_keypair()
+        with self.assertRaises(ValueError):
+            self.sm2.decrypt_multi(ciphertext, outsider)
+        tampered = dict(ciphertext, C2=bytes(len(message)))
+        with self.assertRaises(ValueError):
+            self.sm2.decrypt_multi(tampered, keypairs[0][0])
+
+
+    def test_verify_batch(self):
+        """测试批量验证与逐条验证结果一致"""
+        print("测试批量验证...")
+
+        keypairs = [self.sm2.generate_keypair() for _ in range(2)]
+        items = []
+        for i in range(20):
+            private_key, public_key = keypairs[i % 2]
+            message = secrets.token_bytes(16)
+            items.append((message, self.sm2.sign(message, private_key, public_key), public_key))
+        items[3] = (b"forged", items[3][1], items[3][2])
+        items[5] = (items[5][0], (0, items[5][1][1]), items[5][2])
+
+        results = self.sm2.verify_batch(items)
+        self.assertEqual(results, [self.sm2.verify(*item) for item in items])
+        self.assertEqual(results.count(False), 2)
+
+    def test_sign_many(self):
+        """测试批量签名（逐块、向量化与多进程分片）的结果均可验证且按顺序流式产出"""
+        print("测试批量签名...")
+
+        private_key, public_key = self.sm2.generate_keypair()
+        messages = [secrets.token_bytes(16) for _ in range(SIGN_VECTOR_THRESHOLD + 10)]
+        messages[1] = secrets.token_bytes(2048)
+        messages[2] = b""
+
+        # 流式：只消费第一块
+        consumed = iter(messages)
+        stream = self.sm2.sign_many(consumed, private_key, public_key, chunk_size=10)
+        first = list(itertools.islice(stream, 3))
+        self.assertEqual(len(list(consumed)), len(messages) - 10)
+        for message, signature in zip(messages, first):
+            self.assertTrue(self.sm2.verify(message, signature, public_key))
+
+        signatures = list(self.sm2.sign_many(messages, private_key, public_key, workers=1))
+        self.assertEqual(len(signatures), len(messages))
+        self.assertEqual(self.sm2.verify_batch([(m, sig, public_key) for m, sig in zip(messages, signatures)]),
+                         [True] * len(messages))
+
+        with mock.patch('sm2_optimized.SIGN_PROCESS_THRESHOLD', 64):
+            sharded = list(self.sm2.sign_many(messages[:200], private_key, public_key, chunk_size=32, workers=2))
+        self.assertEqual(len(sharded), 200)
+        for i in (0, 1, 2, 199):
+            self.assertTrue(self.sm2.verify(messages[i], sharded[i], public_key))
+
+        with self.assertRaises(ValueError):
+            self.sm2.sign_many(messages, self.sm2.curve.n - 1, public_key)
+
+    def test_compact_points(self):
+        """测试紧凑点表示与元组内核标量乘法"""
+        print("测试紧凑点表示...")
+
+        G = self.sm2.G
+        self.assertFalse(hasattr(G, '__dict__'))
+        n = int(self.sm2.curve.n)
+        for k in (1, 2, 3, n - 1, secrets.randbelow(n)):
+            self.assertEqual(G * k, G.window_mul(k))
+        self.assertTrue((G * n).infinity)
+        self.assertEqual(G * (n - 1), -G)
+
 
 def run_performance_benchmark():
     """运行性能基准测试"""
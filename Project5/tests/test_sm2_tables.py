@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SM2预计算表磁盘存储测试模块
+Test module for the memory-mapped SM2 table store
+"""
+
+import os
+import tempfile
+import unittest
+from src import sm2_optimized
+from src.sm2_optimized import OptimizedSM2
+from src.sm2_tables import TableStore, build_table_file, install
+
+
+class TestTableStore(unittest.TestCase):
+    """SM2预计算表存储测试类"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.sm2 = OptimizedSM2(use_parallel=False)
+        cls.private_key, cls.public_key = cls.sm2.generate_keypair()
+        cls.path = os.path.join(tempfile.mkdtemp(), 'tables.bin')
+        build_table_file(cls.path, [cls.public_key])
+
+    def test_mapped_tables(self):
+        """测试映射表的标量乘法与OptimizedSM2集成"""
+        print("测试映射预计算表...")
+        with TableStore(self.path) as store:
+            self.assertEqual(len(store), 2)
+            self.assertIn(self.sm2.G, store)
+            k = 0x123456789ABCDEF
+            self.assertEqual(store.get(self.sm2.G).multiply(k), self.sm2.G * k)
+            self.assertEqual(store.get(self.public_key).multiply(k), self.public_key * k)
+            other = self.sm2.G * 5
+            self.assertIsNone(store.get(other))
+
+            sm2 = OptimizedSM2(use_parallel=False, table_store=store)
+            self.assertIs(sm2.base_table, store.get(self.sm2.G))
+            message = b"mapped tables"
+            signature = sm2.sign(message, self.private_key, self.public_key)
+            self.assertTrue(self.sm2.verify(message, signature, self.public_key))
+            ciphertext = sm2.recipient(self.public_key).encrypt(message)
+            self.assertIs(sm2._recipient_tables[(int(self.public_key.x), int(self.public_key.y))],
+                          store.get(self.public_key))
+            self.assertEqual(self.sm2.decrypt(ciphertext, self.private_key), message)
+
+    def test_default_store(self):
+        """测试进程内默认存储"""
+        print("测试默认预计算表存储...")
+        store = install(self.path)
+        try:
+            mapped = store.get(self.sm2.G)
+            self.assertIs(OptimizedSM2(use_parallel=False).base_table, mapped)
+        finally:
+            sm2_optimized.set_default_table_store(None)
+            store.close()
+        self.assertIsNot(OptimizedSM2(use_parallel=False).base_table, mapped)
+
+    def test_corruption_detected(self):
+        """测试版本与校验和检查"""
+        print("测试表文件损坏检测...")
+        with open(self.path, 'rb') as f:
+            data = bytearray(f.read())
+        path = self.path + '.bad'
+
+        corrupted = bytearray(data)
+        corrupted[-1] ^= 1
+        with open(path, 'wb') as f:
+            f.write(corrupted)
+        with TableStore(path) as store:
+            self.assertIsNotNone(store.get(self.sm2.G))
+            with self.assertRaises(ValueError):
+                store.get(self.public_key)
+
+        for index in (0, 8, 60):
+            corrupted = bytearray(data)
+            corrupted[index] ^= 1
+            with open(path, 'wb') as f:
+                f.write(corrupted)
+            with self.assertRaises(ValueError):
+                TableStore(path)
+
+    def test_lazy_curve_precomputation(self):
+        """测试曲线的2^i * G表按需构建"""
+        print("测试曲线预计算表按需构建...")
+        curve = sm2_optimized.OptimizedSM2Curve()
+        self.assertEqual(curve._precompute_table, {})
+        self.assertEqual(curve.get_precomputed_point(3), self.sm2.G * 8)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
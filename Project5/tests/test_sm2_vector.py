@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SM2向量化批量运算测试模块
+Test module for the NumPy vectorized batch arithmetic
+"""
+
+import secrets
+import unittest
+import numpy as np
+from src.sm2_optimized import OptimizedSM2, _regular_recode
+from src.sm2_vector import VectorSM2
+
+
+class TestVectorSM2(unittest.TestCase):
+    """向量化批量运算测试类"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.vector = VectorSM2()
+        cls.sm2 = cls.vector.sm2
+        cls.n = int(cls.sm2.curve.n)
+        cls.p = int(cls.sm2.curve.p)
+
+    def test_field_operations(self):
+        """测试向量化域运算与整数运算结果一致"""
+        print("测试向量化域运算...")
+        F, p = self.vector.field, self.p
+        a = [secrets.randbelow(p) for _ in range(50)] + [0, 1, p - 1]
+        b = [secrets.randbelow(p) for _ in range(50)] + [p - 1, 0, p - 1]
+        A, B = F.to_limbs(a), F.to_limbs(b)
+        self.assertEqual(F.from_limbs(A), a)
+        self.assertEqual(F.from_limbs(F.add(A, B)), [(x + y) % p for x, y in zip(a, b)])
+        self.assertEqual(F.from_limbs(F.sub(A, B)), [(x - y) % p for x, y in zip(a, b)])
+        self.assertEqual(F.from_limbs(F.mul(A, B)), [x * y % p for x, y in zip(a, b)])
+        self.assertEqual(F.from_limbs(F.sqr(A)), [x * x % p for x in a])
+        self.assertEqual(F.from_limbs(F.mul_small(A, 8)), [8 * x % p for x in a])
+
+        # 连续运算不经完全约简
+        C = A
+        expected = list(a)
+        for _ in range(20):
+            C = F.sub(F.mul(C, C), B)
+            expected = [(x * x - y) % p for x, y in zip(expected, b)]
+        self.assertEqual(F.from_limbs(C), expected)
+
+    def test_recoding(self):
+        """测试向量化重编码与逐个重编码一致"""
+        print("测试向量化重编码...")
+        scalars = [secrets.randbelow(self.n) for _ in range(30)] + [0, 1, 2, self.n - 1, self.n]
+        for width in (3, 4, 5):
+            expected = np.array([[int(d) for d in _regular_recode(k, self.sm2.curve.n, width)]
+                                 for k in scalars]).T
+            self.assertTrue((self.vector._digits(scalars, width) == expected).all())
+
+    def test_scalar_multiplication(self):
+        """测试固定基与变基点批量标量乘法"""
+        print("测试向量化批量标量乘法...")
+        G = self.sm2.G
+        scalars = [secrets.randbelow(self.n - 1) + 1 for _ in range(20)] + [1, 2, self.n - 1]
+        for k, point in zip(scalars, self.vector.base_mul(scalars)):
+            self.assertEqual(point, G * k)
+
+        points = [G * (secrets.randbelow(self.n - 1) + 1) for _ in scalars]
+        # k = 1 时首次点加即为倍点，k = n - 1 时结果需取负
+        for k, P, Q in zip(scalars, points, self.vector.scalar_mul(scalars, points)):
+            self.assertEqual(Q, P * k)
+
+    def test_verify_batch(self):
+        """测试向量化批量验证与逐个验证一致"""
+        print("测试向量化批量验证...")
+        items = []
+        for i in range(6):
+            private_key, public_key = self.sm2.generate_keypair()
+            message = f"vector {i}".encode()
+            items.append((message, self.sm2.sign(message, private_key, public_key), public_key))
+        message, (r, s), public_key = items[2]
+        items[2] = (message, (r, (s + 1) % self.n), public_key)
+        items.append((b"tampered", items[0][1], items[0][2]))
+        items.append((b"out of range", (0, 1), items[0][2]))
+
+        expected = [self.sm2.verify(m, sig, P) for m, sig, P in items]
+        self.assertEqual(self.vector.verify_batch(items), expected)
+        self.assertEqual(expected, [True, True, False, True, True, True, False, False])
+
+        private_keys, public_keys = zip(*self.vector.generate_keypairs(5))
+        for d, P in zip(private_keys, public_keys):
+            self.assertEqual(P, self.sm2.G * d)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
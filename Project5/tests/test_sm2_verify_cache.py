@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SM2签名验证结果缓存测试模块
+Test module for the verification cache
+"""
+
+import multiprocessing
+import unittest
+from src.sm2_optimized import OptimizedSM2
+from src.sm2_verify_cache import SharedVerificationCache, VerificationCache, cache_key
+
+
+def _lookup_in_worker(name, digest, signature, xy, queue):
+    """子进程：挂接共享缓存并查询"""
+    from src.sm2_optimized import OptimizedSM2Point, get_curve
+    cache = SharedVerificationCache(name)
+    public_key = OptimizedSM2Point(xy[0], xy[1], get_curve())
+    queue.put(cache.contains(digest, signature, public_key))
+    cache.close()
+
+
+class TestVerificationCache(unittest.TestCase):
+    """验证结果缓存测试类"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.sm2 = OptimizedSM2(use_parallel=False)
+        cls.private_key, cls.public_key = cls.sm2.generate_keypair()
+        cls.message = b"redelivered message"
+        cls.signature = cls.sm2.sign(cls.message, cls.private_key, cls.public_key)
+        cls.digest = cls.sm2._hash_message(cls.message, cls.public_key)
+
+    def test_positive_results_only(self):
+        """测试只缓存验证通过的结果，篡改的签名仍被拒绝"""
+        print("测试验证缓存只记录通过的签名...")
+        cache = VerificationCache()
+        sm2 = OptimizedSM2(use_parallel=False, verify_cache=cache)
+        r, s = self.signature
+        forged = (r, (s + 1) % sm2.curve.n)
+        for _ in range(3):
+            self.assertTrue(sm2.verify(self.message, self.signature, self.public_key))
+            self.assertFalse(sm2.verify(self.message, forged, self.public_key))
+        self.assertEqual(len(cache), 1)
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+        self.assertAlmostEqual(cache.stats()['hit_rate'], 2 / 6)
+
+        self.assertEqual(sm2.verify_batch([(self.message, self.signature, self.public_key),
+                                           (self.message, forged, self.public_key)]), [True, False])
+        self.assertEqual(cache.hits, 3)
+        self.assertNotEqual(cache_key(self.digest, self.signature, self.public_key),
+                            cache_key(self.digest, forged, self.public_key))
+
+    def test_ttl_and_size_eviction(self):
+        """测试TTL过期与容量淘汰"""
+        print("测试验证缓存淘汰...")
+        now = [0.0]
+        cache = VerificationCache(max_entries=2, ttl=10, clock=lambda: now[0])
+        r, s = self.signature
+        signatures = [(r, s), (r, s + 1), (r, s + 2)]
+        for signature in signatures:
+            cache.add(self.digest, signature, self.public_key)
+        self.assertFalse(cache.contains(self.digest, signatures[0], self.public_key))
+        self.assertTrue(cache.contains(self.digest, signatures[2], self.public_key))
+        now[0] = 10
+        self.assertFalse(cache.contains(self.digest, signatures[2], self.public_key))
+        self.assertEqual(cache.evictions, 2)
+        with self.assertRaises(ValueError):
+            VerificationCache(max_entries=0)
+
+    def test_shared_cache_across_processes(self):
+        """测试共享内存缓存在子进程中命中"""
+        print("测试跨进程共享验证缓存...")
+        cache = SharedVerificationCache(slots=64, ttl=60)
+        try:
+            sm2 = OptimizedSM2(use_parallel=False, verify_cache=cache)
+            self.assertTrue(sm2.verify(self.message, self.signature, self.public_key))
+            self.assertTrue(sm2.verify(self.message, self.signature, self.public_key))
+            self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 1, 1))
+
+            queue = multiprocessing.get_context('spawn').Queue()
+            process = multiprocessing.get_context('spawn').Process(
+                target=_lookup_in_worker,
+                args=(cache.name, self.digest, self.signature,
+                      (int(self.public_key.x), int(self.public_key.y)), queue))
+            process.start()
+            self.assertTrue(queue.get(timeout=60))
+            process.join()
+
+            cache.clear()
+            self.assertFalse(cache.contains(self.digest, self.signature, self.public_key))
+        finally:
+            cache.close()
+            cache.unlink()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)